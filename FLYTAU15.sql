@@ -227,6 +227,11 @@ CREATE TABLE Defines (
     FOREIGN KEY (Airport_ID) REFERENCES Airports(Airport_ID)
 );
 
+-- Secondary indexes for the hot query paths are NOT created here:
+-- they live in migrations/ and are built after the seed data is loaded
+-- (flask --app main init-db / automatically at startup),
+-- check them with: flask --app main check-query-plans
+
 -- =========================================================
 -- INSERTS
 -- =========================================================
@@ -965,6 +970,9 @@ SET Final_Total =
     END;
 
 
+-- =========================================================
+-- REPORT QUERIES (reference only - the bootstrap loader stops here)
+-- =========================================================
 
 -- שאילתה 1
 SELECT
@@ -0,0 +1,139 @@
+"""
+How long confirm_order holds the SQLite write lock, per party size.
+
+Builds a scratch database from FLYTAU15.sql, adds one future flight on the plane with the
+most Economy seats and times BEGIN IMMEDIATE .. COMMIT for orders of 1-50 seats, comparing
+the old per-seat pipeline (3 statements per seat) with place_order (set-based).
+"execs" counts statement executions inside the transaction (executemany counts once per row).
+
+    python bench/confirm_order_lock.py [--repeat 30]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+from datetime import date, timedelta
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+SIZES = (1, 2, 5, 9, 20, 35, 50)
+
+
+def legacy_place_order(cursor, flight_id, plane_id, seats, email):
+    """The confirm_order body before the set-based rewrite (one query per seat, three loops)."""
+    for seat_id in seats:
+        cursor.execute("""
+            SELECT 1
+            FROM Selected_Seats ss
+            JOIN Orders o ON o.Unique_Order_ID = ss.Unique_Order_ID
+            WHERE o.Flight_ID = ? AND ss.Plane_ID = ? AND ss.Row_Num = ? AND ss.Column_Number = ?
+              AND ss.Is_Occupied = 1 AND o.Order_Status = 'active'
+            LIMIT 1""", (flight_id, plane_id, int(seat_id[:-1]), seat_id[-1]))
+        if cursor.fetchone():
+            raise main.BookingConflict(seat_id)
+
+    cursor.execute("SELECT Email_Address FROM Unidentified_Guests WHERE Email_Address = ?", (email,))
+    if not cursor.fetchone():
+        cursor.execute("INSERT INTO Unidentified_Guests (Email_Address, First_Name_In_English, Last_Name_In_English) "
+                       "VALUES (?, 'Bench', 'User')", (email,))
+
+    cursor.execute("SELECT Economy_Price, Business_Price FROM Flight WHERE Flight_ID = ? LIMIT 1", (flight_id,))
+    pr = cursor.fetchone()
+    total = 0.0
+    for seat_id in seats:
+        cursor.execute("SELECT Class FROM Seats WHERE Plane_ID = ? AND Row_Num = ? AND Column_Number = ? LIMIT 1",
+                       (plane_id, int(seat_id[:-1]), seat_id[-1]))
+        srow = cursor.fetchone()
+        total += float(pr["Business_Price"] if srow["Class"] == "Business" else pr["Economy_Price"])
+
+    cursor.execute("SELECT COALESCE(MAX(Unique_Order_ID), 9000) + 1 AS next_id FROM Orders")
+    order_id = int(cursor.fetchone()["next_id"])
+    cursor.execute("""
+        INSERT INTO Orders (Unique_Order_ID, Flight_ID, Registered_Clients_Email_Address,
+                            Unidentified_Guest_Email_Address, Order_Status, Final_Total)
+        VALUES (?, ?, NULL, ?, 'active', ?)""", (order_id, flight_id, email, round(total, 2)))
+    cursor.execute("INSERT INTO Has_an_order (Email_Address, Unique_Order_ID, Quantity_of_tickets) VALUES (?, ?, ?)",
+                   (email, order_id, len(seats)))
+    for seat_id in seats:
+        cursor.execute("INSERT INTO Selected_Seats (Plane_ID, Unique_Order_ID, Column_Number, Row_Num, Is_Occupied) "
+                       "VALUES (?, ?, ?, ?, 1)", (plane_id, order_id, seat_id[-1], int(seat_id[:-1])))
+    main.adjust_flight_occupancy(cursor, flight_id, len(seats))
+    return order_id
+
+
+def set_based_place_order(cursor, flight_id, plane_id, seats, email):
+    return main.place_order(cursor, flight_id, plane_id, seats, email, "guest", "Bench", "User")
+
+
+def setup(conn):
+    cur = main.DictCursor(conn.cursor())
+    cur.execute("SELECT Plane_ID, Economy_Seats FROM Plane_Capacity ORDER BY Economy_Seats DESC LIMIT 1")
+    plane = cur.fetchone()
+    cur.execute("SELECT Row_Num, Column_Number FROM Seats WHERE Plane_ID = ? AND Class = 'Economy' "
+                "ORDER BY Row_Num, Column_Number", (plane["Plane_ID"],))
+    seat_ids = [f"{r['Row_Num']}{r['Column_Number']}" for r in cur.fetchall()]
+    cur.execute("SELECT COALESCE(MAX(Flight_ID), 0) + 1 AS id FROM Flight")
+    flight_id = cur.fetchone()["id"]
+    cur.execute("""
+        INSERT INTO Flight (Flight_ID, Plane_ID, Origin_Airport, Destination_Airport, Departure_Time,
+                            Departure_Date, Economy_Price, Business_Price, Flight_Status)
+        VALUES (?, ?, 1, 3, '10:00:00', ?, 100, 300, 'active')""",
+                (flight_id, plane["Plane_ID"], (date.today() + timedelta(days=30)).isoformat()))
+    conn.commit()
+    return flight_id, plane["Plane_ID"], seat_ids
+
+
+def cleanup(conn, flight_id):
+    conn.execute("DELETE FROM Selected_Seats WHERE Unique_Order_ID IN (SELECT Unique_Order_ID FROM Orders WHERE Flight_ID = ?)", (flight_id,))
+    conn.execute("DELETE FROM Has_an_order WHERE Unique_Order_ID IN (SELECT Unique_Order_ID FROM Orders WHERE Flight_ID = ?)", (flight_id,))
+    conn.execute("DELETE FROM Orders WHERE Flight_ID = ?", (flight_id,))
+    conn.execute("UPDATE Flight SET Occupied_Seats = 0, Flight_Status = 'active' WHERE Flight_ID = ?", (flight_id,))
+    conn.commit()
+
+
+def measure(conn, impl, flight_id, plane_id, seats, repeat):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    cursor = main.DictCursor(conn.cursor())
+    timings = []
+    for _ in range(repeat):
+        statements.clear()
+        started = perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        impl(cursor, flight_id, plane_id, seats, "bench@example.com")
+        conn.commit()
+        timings.append((perf_counter() - started) * 1000)
+        n_statements = len(statements) - 2   # BEGIN / COMMIT
+        conn.set_trace_callback(None)
+        cleanup(conn, flight_id)
+        conn.set_trace_callback(statements.append)
+    conn.set_trace_callback(None)
+    return statistics.median(timings), max(timings), n_statements
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        main.DB_PATH = os.path.join(tmp, "bench.db")
+        main.bootstrap_database(main.DB_PATH)
+        conn = main.get_db_connection()
+        flight_id, plane_id, seat_ids = setup(conn)
+
+        print(f"plane {plane_id}, {len(seat_ids)} economy seats, median of {args.repeat} runs (ms, lock held)")
+        print(f"{'seats':>5} | {'legacy med':>10} {'max':>7} {'execs':>5} | {'set-based med':>13} {'max':>7} {'execs':>5} | speedup")
+        for n in SIZES:
+            seats = seat_ids[:n]
+            l_med, l_max, l_stmts = measure(conn, legacy_place_order, flight_id, plane_id, seats, args.repeat)
+            s_med, s_max, s_stmts = measure(conn, set_based_place_order, flight_id, plane_id, seats, args.repeat)
+            print(f"{n:>5} | {l_med:>10.3f} {l_max:>7.3f} {l_stmts:>5} | {s_med:>13.3f} {s_max:>7.3f} {s_stmts:>5} | {l_med / s_med:>6.1f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main_cli()
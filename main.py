@@ -1,9 +1,20 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, has_request_context
 from datetime import datetime, timedelta
 from contextlib import contextmanager
+from collections import OrderedDict
+from collections.abc import MutableMapping
 import sqlite3
 import os
+import threading
+import bisect
+import heapq
+import secrets
+import json
+import hashlib
+import click
+from time import monotonic  # NOTE: utils star-import shadows `time` with datetime.time
 from decimal import Decimal
+from markupsafe import Markup, escape
 from utils.utils import *
 
 app = Flask(__name__)
@@ -12,7 +23,41 @@ app.config.update(
     PERMANENT_SESSION_LIFETIME=timedelta(minutes=10),  # disconnects after 10 minutes of inactivity
     SESSION_FILE_DIR= "/home/NoaKopi/InformationSystemsFinalProject/flask_session_data",
     SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE="Lax",)
+    SESSION_COOKIE_SAMESITE="Lax",
+    DB_POOL_SIZE=8,                        # max open SQLite connections per process
+    DB_POOL_TIMEOUT=10.0,                  # seconds to wait for a free connection
+    DB_POOL_HEALTH_CHECK_INTERVAL=30.0,    # idle seconds before a connection is re-validated
+    DB_STORAGE_PROFILE={
+        "journal_mode": "wal",             # readers never block on the booking writers
+        "synchronous": "normal",           # durable at checkpoint; safe with WAL
+        "busy_timeout": 5000,              # ms a writer waits for the lock before "database is locked"
+        "cache_size": -16000,              # negative = KiB (~16MB page cache per connection)
+        "mmap_size": 134217728,            # 128MB memory-mapped reads
+        "temp_store": "memory",
+        "wal_autocheckpoint": 1000,        # pages
+        "journal_size_limit": 67108864,},  # truncate the -wal file back to 64MB after checkpoints
+    DB_CHECKPOINT_EVERY_COMMITS=500,       # explicit PASSIVE checkpoint cadence (0 = autocheckpoint only)
+    DB_AUTO_BOOTSTRAP=True,                # build the instance DB from FLYTAU15.sql when it's missing
+    FLIGHT_STATUS_SWEEP_ENABLED=True,      # background active/full -> done sweeper (else: flask sweep-flight-statuses)
+    FLIGHT_STATUS_SWEEP_INTERVAL=60.0,     # max seconds between sweeps (sooner if a flight departs before that)
+    FLIGHT_STATUS_SWEEP_BATCH=200,         # flights marked per write transaction
+    SEAT_MAP_CACHE_FLIGHTS=512,            # flights kept in the seat occupancy cache (LRU)
+    SEAT_MAP_CACHE_TTL=30.0,               # seconds before a cached seat map is rebuilt from the DB
+    SEAT_HOLD_TTL=600,                     # seconds selected seats stay held for the customer
+    ORDER_ID_BLOCK_SIZE=1,                 # >1: each worker pre-allocates order ids in blocks (gaps on restart)
+    ORDER_HISTORY_PAGE_SIZE=20,            # past orders per page (keyset pagination)
+    ADMIN_FLIGHTS_PAGE_SIZE=50,            # admin flight board rows per page
+    MAX_PAGE_SIZE=200,                     # upper bound for a ?per_page= override
+    REFERENCE_DATA_CHECK_INTERVAL=5.0,     # seconds between Airports/Routes version-stamp checks
+    SEARCH_CACHE_ENTRIES=256,              # public flight searches kept in the result cache (LRU)
+    SEARCH_CACHE_TTL=30.0,                 # seconds before a cached search is re-run
+    FARE_CALENDAR_MAX_DAYS=31,             # widest fare calendar window, in days either side
+    ITINERARY_MIN_CONNECTION=60,           # minutes between landing and the next departure
+    ITINERARY_MAX_CONNECTION=24 * 60,      # longest layover offered, in minutes
+    ITINERARY_MAX_EXPANSIONS=20000,        # legs examined per search before giving up (bounds latency)
+    ITINERARY_CHECK_INTERVAL=5.0,          # seconds between Flight version-stamp checks of the index
+    AVAILABILITY_CHECK_INTERVAL=5.0,       # seconds between version checks of the crew/plane busy index
+    BULK_SCHEDULE_MAX_FLIGHTS=400,)        # flights one recurring-schedule request may create
 
 # ======================================================
 # MAIN
@@ -25,46 +70,435 @@ app.config.update(
 DB_PATH = os.path.join(app.instance_path, "FLYTAU15.db")
 
 
+class LazyRow(MutableMapping):
+    """
+    Dict-like view over one result tuple: row["Col"], row.get("Col"), row[0], `in`, keys()...
+    Column names resolve through a name->index map shared by every row of the result set,
+    so nothing is copied per row. Values assigned by the routes (f["has_business"] = ...)
+    go into a small per-row overlay; the underlying tuple is never touched.
+    """
+    __slots__ = ("_values", "_index", "_extra")
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+        self._extra = None
+
+    def __getitem__(self, key):
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        if type(key) is int:
+            return self._values[key]
+        return self._values[self._index[key]]
+
+    def get(self, key, default=None):
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        i = self._index.get(key)
+        return default if i is None else self._values[i]
+
+    def __setitem__(self, key, value):
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        raise TypeError("LazyRow columns can't be deleted (assigned keys are kept in an overlay).")
+
+    def __contains__(self, key):
+        return key in self._index or (self._extra is not None and key in self._extra)
+
+    def __iter__(self):
+        yield from self._index
+        if self._extra:
+            yield from (k for k in self._extra if k not in self._index)
+
+    def __len__(self):
+        return len(self._index) + sum(1 for k in (self._extra or ()) if k not in self._index)
+
+    def __repr__(self):
+        return f"LazyRow({dict(self)!r})"
+
+
+def _column_index(description) -> dict:
+    # last occurrence wins for duplicate names, the same as dict(sqlite3.Row) did
+    return {col[0]: i for i, col in enumerate(description or ())}
+
+
 class DictCursor:
     """
-    Wrap sqlite cursor so fetchone()/fetchall() return dicts.
-    This keeps your existing code working (row.get(...), etc.)
+    Wrap sqlite cursor so fetchone()/fetchall()/fetchmany() return dict-like LazyRow views.
+    This keeps your existing code working (row.get(...), row["..."], etc.)
     """
     def __init__(self, cur):
         self._cur = cur
+        cur.row_factory = None   # plain tuples; LazyRow does the name lookups
+        self._index = None
 
     def execute(self, sql, params=()):
+        self._index = None
         return self._cur.execute(sql, params)
 
     def executemany(self, sql, seq_of_params):
+        self._index = None
         return self._cur.executemany(sql, seq_of_params)
 
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    def _columns(self):
+        if self._index is None:
+            self._index = _column_index(self._cur.description)
+        return self._index
+
     def fetchone(self):
         row = self._cur.fetchone()
-        return dict(row) if row is not None else None
+        return LazyRow(row, self._columns()) if row is not None else None
 
     def fetchall(self):
-        rows = self._cur.fetchall()
-        return [dict(r) for r in rows]
+        index = self._columns()
+        return [LazyRow(r, index) for r in self._cur.fetchall()]
+
+    def fetchmany(self, size=None):
+        index = self._columns()
+        rows = self._cur.fetchmany(self._cur.arraysize if size is None else size)
+        return [LazyRow(r, index) for r in rows]
+
+    def iter_rows(self, batch_size=256):
+        """
+        Streams the current result set in fetchmany() batches instead of materializing it.
+        Don't execute() on the same cursor while iterating.
+        """
+        while True:
+            batch = self.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    def __iter__(self):
+        return self.iter_rows()
 
     def close(self):
         return self._cur.close()
 
 
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of long-lived SQLite connections.
+    - Idle connections are handed out LIFO (the most recently used one is the warmest).
+    - At most max_size connections exist; extra callers wait up to `timeout` seconds.
+    - A connection idle for longer than health_check_interval is probed with SELECT 1
+      before reuse and replaced if the probe fails.
+    """
+    def __init__(self, connect, max_size=8, timeout=10.0, health_check_interval=30.0):
+        self._connect = connect
+        self.max_size = max(1, int(max_size))
+        self.timeout = float(timeout)
+        self.health_check_interval = float(health_check_interval)
+
+        self._cond = threading.Condition()
+        self._idle = []      # [(conn, released_at)]
+        self._size = 0       # open connections (idle + checked out)
+        self._in_use = 0
+        self._counters = {
+            "created": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "request_reuses": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "health_check_failures": 0,
+            "discarded": 0,}
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._counters["created"] += 1
+        return conn
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        deadline = monotonic() + self.timeout
+        with self._cond:
+            self._counters["checkouts"] += 1
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(f"No free database connection after {self.timeout:.1f}s.")
+                self._counters["waits"] += 1
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            if not self._idle:
+                self._size += 1
+                conn, released_at = None, None
+            else:
+                conn, released_at = self._idle.pop()
+
+        if conn is None:
+            return self._open()
+
+        if monotonic() - released_at >= self.health_check_interval and not self._is_healthy(conn):
+            with self._cond:
+                self._counters["health_check_failures"] += 1
+                self._counters["discarded"] += 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+            return self._open()  # the discarded connection's slot is reused
+
+        with self._cond:
+            self._counters["reused"] += 1
+        return conn
+
+    def release(self, conn):
+        """Return a connection; any transaction left open by the caller is rolled back."""
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            broken = True
+
+        with self._cond:
+            self._in_use -= 1
+            if broken:
+                self._size -= 1
+                self._counters["discarded"] += 1
+            else:
+                self._idle.append((conn, monotonic()))
+            self._cond.notify()
+
+        if broken:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def record_request_reuse(self):
+        with self._cond:
+            self._counters["request_reuses"] += 1
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self._counters)
+            out.update({
+                "max_size": self.max_size,
+                "open": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),})
+        return out
+
+
+# -----------------------------
+# Storage profile (PRAGMAs)
+# -----------------------------
+STORAGE_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "wal_autocheckpoint",
+    "journal_size_limit",)
+
+
+def apply_storage_profile(conn, profile: dict):
+    """Applies DB_STORAGE_PROFILE to a fresh connection. Unknown keys are rejected."""
+    for name, value in profile.items():
+        if name not in STORAGE_PRAGMAS:
+            raise ValueError(f"Unsupported storage pragma: {name}")
+        value = str(value).strip()
+        if not value.lstrip("-").isalnum():
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value}")
+        conn.execute(f"PRAGMA {name} = {value};")
+
+
 def get_db_connection():
-    os.makedirs(app.instance_path, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    """Opens a NEW configured connection (used by the pool; routes use db_cursor/db_transaction)."""
+    profile = app.config["DB_STORAGE_PROFILE"]
+    busy_ms = int(profile.get("busy_timeout", 5000))
+    conn = sqlite3.connect(DB_PATH, timeout=busy_ms / 1000.0, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON;")
+    apply_storage_profile(conn, profile)
     return conn
 
 
+_checkpoint_lock = threading.Lock()
+_checkpoint_state = {"commits_since": 0, "runs": 0, "last": None}
+
+
+def checkpoint_db(conn, mode="PASSIVE") -> dict:
+    """
+    Runs a WAL checkpoint. PASSIVE never blocks readers/writers; TRUNCATE (e.g. before a backup)
+    waits for readers and resets the -wal file to zero bytes.
+    """
+    mode = (mode or "PASSIVE").upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Invalid checkpoint mode: {mode}")
+    busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+    result = {
+        "mode": mode,
+        "busy": bool(busy),
+        "wal_frames": log_frames,
+        "checkpointed_frames": checkpointed,
+        "at": datetime.now().isoformat(timespec="seconds"),}
+    with _checkpoint_lock:
+        _checkpoint_state["runs"] += 1
+        _checkpoint_state["last"] = result
+    return result
+
+
+def _note_commit(conn):
+    """Checkpoint policy: every DB_CHECKPOINT_EVERY_COMMITS commits, run a PASSIVE checkpoint."""
+    every = int(app.config.get("DB_CHECKPOINT_EVERY_COMMITS") or 0)
+    if every <= 0:
+        return
+    with _checkpoint_lock:
+        _checkpoint_state["commits_since"] += 1
+        if _checkpoint_state["commits_since"] < every:
+            return
+        _checkpoint_state["commits_since"] = 0
+    try:
+        checkpoint_db(conn, "PASSIVE")
+    except sqlite3.Error as e:
+        print("WAL checkpoint failed:", e)
+
+
+def get_storage_settings(conn) -> dict:
+    """Reads back the ACTIVE pragma values (not the configured ones) + checkpoint stats."""
+    settings = {}
+    for name in STORAGE_PRAGMAS:
+        row = conn.execute(f"PRAGMA {name};").fetchone()
+        settings[name] = row[0] if row else None
+    with _checkpoint_lock:
+        settings["checkpoint"] = {
+            "every_commits": app.config.get("DB_CHECKPOINT_EVERY_COMMITS"),
+            "commits_since_last": _checkpoint_state["commits_since"],
+            "runs": _checkpoint_state["runs"],
+            "last": _checkpoint_state["last"],}
+    return settings
+
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool() -> ConnectionPool:
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                os.makedirs(app.instance_path, exist_ok=True)
+                pool = ConnectionPool(
+                    get_db_connection,
+                    max_size=app.config["DB_POOL_SIZE"],
+                    timeout=app.config["DB_POOL_TIMEOUT"],
+                    health_check_interval=app.config["DB_POOL_HEALTH_CHECK_INTERVAL"],)
+                if app.config["DB_AUTO_BOOTSTRAP"] and not os.path.exists(DB_PATH):
+                    bootstrap_database(DB_PATH)
+                conn = pool.acquire()
+                try:
+                    apply_migrations(conn)
+                finally:
+                    pool.release(conn)
+                _db_pool = pool
+    return _db_pool
+
+
+def _acquire_connection():
+    """
+    Inside a request the first connection is pinned to flask.g and reused by every
+    following db_cursor()/db_transaction() of that request. A nested call (while the
+    pinned connection is busy) gets its own pooled connection, so transactions never mix.
+    """
+    pool = get_db_pool()
+    if not has_request_context():
+        return pool.acquire()
+
+    pinned = g.get("_db_conn")
+    if pinned is not None and not g.get("_db_conn_busy"):
+        g._db_conn_busy = True
+        pool.record_request_reuse()
+        return pinned
+
+    conn = pool.acquire()
+    if pinned is None:
+        g._db_conn = conn
+        g._db_conn_busy = True
+    return conn
+
+
+def _release_connection(conn):
+    if has_request_context() and g.get("_db_conn") is conn:
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            g.pop("_db_conn", None)
+            get_db_pool().release(conn)
+        g._db_conn_busy = False
+        return
+    get_db_pool().release(conn)
+
+
+@app.teardown_appcontext
+def release_request_connection(exc):
+    conn = g.pop("_db_conn", None)
+    g.pop("_db_conn_busy", None)
+    if conn is not None:
+        get_db_pool().release(conn)
+
+
 @contextmanager
 def db_cursor(dictionary=True):
     conn = None
     cursor = None
     try:
-        conn = get_db_connection()
+        conn = _acquire_connection()
         raw_cursor = conn.cursor()
         cursor = DictCursor(raw_cursor) if dictionary else raw_cursor
         yield conn, cursor
@@ -72,18 +506,22 @@ def db_cursor(dictionary=True):
         try:
             if cursor:
                 cursor.close()
-            if conn:
-                conn.close()
         except Exception:
             pass
+        if conn:
+            _release_connection(conn)
 
 
 @contextmanager
 def db_transaction(dictionary=True):
     with db_cursor(dictionary=dictionary) as (conn, cursor):
+        # Take the write lock up front: a deferred read->write upgrade fails immediately with
+        # SQLITE_BUSY under WAL, while BEGIN IMMEDIATE waits up to busy_timeout instead.
+        conn.execute("BEGIN IMMEDIATE")
         try:
             yield conn, cursor
             conn.commit()
+            _note_commit(conn)
         except Exception:
             try:
                 conn.rollback()
@@ -92,6 +530,527 @@ def db_transaction(dictionary=True):
             raise
 
 
+# -----------------------------
+# Schema migrations + bootstrap
+# -----------------------------
+# migrations/NNNN_name.sql are applied in version order, each in its own transaction.
+# The applied version lives in PRAGMA user_version (one header read at startup) and every
+# applied migration is logged in Schema_Migrations.
+MIGRATIONS_DIR = os.path.join(app.root_path, "migrations")
+SEED_SQL_PATH = os.path.join(app.root_path, "FLYTAU15.sql")
+SEED_END_MARKER = "-- REPORT QUERIES"   # FLYTAU15.sql: everything below is reference queries only
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS Schema_Migrations (
+        Version INTEGER PRIMARY KEY,
+        Name TEXT NOT NULL,
+        Applied_At TEXT NOT NULL,
+        Duration_Ms REAL
+    )
+"""
+
+
+def split_sql_script(text: str) -> list:
+    """Splits a SQL script into complete statements (a CREATE TRIGGER ... END; stays whole)."""
+    statements, buf = [], []
+    for line in text.splitlines(keepends=True):
+        buf.append(line)
+        if ";" not in line:
+            continue
+        chunk = "".join(buf)
+        if sqlite3.complete_statement(chunk):
+            statements.append(chunk.strip())
+            buf = []
+    rest = "".join(buf).strip()
+    if rest and any(l.strip() and not l.strip().startswith("--") for l in rest.splitlines()):
+        raise ValueError(f"Incomplete SQL statement at end of script: {rest[:80]!r}")
+    return statements
+
+
+def read_seed_script(path=SEED_SQL_PATH) -> str:
+    """FLYTAU15.sql up to SEED_END_MARKER (schema + seed data, without the report queries)."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    cut = text.find(SEED_END_MARKER)
+    return text if cut < 0 else text[:cut]
+
+
+def list_migrations(directory=MIGRATIONS_DIR) -> list:
+    """[(version, name, path)] sorted by version, from file names like 0002_add_something.sql."""
+    if not os.path.isdir(directory):
+        return []
+    found = {}
+    for fname in os.listdir(directory):
+        prefix, _, rest = fname.partition("_")
+        if not fname.endswith(".sql") or not prefix.isdigit():
+            continue
+        version = int(prefix)
+        if version in found:
+            raise ValueError(f"Duplicate migration version {version}: {found[version][1]}, {fname}")
+        found[version] = (version, rest[:-len(".sql")] or fname, os.path.join(directory, fname))
+    return [found[v] for v in sorted(found)]
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def apply_migrations(conn, migrations=None) -> list:
+    """
+    Applies every migration newer than PRAGMA user_version and returns the applied versions.
+    Each runs under BEGIN IMMEDIATE and re-checks the version inside the lock, so workers that
+    start together apply it exactly once. A database without the base schema is left alone.
+    """
+    migrations = list_migrations() if migrations is None else migrations
+    if not migrations or get_schema_version(conn) >= migrations[-1][0]:
+        return []
+    has_schema = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Flight'").fetchone()
+    if not has_schema:
+        return []
+
+    applied = []
+    for version, name, path in migrations:
+        with open(path, encoding="utf-8") as f:
+            statements = split_sql_script(f.read())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            started = monotonic()
+            conn.execute(SCHEMA_MIGRATIONS_DDL)
+            for stmt in statements:
+                conn.execute(stmt)
+            conn.execute(
+                "INSERT INTO Schema_Migrations (Version, Name, Applied_At, Duration_Ms) VALUES (?, ?, ?, ?)",
+                (version, name, datetime.now().isoformat(timespec="seconds"),
+                 round((monotonic() - started) * 1000, 1)))
+            conn.execute(f"PRAGMA user_version = {int(version)};")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    if applied:
+        # planner statistics, so partial/secondary indexes win over PK-prefix scans
+        conn.execute("ANALYZE")
+    return applied
+
+
+def bootstrap_database(db_path=None, seed_path=SEED_SQL_PATH, force=False) -> dict:
+    """
+    Builds a new database from FLYTAU15.sql and brings it to the latest migration.
+    - The seed is loaded in ONE transaction with journaling/fsync off and FK checks deferred
+      to a single PRAGMA foreign_key_check at the end (the file is scratch until it's done).
+    - Secondary indexes come from the migrations, so they are built once over the loaded data
+      instead of being maintained row by row.
+    - The file is built next to the target and linked into place, so other workers never open a
+      half-loaded database; if another worker won the race its database is kept.
+    """
+    db_path = db_path or DB_PATH
+    if os.path.exists(db_path) and not force:
+        raise FileExistsError(f"{db_path} already exists (init-db --force rebuilds it).")
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    started = monotonic()
+    statements = split_sql_script(read_seed_script(seed_path))
+    tmp_path = f"{db_path}.bootstrap-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF;")
+        conn.execute("PRAGMA synchronous = OFF;")
+        conn.execute("PRAGMA foreign_keys = OFF;")
+        conn.execute("PRAGMA temp_store = memory;")
+        conn.execute("PRAGMA cache_size = -65536;")
+
+        conn.execute("BEGIN")
+        for stmt in statements:
+            conn.execute(stmt)
+        conn.execute("COMMIT")
+        seed_ms = (monotonic() - started) * 1000
+
+        problems = conn.execute("PRAGMA foreign_key_check;").fetchall()
+        if problems:
+            raise sqlite3.IntegrityError(
+                f"Seed data violates {len(problems)} foreign key(s), first: {tuple(problems[0])}")
+
+        migrated = apply_migrations(conn)
+        version = get_schema_version(conn)
+        conn.close()
+    except Exception:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+
+    if force:
+        # a stale -wal next to the new file would be replayed on top of it
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        os.replace(tmp_path, db_path)
+    else:
+        try:
+            os.link(tmp_path, db_path)
+        except FileExistsError:
+            pass
+        os.remove(tmp_path)
+
+    return {
+        "path": db_path,
+        "statements": len(statements),
+        "seed_ms": round(seed_ms, 1),
+        "total_ms": round((monotonic() - started) * 1000, 1),
+        "migrations": migrated,
+        "schema_version": version,}
+
+
+def get_schema_info(conn) -> dict:
+    """Current schema version, what's pending on disk, and the migration log (for /db-check)."""
+    version = get_schema_version(conn)
+    history = []
+    if conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Schema_Migrations'").fetchone():
+        history = [dict(r) for r in conn.execute(
+            "SELECT Version, Name, Applied_At, Duration_Ms FROM Schema_Migrations ORDER BY Version")]
+    return {
+        "version": version,
+        "pending": [v for v, _, _ in list_migrations() if v > version],
+        "history": history,}
+
+
+class IdAllocator:
+    """
+    Ids from one Id_Sequences row (see allocate_ids).
+    - block_size == 1: every id is taken inside the caller's write transaction.
+    - block_size > 1: prefetch() reserves a block per process in its own short transaction
+      (call it BEFORE opening the write transaction), then next_id() is a memory operation.
+      Ids left in a block when the process exits are skipped: gaps, never collisions.
+    """
+    def __init__(self, name, block_size=1):
+        self.name = name
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0      # block is [_next, _end)
+        self._counters = {"from_block": 0, "in_transaction": 0, "blocks": 0}
+
+    def prefetch(self):
+        if self.block_size <= 1:
+            return
+        with self._lock:
+            if self._next < self._end:
+                return
+        with db_transaction() as (_, cursor):
+            start = allocate_ids(cursor, self.name, self.block_size)
+        with self._lock:
+            self._counters["blocks"] += 1
+            if self._next >= self._end:
+                self._next, self._end = start, start + self.block_size
+            # else another thread refilled first; this block is skipped
+
+    def next_id(self, cursor) -> int:
+        with self._lock:
+            if self._next < self._end:
+                self._next += 1
+                self._counters["from_block"] += 1
+                return self._next - 1
+            self._counters["in_transaction"] += 1
+        return allocate_ids(cursor, self.name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+            out.update({"block_size": self.block_size, "left_in_block": self._end - self._next})
+        return out
+
+
+order_ids = IdAllocator("Orders", block_size=app.config["ORDER_ID_BLOCK_SIZE"])
+
+
+# ======================================================
+# REFERENCE DATA CACHE (Airports / Routes)
+# ======================================================
+REFERENCE_DATA_VERSION_SQL = """
+    SELECT Name, Version
+    FROM Reference_Data_Version
+    WHERE Name IN ('Airports', 'Routes')
+    ORDER BY Name
+"""
+
+AIRPORTS_SQL = """
+    SELECT Airport_ID, Airport_Name, City, Country
+    FROM Airports
+    ORDER BY Country, City, Airport_Name
+"""
+
+ROUTES_SQL = "SELECT Origin_Airport, Destination_Airport, Duration_Minutes FROM Routes"
+
+# <option> label formats used by the dropdowns
+AIRPORT_LABELS = {
+    "country": lambda a: f"{a['Country']} - {a['City']} ({a['Airport_Name']})",
+    "name": lambda a: f"{a['Airport_Name']} ({a['City']}, {a['Country']})",}
+
+
+class ReferenceDataCache:
+    """
+    Airports and Routes, read once and shared by every request (they only change when the
+    seed data is edited).
+    - Freshness: Reference_Data_Version is bumped by triggers on both tables (migration 0008);
+      the stamp is re-read at most every check_interval seconds and a moved stamp reloads
+      everything. (PRAGMA data_version is per connection, so it can't be shared across the pool.)
+    - Snapshots are immutable: readers never take the lock, a reload swaps the whole snapshot.
+    - The airport <option> list is pre-rendered per label format; airport_options() only
+      marks the selected one.
+    """
+    def __init__(self, check_interval=5.0):
+        self.check_interval = float(check_interval)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._counters = {"loads": 0, "checks": 0, "reads": 0}
+
+    def _load(self, cursor, version) -> dict:
+        cursor.execute(AIRPORTS_SQL)
+        airports = tuple(dict(r) for r in cursor.fetchall())
+        cursor.execute(ROUTES_SQL)
+        routes = {
+            (int(r["Origin_Airport"]), int(r["Destination_Airport"])): r["Duration_Minutes"]
+            for r in cursor.fetchall()}
+
+        options = {}
+        for style, label in AIRPORT_LABELS.items():
+            options[style] = tuple(
+                (str(a["Airport_ID"]), f'<option value="{escape(a["Airport_ID"])}"', f">{escape(label(a))}</option>")
+                for a in airports)
+
+        self._counters["loads"] += 1
+        return {
+            "version": version,
+            "loaded_at": datetime.now().isoformat(timespec="seconds"),
+            "airports": airports,
+            "airports_by_id": {int(a["Airport_ID"]): a for a in airports},
+            "routes": routes,
+            "options": options,}
+
+    def _current(self) -> dict:
+        snap = self._snapshot
+        if snap is not None and monotonic() - self._checked_at < self.check_interval:
+            self._counters["reads"] += 1
+            return snap
+
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and monotonic() - self._checked_at < self.check_interval:
+                return snap
+            with db_cursor() as (_, cursor):
+                cursor.execute(REFERENCE_DATA_VERSION_SQL)
+                version = tuple((r["Name"], r["Version"]) for r in cursor.fetchall())
+                self._counters["checks"] += 1
+                if snap is None or snap["version"] != version:
+                    snap = self._load(cursor, version)
+            self._snapshot = snap
+            self._checked_at = monotonic()
+        return snap
+
+    def preload(self):
+        if self._snapshot is None:
+            self._current()
+
+    def invalidate(self):
+        """Forces a stamp check on the next read (writes through the app already bump the stamp)."""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def airports(self):
+        """All airports ordered by Country, City, Airport_Name (read-only dicts)."""
+        return self._current()["airports"]
+
+    def airport(self, airport_id):
+        try:
+            return self._current()["airports_by_id"].get(int(airport_id))
+        except (TypeError, ValueError):
+            return None
+
+    def routes(self) -> dict:
+        """(origin_id, destination_id) -> duration in minutes."""
+        return self._current()["routes"]
+
+    def route_duration(self, origin_id, dest_id):
+        try:
+            return self.routes().get((int(origin_id), int(dest_id)))
+        except (TypeError, ValueError):
+            return None
+
+    def airport_options(self, selected=None, label="country") -> Markup:
+        """Pre-rendered <option> elements for every airport, `selected` (an id) marked."""
+        selected = "" if selected is None else str(selected)
+        return Markup("\n".join(
+            f"{head} selected{tail}" if airport_id == selected else head + tail
+            for airport_id, head, tail in self._current()["options"][label]))
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        out = dict(self._counters)
+        out["check_interval"] = self.check_interval
+        if snap is not None:
+            out.update({
+                "version": dict(snap["version"]),
+                "loaded_at": snap["loaded_at"],
+                "airports": len(snap["airports"]),
+                "routes": len(snap["routes"]),})
+        return out
+
+
+reference_data = ReferenceDataCache(check_interval=app.config["REFERENCE_DATA_CHECK_INTERVAL"])
+app.add_template_global(reference_data.airport_options, name="airport_options")
+
+
+# ======================================================
+# FLIGHT STATUS LIFECYCLE (active/full -> done, off the request path)
+# ======================================================
+# Earliest departure that still has to be marked 'done' (idx_flight_open_departure).
+# Times are compared in SQLite's clock, the same one update_flight_statuses_done_if_past uses.
+NEXT_STATUS_TRANSITION_SQL = """
+    SELECT
+        Flight_ID,
+        Departure_Date || ' ' || Departure_Time AS departs_at,
+        (julianday(Departure_Date || ' ' || Departure_Time) - julianday('now')) * 86400.0 AS seconds_until
+    FROM Flight
+    WHERE Flight_Status IN ('active','full')
+    ORDER BY Departure_Date, Departure_Time
+    LIMIT 1
+"""
+
+
+class FlightStatusService:
+    """
+    Marks departed flights 'done' in a background thread instead of inside page requests
+    (and, on the same timer, deletes expired Seat_Holds).
+    - The thread sleeps until the next departure (capped at max_interval) and then sweeps
+      in batches of batch_size, one short write transaction per batch.
+    - wake() makes it re-plan right away, e.g. after a flight departing sooner was created.
+    """
+    def __init__(self, batch_size=200, max_interval=60.0):
+        self.batch_size = max(1, int(batch_size))
+        self.max_interval = float(max_interval)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._state = {
+            "runs": 0,
+            "last_run_at": None,
+            "last_run_ms": None,
+            "last_marked": 0,
+            "total_marked": 0,
+            "holds_swept": 0,
+            "last_error": None,
+            "next_transition": None,
+            "next_run_in": None,}
+
+    def start(self) -> bool:
+        if self._thread is not None:
+            return False
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._thread = threading.Thread(target=self._run, name="flight-status-sweeper", daemon=True)
+            self._thread.start()
+        return True
+
+    def wake(self):
+        self._wake.set()
+
+    def run_once(self) -> int:
+        """One sweep: marks every departed active/full flight 'done', batch by batch."""
+        started = monotonic()
+        marked = 0
+        while True:
+            with db_transaction() as (_, cursor):
+                n = update_flight_statuses_done_if_past(cursor, limit=self.batch_size)
+            marked += n
+            if n < self.batch_size:
+                break
+        if marked:
+            search_cache.clear()  # departed flights leave the public results
+
+        # housekeeping on the same timer: expired seat holds are dead rows
+        holds_swept = 0
+        while True:
+            with db_transaction() as (_, cursor):
+                n = sweep_expired_seat_holds(cursor, datetime.now().timestamp(), limit=self.batch_size)
+            holds_swept += n
+            if n < self.batch_size:
+                break
+
+        with db_cursor() as (_, cursor):
+            cursor.execute(NEXT_STATUS_TRANSITION_SQL)
+            nxt = cursor.fetchone()
+
+        with self._lock:
+            self._state["holds_swept"] += holds_swept
+            self._state["runs"] += 1
+            self._state["last_run_at"] = datetime.now().isoformat(timespec="seconds")
+            self._state["last_run_ms"] = round((monotonic() - started) * 1000, 1)
+            self._state["last_marked"] = marked
+            self._state["total_marked"] += marked
+            self._state["last_error"] = None
+            self._state["next_transition"] = (
+                {"flight_id": nxt["Flight_ID"], "departs_at": nxt["departs_at"]} if nxt else None)
+            self._state["next_run_in"] = self._delay_until(nxt)
+        return marked
+
+    def _delay_until(self, nxt) -> float:
+        if nxt is None or nxt["seconds_until"] is None:
+            return self.max_interval
+        return round(min(self.max_interval, max(1.0, float(nxt["seconds_until"]) + 1.0)), 1)
+
+    def _run(self):
+        while True:
+            try:
+                self.run_once()
+                with self._lock:
+                    delay = self._state["next_run_in"]
+            except Exception as e:
+                print("Flight status sweep failed:", e)
+                with self._lock:
+                    self._state["last_error"] = str(e)
+                delay = self.max_interval
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def stats(self, cursor=None) -> dict:
+        """
+        Last run + lag. Lag is how long the earliest departed-but-still-open flight has been
+        waiting for its 'done' (0 when nothing is overdue).
+        """
+        with self._lock:
+            out = dict(self._state)
+        out["running"] = self._thread is not None and self._thread.is_alive()
+        if cursor is not None:
+            cursor.execute(NEXT_STATUS_TRANSITION_SQL)
+            nxt = cursor.fetchone()
+            overdue = -float(nxt["seconds_until"]) if nxt and nxt["seconds_until"] is not None else 0.0
+            out["lag_seconds"] = round(max(0.0, overdue), 1)
+        return out
+
+
+flight_status_service = FlightStatusService(
+    batch_size=app.config["FLIGHT_STATUS_SWEEP_BATCH"],
+    max_interval=app.config["FLIGHT_STATUS_SWEEP_INTERVAL"],)
+
+
+@app.before_request
+def start_background_services():
+    if app.config["FLIGHT_STATUS_SWEEP_ENABLED"]:
+        flight_status_service.start()
+    reference_data.preload()
+
+
 class BookingConflict(Exception):
     pass
 
@@ -125,6 +1084,45 @@ def get_order_owner_email():
     return False, session.get("guest_email_address")
 
 
+def seat_hold_token():
+    """Per-session token that owns this customer's Seat_Holds rows."""
+    token = session.get("seat_hold_token")
+    if not token:
+        token = secrets.token_hex(16)
+        session["seat_hold_token"] = token
+    return token
+
+
+def page_size(config_key: str) -> int:
+    """Rows per page: ?per_page= clamped to [1, MAX_PAGE_SIZE], else app.config[config_key]."""
+    default = int(app.config[config_key])
+    try:
+        n = int(request.args.get("per_page") or default)
+    except ValueError:
+        n = default
+    return max(1, min(n, int(app.config["MAX_PAGE_SIZE"])))
+
+
+def encode_page_cursor(departure_date, departure_time, row_id) -> str:
+    """Keyset cursor of the last row shown: 'YYYY-MM-DD_HH:MM:SS_ID' (stable, URL-friendly)."""
+    return f"{departure_date}_{departure_time}_{int(row_id)}"
+
+
+def decode_page_cursor(value):
+    """(departure_date, departure_time, id) from ?after=, or None when missing/malformed."""
+    parts = (value or "").strip().split("_")
+    if len(parts) != 3:
+        return None
+    departure_date, departure_time, row_id = parts
+    try:
+        datetime.strptime(departure_date, "%Y-%m-%d")
+        if not all(p.isdigit() for p in departure_time.split(":")):
+            return None
+        return departure_date, departure_time, int(row_id)
+    except ValueError:
+        return None
+
+
 def can_cancel(departure_date, departure_time):
     """Allowed only if flight departure is >= now + 36 hours."""
     if not departure_date or departure_time is None:
@@ -164,69 +1162,14 @@ def normalize_time_to_hhmmss(value: str) -> str:
 
 def plane_has_business(cursor, plane_id: int) -> bool:
     """
-    Returns True iff the plane has at least one Business seat in Seats table.
+    Returns True iff the plane has at least one Business seat (Plane_Capacity.Has_Business).
     This is the ONLY definition for "large plane" / business availability.
     """
-    cursor.execute(
-        """
-        SELECT 1
-        FROM Seats
-        WHERE Plane_ID = ?
-          AND LOWER(Class) = 'business'
-        LIMIT 1
-        """,
-        (int(plane_id),),)
-    return cursor.fetchone() is not None
+    return plane_is_large(cursor, int(plane_id))
 
 
 def next_order_id(cursor) -> int:
-    cursor.execute("SELECT COALESCE(MAX(Unique_Order_ID), 9000) + 1 AS next_id FROM Orders")
-    return int(cursor.fetchone()["next_id"])
-
-
-def fetch_flight_prices(flight_id: int):
-    with db_cursor() as (_, cursor):
-        cursor.execute("""
-            SELECT Economy_Price, Business_Price
-            FROM Flight
-            WHERE Flight_ID = ?
-            LIMIT 1
-        """, (flight_id,))
-        row = cursor.fetchone()
-        if not row:
-            return {"Economy": 0.0, "Business": 0.0}
-        return {
-            "Economy": float(row["Economy_Price"]),
-            "Business": float(row["Business_Price"]),}
-
-
-def infer_order_ticket_class(unique_order_id: int):
-    """Determines ticket class ("Economy" or "Business") based on occupied seats, default Economy."""
-    with db_cursor() as (_, cursor):
-        cursor.execute("""
-            SELECT s.Class AS ticket_class
-            FROM Selected_Seats ss
-            JOIN Seats s
-              ON s.Plane_ID = ss.Plane_ID
-             AND s.Row_Num = ss.Row_Num
-             AND s.Column_Number = ss.Column_Number
-            WHERE ss.Unique_Order_ID = ?
-              AND ss.Is_Occupied = 1
-            LIMIT 1
-        """, (unique_order_id,))
-        row = cursor.fetchone()
-
-    tc = (row["ticket_class"] if row and row.get("ticket_class") else "Economy")
-    tc = str(tc).strip()
-    return tc if tc in ("Economy", "Business") else "Economy"
-
-
-def compute_order_original_total(unique_order_id: int, flight_id: int, qty: int):
-    """Calculates original total price: qty * price of inferred class."""
-    ticket_class = infer_order_ticket_class(unique_order_id)
-    prices = fetch_flight_prices(flight_id)
-    price = float(prices.get(ticket_class, 0.0))
-    return round(int(qty) * price, 2)
+    return order_ids.next_id(cursor)
 
 
 def compute_display_total(order_status: str, original_total: float):
@@ -251,7 +1194,7 @@ def refresh_session_timeout():
 @app.route("/db-check")
 def db_check():
     try:
-        with db_cursor() as (_, cursor):
+        with db_cursor() as (conn, cursor):
             # SQLite doesn't have DATABASE() / SHOW TABLES
             cursor.execute("PRAGMA database_list;")
             db_info = cursor.fetchone() or {}
@@ -267,8 +1210,33 @@ def db_check():
 
             cursor.execute("SELECT COUNT(*) AS cnt FROM Airports;")
             airports_cnt = cursor.fetchone()["cnt"]
+            storage = get_storage_settings(conn)
+            schema = get_schema_info(conn)
+            flight_status = flight_status_service.stats(cursor)
+            seat_cache = seat_occupancy.stats()
+            id_allocation = {"orders": order_ids.stats()}
+            reference = reference_data.stats()
+            search = search_cache.stats()
+            itineraries = itinerary_index.stats()
+            crew_availability = availability.stats()
+            if request.args.get("verify_seats"):
+                seat_cache["consistency"] = seat_occupancy.check_consistency(cursor)
 
-        return {"ok": True, "database": db, "tables_count": len(tables), "airports_count": airports_cnt}
+        return {
+            "ok": True,
+            "database": db,
+            "tables_count": len(tables),
+            "airports_count": airports_cnt,
+            "pool": get_db_pool().stats(),
+            "storage": storage,
+            "schema": schema,
+            "flight_status": flight_status,
+            "seat_cache": seat_cache,
+            "id_allocation": id_allocation,
+            "reference_data": reference,
+            "search_cache": search,
+            "itineraries": itineraries,
+            "availability": crew_availability}
 
     except Exception as e:
         return {"ok": False, "error": str(e)}, 500
@@ -287,12 +1255,7 @@ def home_page():
 
     airports = []
     try:
-        with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT Airport_ID, Airport_Name, City, Country
-                FROM Airports
-                ORDER BY Country, City, Airport_Name """)
-            airports = cursor.fetchall()
+        airports = reference_data.airports()
     except Exception as e:
         flash(f"Database error loading airports: {e}", "error")
 
@@ -493,6 +1456,269 @@ def guest_search():
 # =============================
 # AVAILABLE FLIGHTS
 # =============================
+def build_flight_search_query(origin_id, destination_id, start_date, end_date, public_only=True):
+    """Returns (sql, params) for the flight search page (public_only hides non-active/past flights)."""
+    sql = """
+        SELECT
+            f.Flight_ID,
+            f.Plane_ID,
+            f.Departure_Date,
+            f.Departure_Time,
+            f.Economy_Price,
+            f.Business_Price,
+            f.Flight_Status,
+
+            ao.Airport_Name AS origin_airport_name,
+            ao.City AS origin_city,
+            ao.Country AS origin_country,
+
+            ad.Airport_Name AS dest_airport_name,
+            ad.City AS dest_city,
+            ad.Country AS dest_country,
+
+            COALESCE(pc.Has_Business, 0) AS has_business
+
+        FROM Flight f
+        JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
+        JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+        LEFT JOIN Plane_Capacity pc ON pc.Plane_ID = f.Plane_ID
+        WHERE 1=1
+    """
+    params = []
+
+    if public_only:
+        sql += """
+            AND f.Flight_Status = 'active'
+            AND f.Departure_Date >= DATE('now')
+            AND (
+                f.Departure_Date > DATE('now')
+                OR f.Departure_Time > TIME('now')) """
+
+    if origin_id:
+        sql += " AND f.Origin_Airport = ?"
+        params.append(origin_id)
+
+    if destination_id:
+        sql += " AND f.Destination_Airport = ?"
+        params.append(destination_id)
+
+    if start_date and end_date:
+        sql += " AND f.Departure_Date BETWEEN ? AND ?"
+        params.extend([start_date, end_date])
+    elif start_date:
+        sql += " AND f.Departure_Date >= ?"
+        params.append(start_date)
+    elif end_date:
+        sql += " AND f.Departure_Date <= ?"
+        params.append(end_date)
+
+    sql += " ORDER BY f.Departure_Date, f.Departure_Time"
+    return sql, tuple(params)
+
+
+def fare_calendar_sql(public_only=True) -> str:
+    """
+    Cheapest economy/business fare per departure day of one route over [start, end].
+    One grouped pass over idx_flight_route_departure (already in Departure_Date order).
+    Business fares only count on planes that have a business cabin, like the search page.
+    """
+    sql = """
+        SELECT
+            f.Departure_Date AS day,
+            MIN(f.Economy_Price) AS min_economy,
+            MIN(CASE WHEN pc.Has_Business = 1 THEN f.Business_Price END) AS min_business,
+            COUNT(*) AS flights,
+            GROUP_CONCAT(f.Flight_ID) AS flight_ids
+        FROM Flight f
+        LEFT JOIN Plane_Capacity pc ON pc.Plane_ID = f.Plane_ID
+        WHERE f.Origin_Airport = ?
+          AND f.Destination_Airport = ?
+          AND f.Departure_Date BETWEEN ? AND ?
+    """
+    if public_only:
+        sql += """
+          AND f.Flight_Status = 'active'
+          AND (
+              f.Departure_Date > DATE('now')
+              OR f.Departure_Time > TIME('now')) """
+    return sql + " GROUP BY f.Departure_Date ORDER BY f.Departure_Date"
+
+
+# data version a cached search was loaded under (ETag of /api/flights), read before the search
+SEARCH_VERSION_SQL = """
+    SELECT Name, Version
+    FROM Reference_Data_Version
+    WHERE Name IN ('Flight', 'Airports')
+"""
+
+
+def search_data_version(cursor) -> str:
+    """Current 'flight.airports' stamp pair (two PK reads): the data version of search results."""
+    cursor.execute(SEARCH_VERSION_SQL)
+    stamps = {r["Name"]: r["Version"] for r in cursor.fetchall()}
+    return f"{stamps.get('Flight', 0)}.{stamps.get('Airports', 0)}"
+
+
+# what a flight looks like to the search cache (PK lookup, see SearchResultCache.sync_flight)
+FLIGHT_SEARCH_FACTS_SQL = """
+    SELECT Origin_Airport, Destination_Airport, Departure_Date, Flight_Status
+    FROM Flight
+    WHERE Flight_ID = ?
+"""
+
+
+class SearchResultCache:
+    """
+    Results of public flight searches, keyed by the normalized (kind, origin, destination,
+    start_date, end_date), bounded LRU with a ttl.
+    - kind "search" is the flight list (build_flight_search_query(public_only=True)),
+      kind "fares" the per-day fare calendar (fare_calendar_sql()).
+    - A hit is served from memory; a miss runs the query.
+    - Writers call sync_flight(flight_id) AFTER their commit. A flight that is now searchable
+      but missing from cached results drops the entries whose key covers its route/date;
+      a cached flight that is no longer 'active' drops the entries holding it. Bookings
+      that don't flip the status don't touch the cache.
+    - Like the seat cache, a load that raced an invalidation is not stored, and the ttl
+      bounds staleness from other worker processes.
+    - Every entry carries the Flight/Airports version stamps (migrations 0008/0009) read
+      just before its query: search_versioned() hands them out as the data version.
+    """
+    def __init__(self, max_entries=256, ttl=30.0):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (rows, flight_ids, loaded_at, version)
+        self._epoch = 0
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _key(kind, origin_id, destination_id, start_date, end_date):
+        def airport(v):
+            v = str(v or "").strip()
+            return int(v) if v.isdigit() else (v or None)
+        return (kind, airport(origin_id), airport(destination_id),
+                (start_date or "").strip(), (end_date or "").strip())
+
+    @staticmethod
+    def _covers(key, origin_id, destination_id, departure_date) -> bool:
+        _, origin, dest, start, end = key
+        if origin is not None and origin != origin_id:
+            return False
+        if dest is not None and dest != destination_id:
+            return False
+        if departure_date and start and departure_date < start:
+            return False
+        if departure_date and end and departure_date > end:
+            return False
+        return True
+
+    def search(self, origin_id, destination_id, start_date, end_date) -> list:
+        return list(self.search_versioned(origin_id, destination_id, start_date, end_date)[0])
+
+    def search_versioned(self, origin_id, destination_id, start_date, end_date):
+        """(rows, version): rows is a shared tuple, don't mutate it; version is 'flight.airports'."""
+        def load(cursor):
+            cursor.execute(*build_flight_search_query(
+                origin_id, destination_id, start_date, end_date, public_only=True))
+            rows = tuple(dict(r) for r in cursor.fetchall())
+            for r in rows:
+                r["has_business"] = bool(r.get("has_business"))
+            return rows, frozenset(r["Flight_ID"] for r in rows)
+        return self._cached(self._key("search", origin_id, destination_id, start_date, end_date), load)
+
+    def fare_calendar(self, origin_id, destination_id, start_date, end_date):
+        """(days, version): one row per day that has a bookable flight (see fare_calendar_sql)."""
+        def load(cursor):
+            cursor.execute(fare_calendar_sql(), (int(origin_id), int(destination_id), start_date, end_date))
+            days, ids = [], set()
+            for r in cursor.fetchall():
+                ids.update(int(i) for i in (r["flight_ids"] or "").split(",") if i)
+                days.append({
+                    "day": r["day"],
+                    "min_economy": r["min_economy"],
+                    "min_business": r["min_business"],
+                    "flights": r["flights"],})
+            return tuple(days), frozenset(ids)
+        return self._cached(self._key("fares", origin_id, destination_id, start_date, end_date), load)
+
+    def _cached(self, key, load):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if monotonic() - entry[2] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry[0], entry[3]
+                self._counters["expired"] += 1
+            else:
+                self._counters["misses"] += 1
+            epoch = self._epoch
+
+        with db_cursor() as (_, cursor):
+            version = search_data_version(cursor)
+            rows, flight_ids = load(cursor)
+
+        with self._lock:
+            if self._epoch == epoch:
+                self._entries[key] = (rows, flight_ids, monotonic(), version)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return rows, version
+
+    def _drop(self, keys):
+        for k in keys:
+            del self._entries[k]
+        self._epoch += 1
+        self._counters["invalidations"] += len(keys)
+
+    def invalidate_route(self, origin_id, destination_id, departure_date=None):
+        with self._lock:
+            self._drop([k for k in self._entries
+                        if self._covers(k, int(origin_id), int(destination_id), departure_date)])
+
+    def invalidate_flight(self, flight_id):
+        flight_id = int(flight_id)
+        with self._lock:
+            self._drop([k for k, e in self._entries.items() if flight_id in e[1]])
+
+    def clear(self):
+        with self._lock:
+            self._drop(list(self._entries))
+
+    def sync_flight(self, flight_id):
+        """Reconciles cached results with the flight's committed route/date/status (one PK read)."""
+        flight_id = int(flight_id)
+        with self._lock:
+            if not self._entries:
+                return
+            cached = any(flight_id in e[1] for e in self._entries.values())
+
+        with db_cursor() as (_, cursor):
+            cursor.execute(FLIGHT_SEARCH_FACTS_SQL, (flight_id,))
+            f = cursor.fetchone()
+
+        if f is None or f["Flight_Status"] != "active":
+            if cached:
+                self.invalidate_flight(flight_id)
+        elif not cached:
+            self.invalidate_route(f["Origin_Airport"], f["Destination_Airport"], f["Departure_Date"])
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+            out.update({"entries": len(self._entries), "max_entries": self.max_entries, "ttl": self.ttl})
+        lookups = out["hits"] + out["misses"] + out["expired"]
+        out["hit_rate"] = round(out["hits"] / lookups, 3) if lookups else None
+        return out
+
+
+search_cache = SearchResultCache(
+    max_entries=app.config["SEARCH_CACHE_ENTRIES"],
+    ttl=app.config["SEARCH_CACHE_TTL"],)
+
+
 @app.route("/available-flights")
 def available_flights():
     origin_id = (request.args.get("origin_id") or "").strip()
@@ -524,83 +1750,20 @@ def available_flights():
         flash("Please search first.", "error")
         return redirect(url_for("home_page"))
 
-    airports, flights = [], []
+    flights = []
     try:
-        with db_cursor() as (_, cursor):
-            update_flight_statuses_done_if_past(cursor)
-            cursor.execute("""
-                SELECT Airport_ID, Airport_Name, City, Country
-                FROM Airports
-                ORDER BY Country, City, Airport_Name
-            """)
-            airports = cursor.fetchall() or []
-
-            sql = """
-                SELECT
-                    f.Flight_ID,
-                    f.Plane_ID,
-                    f.Departure_Date,
-                    f.Departure_Time,
-                    f.Economy_Price,
-                    f.Business_Price,
-                    f.Flight_Status,
-
-                    ao.Airport_Name AS origin_airport_name,
-                    ao.City AS origin_city,
-                    ao.Country AS origin_country,
-
-                    ad.Airport_Name AS dest_airport_name,
-                    ad.City AS dest_city,
-                    ad.Country AS dest_country,
-
-                    CASE WHEN EXISTS (
-                        SELECT 1
-                        FROM Seats s
-                        WHERE s.Plane_ID = f.Plane_ID
-                          AND LOWER(s.Class) = 'business'
-                        LIMIT 1
-                    ) THEN 1 ELSE 0 END AS has_business
-
-                FROM Flight f
-                JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
-                JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
-                WHERE 1=1
-            """
-            params = []
-
-            if not is_admin_user():
-                sql += """
-                    AND f.Flight_Status = 'active'
-                    AND (
-                        f.Departure_Date > DATE('now')
-                        OR (
-                            f.Departure_Date = DATE('now')
-                            AND f.Departure_Time > TIME('now'))) """
-
-            if origin_id:
-                sql += " AND f.Origin_Airport = ?"
-                params.append(origin_id)
-
-            if destination_id:
-                sql += " AND f.Destination_Airport = ?"
-                params.append(destination_id)
-
-            if start_date and end_date:
-                sql += " AND f.Departure_Date BETWEEN ? AND ?"
-                params.extend([start_date, end_date])
-            elif start_date:
-                sql += " AND f.Departure_Date >= ?"
-                params.append(start_date)
-            elif end_date:
-                sql += " AND f.Departure_Date <= ?"
-                params.append(end_date)
-
-            sql += " ORDER BY f.Departure_Date, f.Departure_Time"
-            cursor.execute(sql, tuple(params))
-            flights = cursor.fetchall() or []
+        if is_admin_user():
+            # admins also see full/past flights; not cached
+            with db_cursor() as (_, cursor):
+                sql, params = build_flight_search_query(
+                    origin_id, destination_id, start_date, end_date, public_only=False)
+                cursor.execute(sql, params)
+                flights = cursor.fetchall() or []
 
-            for f in flights:
-                f["has_business"] = bool(f.get("has_business"))
+                for f in flights:
+                    f["has_business"] = bool(f.get("has_business"))
+        else:
+            flights = search_cache.search(origin_id, destination_id, start_date, end_date)
 
     except Exception as e:
         flash(f"Database error loading flights: {e}", "error")
@@ -608,7 +1771,6 @@ def available_flights():
 
     return render_template(
         "available_flights.html",
-        airports=airports,
         flights=flights,
         origin_id=origin_id,
         destination_id=destination_id,
@@ -616,6 +1778,427 @@ def available_flights():
         end_date=end_date)
 
 
+# =============================
+# ITINERARY SEARCH (1- and 2-stop connections)
+# =============================
+# Open legs with their arrival time (Routes.Duration_Minutes); idx_flight_open_departure range.
+# 'full' rows come along (the partial index needs the IN) and are skipped when indexing.
+ITINERARY_LEGS_SQL = """
+    SELECT
+        f.Flight_ID,
+        f.Flight_Status,
+        f.Origin_Airport,
+        f.Destination_Airport,
+        f.Departure_Date,
+        f.Departure_Time,
+        f.Economy_Price,
+        f.Business_Price,
+        COALESCE(pc.Has_Business, 0) AS has_business,
+        r.Duration_Minutes
+    FROM Flight f
+    JOIN Routes r
+      ON r.Origin_Airport = f.Origin_Airport
+     AND r.Destination_Airport = f.Destination_Airport
+    LEFT JOIN Plane_Capacity pc ON pc.Plane_ID = f.Plane_ID
+    WHERE f.Flight_Status IN ('active', 'full')
+      AND f.Departure_Date >= DATE('now')
+"""
+
+# a new route duration rewrites leg arrivals (End_Epoch trigger) without touching the Flight stamp
+ITINERARY_VERSION_SQL = "SELECT Name, Version FROM Reference_Data_Version WHERE Name IN ('Flight', 'Routes') ORDER BY Name"
+
+
+def _minute_of(departure_date, departure_time) -> int:
+    """Minutes since the epoch of a (naive, local) departure; the unit of the itinerary index."""
+    return int(dt_from_date_time(departure_date, departure_time).timestamp() // 60)
+
+
+class ItineraryIndex:
+    """
+    Connection search over an in-memory snapshot of the bookable schedule:
+    - route graph: airport -> airports it has a Route to (from the Routes catalogue);
+    - departure tables: per airport and per (origin, destination) pair, legs sorted by departure
+      minute, so "legs leaving X between t1 and t2" is a bisect.
+    The snapshot is rebuilt when the Flight (migration 0009) or Routes version stamp moves, checked
+    at most every check_interval seconds. Each search examines at most max_expansions legs.
+    """
+    def __init__(self, min_connection=60, max_connection=1440, max_expansions=20000, check_interval=5.0):
+        self.min_connection = int(min_connection)
+        self.max_connection = int(max_connection)
+        self.max_expansions = int(max_expansions)
+        self.check_interval = float(check_interval)
+        self._lock = threading.Lock()      # counters
+        self._refresh = threading.Lock()   # snapshot check/rebuild
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._counters = {"builds": 0, "searches": 0, "truncated": 0}
+
+    def _build(self, cursor, version) -> dict:
+        cursor.execute(ITINERARY_LEGS_SQL)
+        by_airport, by_pair = {}, {}
+        for r in cursor.fetchall():
+            duration = r["Duration_Minutes"]
+            if duration is None or r["Flight_Status"] != "active":
+                continue
+            dep = _minute_of(r["Departure_Date"], r["Departure_Time"])
+            # (dep, arr, flight_id, origin, dest, economy, business or None)
+            leg = (dep, dep + duration, int(r["Flight_ID"]), int(r["Origin_Airport"]),
+                   int(r["Destination_Airport"]), float(r["Economy_Price"]),
+                   float(r["Business_Price"]) if r["has_business"] else None)
+            by_airport.setdefault(leg[3], []).append(leg)
+            by_pair.setdefault((leg[3], leg[4]), []).append(leg)
+        for legs in list(by_airport.values()) + list(by_pair.values()):
+            legs.sort()
+
+        graph = {}
+        for (origin, dest) in reference_data.routes():
+            graph.setdefault(origin, set()).add(dest)
+
+        with self._lock:
+            self._counters["builds"] += 1
+        return {
+            "version": version,
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+            "graph": graph,
+            "by_airport": by_airport,
+            "by_pair": by_pair,
+            "legs": sum(len(v) for v in by_airport.values()),}
+
+    def _current(self) -> dict:
+        snap = self._snapshot
+        if snap is not None and monotonic() - self._checked_at < self.check_interval:
+            return snap
+        # one thread checks/rebuilds; the others keep searching the previous snapshot meanwhile
+        if not self._refresh.acquire(blocking=snap is None):
+            return snap
+        try:
+            snap = self._snapshot
+            if snap is not None and monotonic() - self._checked_at < self.check_interval:
+                return snap
+            with db_cursor() as (_, cursor):
+                cursor.execute(ITINERARY_VERSION_SQL)
+                version = tuple((r["Name"], r["Version"]) for r in cursor.fetchall())
+                if snap is None or snap["version"] != version:
+                    snap = self._build(cursor, version)
+            self._snapshot = snap
+            self._checked_at = monotonic()
+        finally:
+            self._refresh.release()
+        return snap
+
+    @staticmethod
+    def _window(legs, t1, t2):
+        """Legs departing in [t1, t2] (legs sorted by departure minute)."""
+        i = bisect.bisect_left(legs, (t1,))
+        j = bisect.bisect_right(legs, (t2, float("inf")))
+        return legs[i:j]
+
+    def search(self, origin_id, destination_id, start_date, end_date, max_stops=2, limit=20):
+        """
+        Itineraries from origin to destination whose first leg departs on [start_date, end_date],
+        with 0..max_stops connections of min..max_connection minutes and no airport visited twice.
+        Returns (itineraries sorted by arrival then economy total, truncated flag).
+        """
+        snap = self._current()
+        origin, dest = int(origin_id), int(destination_id)
+        by_airport, by_pair, graph = snap["by_airport"], snap["by_pair"], snap["graph"]
+        now = int(datetime.now().timestamp() // 60)
+        t1 = max(now, _minute_of(start_date, "00:00:00"))
+        t2 = _minute_of(end_date, "23:59:59")
+        lo, hi = self.min_connection, self.max_connection
+
+        # airports one route away from the destination: the only useful second stops
+        into_dest = {a for a, outs in graph.items() if dest in outs}
+        found, budget, truncated = [], self.max_expansions, False
+
+        for leg1 in self._window(by_airport.get(origin, []), t1, t2):
+            if budget <= 0:
+                truncated = True   # legs left unexamined
+                break
+            budget -= 1
+            x = leg1[4]
+            if x == dest:
+                found.append((leg1,))
+                continue
+            if max_stops < 1 or x == origin:
+                continue
+            after1 = self._window(by_pair.get((x, dest), []), leg1[1] + lo, leg1[1] + hi)
+            budget -= len(after1)
+            found.extend((leg1, leg2) for leg2 in after1)
+
+            if max_stops < 2:
+                continue
+            for leg2 in self._window(by_airport.get(x, []), leg1[1] + lo, leg1[1] + hi):
+                if budget <= 0:
+                    truncated = True
+                    break
+                budget -= 1
+                y = leg2[4]
+                if y in (origin, dest, x) or y not in into_dest:
+                    continue
+                after2 = self._window(by_pair.get((y, dest), []), leg2[1] + lo, leg2[1] + hi)
+                budget -= len(after2)
+                found.extend((leg1, leg2, leg3) for leg3 in after2)
+
+        with self._lock:
+            self._counters["searches"] += 1
+            self._counters["truncated"] += int(truncated)
+
+        found.sort(key=lambda legs: (legs[-1][1], sum(l[5] for l in legs), len(legs)))
+        return [self._describe(legs) for legs in found[:max(1, int(limit))]], truncated
+
+    @staticmethod
+    def _describe(legs) -> dict:
+        def stamp(minute):
+            return datetime.fromtimestamp(minute * 60).strftime("%Y-%m-%d %H:%M")
+        business = [l[6] for l in legs]
+        return {
+            "stops": len(legs) - 1,
+            "departs_at": stamp(legs[0][0]),
+            "arrives_at": stamp(legs[-1][1]),
+            "total_minutes": legs[-1][1] - legs[0][0],
+            "economy_total": round(sum(l[5] for l in legs), 2),
+            "business_total": round(sum(business), 2) if None not in business else None,
+            "legs": [{
+                "flight_id": l[2],
+                "origin_id": l[3],
+                "destination_id": l[4],
+                "departs_at": stamp(l[0]),
+                "arrives_at": stamp(l[1]),
+                "layover_minutes": (l[0] - legs[i - 1][1]) if i else 0,}
+                for i, l in enumerate(legs)],}
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        with self._lock:
+            out = dict(self._counters)
+        out.update({"min_connection": self.min_connection, "max_connection": self.max_connection,
+                    "max_expansions": self.max_expansions})
+        if snap is not None:
+            out.update({"version": dict(snap["version"]), "built_at": snap["built_at"], "legs": snap["legs"]})
+        return out
+
+
+itinerary_index = ItineraryIndex(
+    min_connection=app.config["ITINERARY_MIN_CONNECTION"],
+    max_connection=app.config["ITINERARY_MAX_CONNECTION"],
+    max_expansions=app.config["ITINERARY_MAX_EXPANSIONS"],
+    check_interval=app.config["ITINERARY_CHECK_INTERVAL"],)
+
+
+# =============================
+# JSON API
+# =============================
+API_FLIGHT_FIELDS = (
+    "Flight_ID", "Plane_ID", "Departure_Date", "Departure_Time",
+    "Economy_Price", "Business_Price", "Flight_Status",
+    "origin_airport_name", "origin_city", "origin_country",
+    "dest_airport_name", "dest_city", "dest_country",
+    "has_business",)
+
+
+def api_error(message, status=400):
+    return app.response_class(
+        json.dumps({"error": message}, separators=(",", ":")), status=status, mimetype="application/json")
+
+
+def api_etag(version, *query) -> str:
+    """Data version + a stable digest of the normalized query (same in every worker)."""
+    return f"{version}-{hashlib.blake2s(repr(query).encode(), digest_size=8).hexdigest()}"
+
+
+def _api_revalidatable(response, etag):
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"  # always revalidate; 304s are cheap
+    return response
+
+
+def api_not_modified(*query):
+    """
+    Revalidation fast path: if the client sent If-None-Match, read the current version stamps
+    and answer 304 when its ETag still matches, before the search runs (cached or not, so a
+    restart, another worker or an evicted entry doesn't cost a query). None otherwise.
+    """
+    if not request.if_none_match:
+        return None
+    with db_cursor() as (_, cursor):
+        etag = api_etag(search_data_version(cursor), *query)
+    if not request.if_none_match.contains(etag):
+        return None
+    return _api_revalidatable(app.response_class(status=304), etag)
+
+
+def api_json_response(etag, build_body):
+    """304 if the client already has `etag`, else build_body() as compact JSON; both carry the ETag."""
+    if request.if_none_match.contains(etag):
+        return _api_revalidatable(app.response_class(status=304), etag)
+    return _api_revalidatable(
+        app.response_class(json.dumps(build_body(), separators=(",", ":")), mimetype="application/json"), etag)
+
+
+@app.route("/api/flights")
+def api_flights():
+    """
+    Public search as compact JSON: same parameters and rows as /available-flights,
+    optional ?fields=a,b,c. The ETag is the data version (Flight/Airports stamps) plus the
+    normalized query, so a repeat with a matching If-None-Match is answered 304 after reading
+    the stamps only (api_not_modified), without a search query or serialization.
+    The ETag is not time-aware: a flight that departs stays in the results of a still-valid
+    ETag until the status sweeper bumps the Flight stamp, up to FLIGHT_STATUS_SWEEP_INTERVAL
+    seconds later.
+    """
+    origin_id = (request.args.get("origin_id") or "").strip()
+    destination_id = (request.args.get("destination_id") or "").strip()
+    start_date = (request.args.get("start_date") or "").strip()
+    end_date = (request.args.get("end_date") or "").strip()
+
+    if not origin_id and not destination_id and not start_date and not end_date:
+        return api_error("Give at least one of origin_id, destination_id, start_date, end_date.")
+    if start_date:
+        try:
+            if datetime.strptime(start_date, "%Y-%m-%d").date() < date.today():
+                return api_error("start_date is in the past.")
+        except ValueError:
+            return api_error("start_date must be YYYY-MM-DD.")
+
+    fields = [f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()]
+    unknown = [f for f in fields if f not in API_FLIGHT_FIELDS]
+    if unknown:
+        return api_error(f"Unknown field(s): {', '.join(unknown)}.")
+    fields = tuple(fields) or API_FLIGHT_FIELDS
+
+    query_key = SearchResultCache._key("search", origin_id, destination_id, start_date, end_date)
+    try:
+        not_modified = api_not_modified(query_key, fields)
+        if not_modified is not None:
+            return not_modified
+        rows, version = search_cache.search_versioned(origin_id, destination_id, start_date, end_date)
+    except Exception as e:
+        return api_error(f"Database error: {e}", 500)
+    etag = api_etag(version, query_key, fields)
+
+    return api_json_response(
+        etag, lambda: {"count": len(rows), "flights": [{f: r.get(f) for f in fields} for r in rows]})
+
+
+def fare_calendar_window(args):
+    """
+    (start, end) dates from ?month=YYYY-MM, or ?date=YYYY-MM-DD with ?days=N either side
+    (default 7, at most FARE_CALENDAR_MAX_DAYS). Days before today are cut off.
+    Raises ValueError with a message for the client.
+    """
+    today = date.today()
+    month = (args.get("month") or "").strip()
+    if month:
+        try:
+            start = datetime.strptime(month, "%Y-%m").date()
+        except ValueError:
+            raise ValueError("month must be YYYY-MM.")
+        end = (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    else:
+        try:
+            center = datetime.strptime((args.get("date") or today.isoformat()).strip(), "%Y-%m-%d").date()
+            days = int(args.get("days") or 7)
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD and days a whole number.")
+        days = max(0, min(days, int(app.config["FARE_CALENDAR_MAX_DAYS"])))
+        start, end = center - timedelta(days=days), center + timedelta(days=days)
+
+    start = max(start, today)
+    if end < start:
+        raise ValueError("The window is entirely in the past.")
+    return start, end
+
+
+@app.route("/api/fare-calendar")
+def api_fare_calendar():
+    """
+    Cheapest economy/business fare per day for one route, over ±days around date or a whole
+    month: one grouped query, cached and revalidated like /api/flights. Every day of the
+    window is listed; days without a bookable flight have nulls.
+    """
+    origin_id = (request.args.get("origin_id") or "").strip()
+    destination_id = (request.args.get("destination_id") or "").strip()
+    if not origin_id.isdigit() or not destination_id.isdigit():
+        return api_error("origin_id and destination_id are required.")
+    try:
+        start, end = fare_calendar_window(request.args)
+    except ValueError as e:
+        return api_error(str(e))
+    start_date, end_date = start.isoformat(), end.isoformat()
+
+    query_key = SearchResultCache._key("fares", origin_id, destination_id, start_date, end_date)
+    try:
+        not_modified = api_not_modified(query_key)
+        if not_modified is not None:
+            return not_modified
+        days, version = search_cache.fare_calendar(origin_id, destination_id, start_date, end_date)
+    except Exception as e:
+        return api_error(f"Database error: {e}", 500)
+    etag = api_etag(version, query_key)
+
+    def body():
+        by_day = {d["day"]: d for d in days}
+        calendar = []
+        for i in range((end - start).days + 1):
+            day = (start + timedelta(days=i)).isoformat()
+            d = by_day.get(day)
+            calendar.append({
+                "date": day,
+                "min_economy": d["min_economy"] if d else None,
+                "min_business": d["min_business"] if d else None,
+                "flights": d["flights"] if d else 0,})
+        priced = [d["min_economy"] for d in days if d["min_economy"] is not None]
+        return {
+            "origin_id": int(origin_id),
+            "destination_id": int(destination_id),
+            "start_date": start_date,
+            "end_date": end_date,
+            "cheapest_economy": min(priced) if priced else None,
+            "days": calendar,}
+
+    return api_json_response(etag, body)
+
+
+@app.route("/api/itineraries")
+def api_itineraries():
+    """
+    Direct, 1-stop and 2-stop itineraries (?max_stops=0..2, default 2) for origin_id ->
+    destination_id with the first departure on start_date..end_date (end defaults to start).
+    """
+    origin_id = (request.args.get("origin_id") or "").strip()
+    destination_id = (request.args.get("destination_id") or "").strip()
+    start_date = (request.args.get("start_date") or "").strip()
+    end_date = (request.args.get("end_date") or "").strip() or start_date
+
+    if not origin_id.isdigit() or not destination_id.isdigit() or origin_id == destination_id:
+        return api_error("origin_id and destination_id are required and must differ.")
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        max_stops = max(0, min(int(request.args.get("max_stops") or 2), 2))
+        limit = max(1, min(int(request.args.get("limit") or 20), int(app.config["MAX_PAGE_SIZE"])))
+    except ValueError:
+        return api_error("start_date/end_date must be YYYY-MM-DD; max_stops and limit whole numbers.")
+    if end < start or (end - start).days > int(app.config["FARE_CALENDAR_MAX_DAYS"]):
+        return api_error(f"end_date must be on or after start_date, at most "
+                         f"{app.config['FARE_CALENDAR_MAX_DAYS']} days later.")
+
+    try:
+        started = monotonic()
+        itineraries, truncated = itinerary_index.search(
+            origin_id, destination_id, start_date, end_date, max_stops=max_stops, limit=limit)
+        took_ms = round((monotonic() - started) * 1000, 2)
+    except Exception as e:
+        return api_error(f"Database error: {e}", 500)
+
+    return app.response_class(json.dumps({
+        "count": len(itineraries),
+        "truncated": truncated,
+        "took_ms": took_ms,
+        "itineraries": itineraries,}, separators=(",", ":")), mimetype="application/json")
+
+
 # =============================
 # BOOK FLIGHT
 # =============================
@@ -630,16 +2213,11 @@ def book_flight(flight_id):
                     f.Plane_ID, f.Flight_Status,
                     ao.Airport_Name AS origin_airport_name, ao.City AS origin_city, ao.Country AS origin_country,
                     ad.Airport_Name AS dest_airport_name, ad.City AS dest_city, ad.Country AS dest_country,
-                    CASE WHEN EXISTS (
-                        SELECT 1
-                        FROM Seats s
-                        WHERE s.Plane_ID = f.Plane_ID
-                          AND LOWER(s.Class) = 'business'
-                        LIMIT 1
-                    ) THEN 1 ELSE 0 END AS has_business
+                    COALESCE(pc.Has_Business, 0) AS has_business
                 FROM Flight f
                 JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
                 JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+                LEFT JOIN Plane_Capacity pc ON pc.Plane_ID = f.Plane_ID
                 WHERE f.Flight_ID = ?
             """, (flight_id,))
             flight = cursor.fetchone()
@@ -725,6 +2303,12 @@ def book_flight(flight_id):
             draft["first_name"] = guest_first
             draft["last_name"] = guest_last
 
+        previous = session.get("draft_order")
+        if previous and session.get("draft_selected_seats") and session.get("seat_hold_token"):
+            with db_transaction() as (_, cursor):
+                release_seat_holds(cursor, session["seat_hold_token"], previous["flight_id"])
+            seat_occupancy.release_holds(previous["flight_id"], previous["plane_id"], session["seat_hold_token"])
+
         session["draft_order"] = draft
         session["draft_selected_seats"] = []
         return redirect(url_for("draft_select_seats"))
@@ -734,6 +2318,245 @@ def book_flight(flight_id):
         return redirect(url_for("available_flights"))
 
 
+SEAT_LAYOUT_SQL = """
+    SELECT Row_Num, Column_Number, Class
+    FROM Seats
+    WHERE Plane_ID = ?
+    ORDER BY Row_Num, Column_Number
+"""
+
+
+OCCUPIED_SEATS_SQL = """
+    SELECT Row_Num, Column_Number
+    FROM Flight_Seat_Reservations
+    WHERE Flight_ID = ?
+      AND Plane_ID = ?
+"""
+
+
+# =============================
+# SEAT OCCUPANCY CACHE (per-flight bitmaps)
+# =============================
+class SeatLayout:
+    """Seats of one plane in a fixed order: bit i of a flight's occupancy bitmap is seats[i]."""
+    __slots__ = ("plane_id", "seats", "positions", "by_class")
+
+    def __init__(self, plane_id, rows):
+        self.plane_id = int(plane_id)
+        self.seats = tuple(
+            {"Row_Num": int(r["Row_Num"]), "Column_Number": str(r["Column_Number"]), "Class": r["Class"]}
+            for r in rows)
+        self.positions = {f"{s['Row_Num']}{s['Column_Number']}": i for i, s in enumerate(self.seats)}
+        self.by_class = {}
+        for s in self.seats:
+            self.by_class.setdefault(s["Class"], []).append(s)
+
+    def class_of(self, seat_id):
+        i = self.positions.get(seat_id)
+        return None if i is None else self.seats[i]["Class"]
+
+    def mask(self, seat_ids) -> int:
+        """Bitmask of the given "12A" seat ids (unknown ids raise KeyError)."""
+        bits = 0
+        for seat_id in seat_ids:
+            bits |= 1 << self.positions[seat_id]
+        return bits
+
+
+class OccupiedSeats:
+    """`"12A" in occupied` for the seat map template, answered straight from the bitmap."""
+    __slots__ = ("_layout", "_bits")
+
+    def __init__(self, layout, bits):
+        self._layout = layout
+        self._bits = bits
+
+    def __contains__(self, seat_id):
+        i = self._layout.positions.get(seat_id)
+        return i is not None and (self._bits >> i) & 1 == 1
+
+    def __iter__(self):
+        return (sid for sid, i in self._layout.positions.items() if (self._bits >> i) & 1)
+
+    def __len__(self):
+        return bin(self._bits).count("1")
+
+    def any_of(self, seat_ids) -> bool:
+        return bool(self._bits & self._layout.mask(seat_ids))
+
+
+SEAT_HOLDS_SQL = """
+    SELECT Row_Num, Column_Number, Hold_Token, Expires_At
+    FROM Seat_Holds
+    WHERE Flight_ID = ?
+      AND Expires_At > ?
+"""
+
+
+class SeatOccupancyCache:
+    """
+    Per-flight occupancy bitmaps for the seat map, bounded LRU.
+    - Built from the DB on first use (SEAT_LAYOUT_SQL once per plane + OCCUPIED_SEATS_SQL
+      + SEAT_HOLDS_SQL), then kept current by booking/cancellation/hold events from this process.
+    - Entries older than ttl are rebuilt, which bounds staleness from other worker processes;
+      a rebuild that disagrees with the cached booked bits is counted as a mismatch.
+    - Seats held by another customer (unexpired) are shown as occupied.
+    - confirm_order still re-checks seats in the DB, the cache only drives rendering/validation.
+    """
+    def __init__(self, max_flights=512, ttl=30.0):
+        self.max_flights = max(1, int(max_flights))
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._layouts = {}              # plane_id -> SeatLayout
+        self._flights = OrderedDict()   # flight_id -> (plane_id, booked_bits, holds, loaded_at)
+        self._epoch = 0                 # bumped by every event; loads that raced one aren't stored
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "events": 0,
+            "invalidations": 0,
+            "mismatches": 0,}
+
+    def _load(self, cursor, flight_id, plane_id):
+        with self._lock:
+            layout = self._layouts.get(plane_id)
+        if layout is None:
+            cursor.execute(SEAT_LAYOUT_SQL, (plane_id,))
+            layout = SeatLayout(plane_id, cursor.fetchall())
+            with self._lock:
+                self._layouts[plane_id] = layout
+        cursor.execute(OCCUPIED_SEATS_SQL, (flight_id, plane_id))
+        bits = 0
+        for r in cursor.fetchall():
+            i = layout.positions.get(f"{r['Row_Num']}{r['Column_Number']}")
+            if i is not None:
+                bits |= 1 << i
+        cursor.execute(SEAT_HOLDS_SQL, (flight_id, datetime.now().timestamp()))
+        holds = {}   # seat index -> (hold_token, expires_at)
+        for r in cursor.fetchall():
+            i = layout.positions.get(f"{r['Row_Num']}{r['Column_Number']}")
+            if i is not None:
+                holds[i] = (r["Hold_Token"], float(r["Expires_At"]))
+        return layout, bits, holds
+
+    @staticmethod
+    def _view(layout, bits, holds, hold_token):
+        now = datetime.now().timestamp()
+        for i, (token, expires_at) in holds.items():
+            if token != hold_token and expires_at > now:
+                bits |= 1 << i
+        return OccupiedSeats(layout, bits)
+
+    def get(self, flight_id, plane_id, hold_token=None):
+        """
+        (SeatLayout, OccupiedSeats) for a flight, as seen by hold_token (its own holds are
+        free for it); no DB round trip on a fresh hit.
+        """
+        flight_id, plane_id = int(flight_id), int(plane_id)
+        with self._lock:
+            entry = self._flights.get(flight_id)
+            layout = self._layouts.get(plane_id)
+            if entry is not None and entry[0] == plane_id and layout is not None:
+                if monotonic() - entry[3] < self.ttl:
+                    self._flights.move_to_end(flight_id)
+                    self._counters["hits"] += 1
+                    return layout, self._view(layout, entry[1], entry[2], hold_token)
+                self._counters["expired"] += 1
+            else:
+                self._counters["misses"] += 1
+            epoch = self._epoch
+
+        with db_cursor() as (_, cursor):
+            layout, bits, holds = self._load(cursor, flight_id, plane_id)
+
+        with self._lock:
+            if entry is not None and entry[0] == plane_id and entry[1] != bits:
+                self._counters["mismatches"] += 1
+            if self._epoch == epoch:
+                self._flights[flight_id] = (plane_id, bits, holds, monotonic())
+                self._flights.move_to_end(flight_id)
+                while len(self._flights) > self.max_flights:
+                    self._flights.popitem(last=False)
+        return layout, self._view(layout, bits, holds, hold_token)
+
+    def _update(self, flight_id, plane_id, change):
+        flight_id, plane_id = int(flight_id), int(plane_id)
+        with self._lock:
+            self._epoch += 1
+            self._counters["events"] += 1
+            entry = self._flights.get(flight_id)
+            layout = self._layouts.get(plane_id)
+            if entry is None or entry[0] != plane_id or layout is None:
+                return
+            try:
+                bits, holds = change(layout, entry[1], dict(entry[2]))
+            except KeyError:
+                self._flights.pop(flight_id, None)
+                return
+            self._flights[flight_id] = (plane_id, bits, holds, entry[3])
+
+    def apply(self, flight_id, plane_id, seat_ids, occupied=True):
+        """Booking (occupied=True) / cancellation event, called after the DB commit."""
+        def change(layout, bits, holds):
+            mask = layout.mask(seat_ids)
+            return ((bits | mask) if occupied else (bits & ~mask)), holds
+        self._update(flight_id, plane_id, change)
+
+    def apply_holds(self, flight_id, plane_id, hold_token, seat_ids, expires_at):
+        """hold_token now holds exactly seat_ids on the flight (after the DB commit)."""
+        def change(layout, bits, holds):
+            holds = {i: h for i, h in holds.items() if h[0] != hold_token}
+            for seat_id in seat_ids:
+                holds[layout.positions[seat_id]] = (hold_token, float(expires_at))
+            return bits, holds
+        self._update(flight_id, plane_id, change)
+
+    def release_holds(self, flight_id, plane_id, hold_token):
+        def change(layout, bits, holds):
+            return bits, {i: h for i, h in holds.items() if h[0] != hold_token}
+        self._update(flight_id, plane_id, change)
+
+    def invalidate(self, flight_id=None):
+        with self._lock:
+            self._epoch += 1
+            self._counters["invalidations"] += 1
+            if flight_id is None:
+                self._flights.clear()
+            else:
+                self._flights.pop(int(flight_id), None)
+
+    def check_consistency(self, cursor) -> dict:
+        """Compares every cached bitmap with the DB, repairs the ones that differ."""
+        with self._lock:
+            cached = list(self._flights.items())
+        mismatched = []
+        for flight_id, (plane_id, bits, _, _) in cached:
+            _, fresh, holds = self._load(cursor, flight_id, plane_id)
+            if fresh != bits:
+                mismatched.append(flight_id)
+                with self._lock:
+                    self._counters["mismatches"] += 1
+                    if flight_id in self._flights:
+                        self._flights[flight_id] = (plane_id, fresh, holds, monotonic())
+        return {"checked": len(cached), "mismatched_flights": mismatched}
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+            out.update({
+                "flights": len(self._flights),
+                "planes": len(self._layouts),
+                "max_flights": self.max_flights,
+                "ttl": self.ttl,})
+        return out
+
+
+seat_occupancy = SeatOccupancyCache(
+    max_flights=app.config["SEAT_MAP_CACHE_FLIGHTS"],
+    ttl=app.config["SEAT_MAP_CACHE_TTL"],)
+
+
 # =============================
 # DRAFT: SELECT SEATS
 # =============================
@@ -753,28 +2576,8 @@ def draft_select_seats():
         ticket_class = "Economy"
 
     try:
-        with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT Row_Num, Column_Number, Class
-                FROM Seats
-                WHERE Plane_ID = ?
-                  AND Class = ?
-                ORDER BY Row_Num, Column_Number
-            """, (plane_id, ticket_class))
-            seats = cursor.fetchall()
-
-            cursor.execute("""
-                SELECT ss.Row_Num, ss.Column_Number
-                FROM Selected_Seats ss
-                JOIN Orders o ON o.Unique_Order_ID = ss.Unique_Order_ID
-                WHERE o.Flight_ID = ?
-                  AND ss.Plane_ID = ?
-                  AND ss.Is_Occupied = 1
-                  AND o.Order_Status = 'active'
-            """, (flight_id, plane_id))
-            occ_rows = cursor.fetchall() or []
-            occupied = {f"{r['Row_Num']}{r['Column_Number']}" for r in occ_rows}
-
+        layout, occupied = seat_occupancy.get(flight_id, plane_id, hold_token=session.get("seat_hold_token"))
+        seats = layout.by_class.get(ticket_class, [])
         selected_prev = set(session.get("draft_selected_seats", []))
 
 
@@ -790,10 +2593,6 @@ def draft_select_seats():
                     selected=selected_prev,
                     needed=needed)
 
-            if len(set(selected)) != len(selected):
-                flash("Duplicate seat selection detected. Please select unique seats.", "error")
-                return redirect(url_for("draft_select_seats"))
-
             parsed = []
             for seat_id in selected:
                 seat_id = (seat_id or "").strip()
@@ -808,35 +2607,37 @@ def draft_select_seats():
                     flash("Invalid seat selection.", "error")
                     return redirect(url_for("draft_select_seats"))
 
-                row_num = int(row_part)
-                parsed.append((row_num, col_part))
+                parsed.append(f"{int(row_part)}{col_part}")
 
-            if any(s in occupied for s in selected):
-                flash("One or more seats are no longer available. Please choose again.", "error")
+            # compared after normalizing: "12a" and "12A" are the same seat
+            if len(set(parsed)) != len(parsed):
+                flash("Duplicate seat selection detected. Please select unique seats.", "error")
                 return redirect(url_for("draft_select_seats"))
 
-            where_pairs = " OR ".join(["(Row_Num = ? AND Column_Number = ?)"] * len(parsed))
-            pair_params = []
-            for (r, c) in parsed:
-                pair_params.extend([int(r), str(c)])
-
-            with db_cursor() as (_, cursor):
-                cursor.execute(f"""
-                    SELECT Row_Num, Column_Number, Class
-                    FROM Seats
-                    WHERE Plane_ID = ?
-                      AND Class = ?
-                      AND ({where_pairs})
-                """, (plane_id, ticket_class, *pair_params))
-                rows = cursor.fetchall() or []
-
-            db_set = {(int(r["Row_Num"]), str(r["Column_Number"])) for r in rows}
-            wanted_set = {(int(r), str(c)) for (r, c) in parsed}
-            if db_set != wanted_set:
+            # seat exists on this plane AND belongs to the booked class
+            if any(layout.class_of(seat_id) != ticket_class for seat_id in parsed):
                 flash("One or more selected seats are invalid.", "error")
                 return redirect(url_for("draft_select_seats"))
 
-            session["draft_selected_seats"] = selected
+            if occupied.any_of(parsed):
+                flash("One or more seats are no longer available. Please choose again.", "error")
+                return redirect(url_for("draft_select_seats"))
+
+            # Hold the seats for this customer until checkout (or SEAT_HOLD_TTL)
+            hold_token = seat_hold_token()
+            now_ts = datetime.now().timestamp()
+            expires_at = now_ts + int(app.config["SEAT_HOLD_TTL"])
+            try:
+                with db_transaction() as (_, cursor):
+                    if not take_seat_holds(cursor, flight_id, plane_id, hold_token, parsed, expires_at, now_ts):
+                        raise BookingConflict("One or more seats are held by another customer.")
+            except BookingConflict:
+                seat_occupancy.invalidate(flight_id)
+                flash("One or more seats are being booked by another customer. Please choose again.", "error")
+                return redirect(url_for("draft_select_seats"))
+            seat_occupancy.apply_holds(flight_id, plane_id, hold_token, parsed, expires_at)
+
+            session["draft_selected_seats"] = parsed
             return redirect(url_for("order_review"))
 
         return render_template(
@@ -913,6 +2714,87 @@ def order_review():
         return redirect(url_for("home_page"))
 
 
+def _seat_pair_params(seats) -> list:
+    """("12A", ...) -> [12, "A", ...] for the (Row_Num, Column_Number) pairs of the SQL below."""
+    params = []
+    for seat_id in seats:
+        params.extend([int(seat_id[:-1]), seat_id[-1]])
+    return params
+
+
+def seat_prices_sql(n: int) -> str:
+    """Class + unit price of n (row, column) pairs on the flight's plane."""
+    return f"""
+        SELECT ss.Row_Num, ss.Column_Number, ss.Class,
+               CASE WHEN ss.Class = 'Business' THEN f.Business_Price ELSE f.Economy_Price END AS Price
+        FROM Flight f
+        JOIN Seats ss ON ss.Plane_ID = ?
+        WHERE f.Flight_ID = ?
+          AND ({" OR ".join(["(ss.Row_Num = ? AND ss.Column_Number = ?)"] * n)})
+    """
+
+
+def place_order(cursor, flight_id: int, plane_id: int, seats, email: str, user_type: str,
+                first_name="", last_name="", hold_token=None) -> int:
+    """
+    Books `seats` ("12A" ids) inside the caller's transaction and returns the new order id.
+    Set-based, so the write lock is held for a fixed number of statements whatever the
+    party size: one class/price query, executemany for the seat rows.
+    Seat exclusivity is enforced by the database: inserting an occupied seat that is already
+    in Flight_Seat_Reservations fails, and that is reported as BookingConflict (as is a seat
+    held by another customer).
+    """
+    pair_params = _seat_pair_params(seats)
+
+    # held by someone else? (our own hold may have expired meanwhile)
+    if hold_token and seats_held_by_others(cursor, flight_id, hold_token, seats, datetime.now().timestamp()):
+        raise BookingConflict("One or more seats are held by another customer.")
+
+    cursor.execute(seat_prices_sql(len(seats)), (plane_id, flight_id, *pair_params))
+    priced = {f"{r['Row_Num']}{r['Column_Number']}": float(r["Price"]) for r in cursor.fetchall()}
+    missing = [seat_id for seat_id in seats if seat_id not in priced]
+    if missing:
+        raise Exception(f"Seat {missing[0]} does not exist in Seats table (or flight not found).")
+    final_total = round(sum(priced.values()), 2)
+
+    if user_type == "guest":
+        cursor.execute("""
+            INSERT OR IGNORE INTO Unidentified_Guests (Email_Address, First_Name_In_English, Last_Name_In_English)
+            VALUES (?, ?, ?)
+        """, (email, first_name, last_name))
+
+    new_order_id = next_order_id(cursor)
+
+    registered = user_type == "registered_client"
+    cursor.execute("""
+        INSERT INTO Orders
+          (Unique_Order_ID, Flight_ID, Registered_Clients_Email_Address, Unidentified_Guest_Email_Address,
+           Order_Status, Final_Total)
+        VALUES
+          (?, ?, ?, ?, 'active', ?)
+    """, (new_order_id, flight_id, email if registered else None, None if registered else email, final_total))
+
+    cursor.execute("""
+        INSERT INTO Has_an_order (Email_Address, Unique_Order_ID, Quantity_of_tickets)
+        VALUES (?, ?, ?)
+    """, (email, new_order_id, len(seats)))
+
+    try:
+        cursor.executemany("""
+            INSERT INTO Selected_Seats (Plane_ID, Unique_Order_ID, Column_Number, Row_Num, Is_Occupied)
+            VALUES (?, ?, ?, ?, 1)
+        """, [(plane_id, new_order_id, seat_id[-1], int(seat_id[:-1])) for seat_id in seats])
+    except sqlite3.IntegrityError as e:
+        if "Flight_Seat_Reservations" in str(e):
+            raise BookingConflict("One or more seats were taken while you were booking.") from e
+        raise
+
+    adjust_flight_occupancy(cursor, flight_id, len(seats))
+    if hold_token:
+        release_seat_holds(cursor, hold_token, flight_id)
+    return new_order_id
+
+
 # =============================
 # DRAFT: CONFIRM ORDER
 # =============================
@@ -937,118 +2819,22 @@ def confirm_order():
 
     if not email or user_type not in ("guest", "registered_client"):
         flash("Missing user data. Please start again.", "error")
-        return redirect(url_for("home_page"))
-
-    try:
-        with db_transaction() as (_, cursor):
-
-            # Re-check seats taken (transaction safety)
-            for seat_id in seats:
-                row_num = int(seat_id[:-1])
-                col = seat_id[-1]
-
-                cursor.execute("""
-                    SELECT 1
-                    FROM Selected_Seats ss
-                    JOIN Orders o ON o.Unique_Order_ID = ss.Unique_Order_ID
-                    WHERE o.Flight_ID = ?
-                      AND ss.Plane_ID = ?
-                      AND ss.Row_Num = ?
-                      AND ss.Column_Number = ?
-                      AND ss.Is_Occupied = 1
-                      AND o.Order_Status = 'active'
-                    LIMIT 1
-                """, (flight_id, plane_id, row_num, col))
-
-                if cursor.fetchone():
-                    raise BookingConflict("One or more seats were taken while you were booking.")
-
-            # Ensure guest exists
-            if user_type == "guest":
-                cursor.execute(
-                    "SELECT Email_Address FROM Unidentified_Guests WHERE Email_Address = ?",
-                    (email,))
-                if not cursor.fetchone():
-                    cursor.execute("""
-                        INSERT INTO Unidentified_Guests (Email_Address, First_Name_In_English, Last_Name_In_English)
-                        VALUES (?, ?, ?)
-                    """, (email, draft.get("first_name", ""), draft.get("last_name", "")))
-
-            # Fetch flight prices once
-            cursor.execute("""
-                SELECT Economy_Price, Business_Price
-                FROM Flight
-                WHERE Flight_ID = ?
-                LIMIT 1
-            """, (flight_id,))
-            pr = cursor.fetchone()
-            if not pr:
-                raise Exception("Flight not found.")
-
-            eco_price = float(pr["Economy_Price"])
-            bus_price = float(pr["Business_Price"])
-
-            # Compute Final_Total based on seat classes
-            final_total = 0.0
-            for seat_id in seats:
-                row_num = int(seat_id[:-1])
-                col = seat_id[-1]
-
-                cursor.execute("""
-                    SELECT Class
-                    FROM Seats
-                    WHERE Plane_ID = ?
-                      AND Row_Num = ?
-                      AND Column_Number = ?
-                    LIMIT 1
-                """, (plane_id, row_num, col))
-                srow = cursor.fetchone()
-                if not srow:
-                    raise Exception(f"Seat {seat_id} does not exist in Seats table.")
-
-                seat_class = (srow["Class"] or "Economy")
-                if seat_class == "Business":
-                    final_total += bus_price
-                else:
-                    final_total += eco_price
-
-            final_total = round(final_total, 2)
+        return redirect(url_for("home_page"))
 
-            # Create new order id
-            new_order_id = next_order_id(cursor)
+    hold_token = seat_hold_token()
 
-            # Insert order WITH Final_Total
-            if user_type == "registered_client":
-                cursor.execute("""
-                    INSERT INTO Orders
-                      (Unique_Order_ID, Flight_ID, Registered_Clients_Email_Address, Unidentified_Guest_Email_Address,
-                       Order_Status, Final_Total)
-                    VALUES
-                      (?, ?, ?, NULL, 'active', ?)
-                """, (new_order_id, flight_id, email, final_total))
-            else:
-                cursor.execute("""
-                    INSERT INTO Orders
-                      (Unique_Order_ID, Flight_ID, Registered_Clients_Email_Address, Unidentified_Guest_Email_Address,
-                       Order_Status, Final_Total)
-                    VALUES
-                      (?, ?, NULL, ?, 'active', ?)
-                """, (new_order_id, flight_id, email, final_total))
-
-            # Insert Has_an_order
-            cursor.execute("""
-                INSERT INTO Has_an_order (Email_Address, Unique_Order_ID, Quantity_of_tickets)
-                VALUES (?, ?, ?)
-            """, (email, new_order_id, needed))
+    try:
+        order_ids.prefetch()  # own transaction, must happen before ours takes the write lock
+        with db_transaction() as (_, cursor):
+            new_order_id = place_order(
+                cursor, flight_id, plane_id, seats, email, user_type,
+                first_name=draft.get("first_name", ""),
+                last_name=draft.get("last_name", ""),
+                hold_token=hold_token)
 
-            # Insert Selected_Seats
-            for seat_id in seats:
-                row_num = int(seat_id[:-1])
-                col = seat_id[-1]
-                cursor.execute("""
-                    INSERT INTO Selected_Seats (Plane_ID, Unique_Order_ID, Column_Number, Row_Num, Is_Occupied)
-                    VALUES (?, ?, ?, ?, 1)
-                """, (plane_id, new_order_id, col, row_num))
+        seat_occupancy.apply(flight_id, plane_id, seats, occupied=True)
+        seat_occupancy.release_holds(flight_id, plane_id, hold_token)
+        search_cache.sync_flight(flight_id)  # the flight may have just become full
 
         if user_type == "guest":
             session["guest_unique_order_id"] = str(new_order_id)
@@ -1060,6 +2846,7 @@ def confirm_order():
         return redirect(url_for("order_confirmed", unique_order_id=new_order_id))
 
     except BookingConflict:
+        seat_occupancy.invalidate(flight_id)  # our seat map was stale
         flash("One or more seats were taken while you were booking. Please choose again.", "error")
         return redirect(url_for("draft_select_seats"))
 
@@ -1167,132 +2954,212 @@ def order_confirmed(unique_order_id):
     return render_template("order_confirmed.html", order=order)
 
 
-def _fetch_order_seats(cursor, unique_order_id: int):
-    cursor.execute("""
-        SELECT Row_Num, Column_Number
-        FROM Selected_Seats
-        WHERE Unique_Order_ID = ?
-          AND Is_Occupied = 1
-        ORDER BY Row_Num, Column_Number
-    """, (unique_order_id,))
-    rows = cursor.fetchall() or []
-    return [f"{r['Row_Num']}{r['Column_Number']}" for r in rows]
+ORDER_SUMMARY_CHUNK = 500   # order ids per IN (...) list, well under SQLite's variable limit
 
 
-def fetch_future_orders_registered(email: str):
-    try:
-        with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT
-                    o.Unique_Order_ID AS unique_order_id,
-                    o.Order_Status    AS order_status,
-                    o.Flight_ID       AS flight_id,
+def order_seats_sql(n: int) -> str:
+    """Occupied seats (with class) of n orders, grouped by order and sorted by seat."""
+    return f"""
+        SELECT ss.Unique_Order_ID, ss.Row_Num, ss.Column_Number, s.Class
+        FROM Selected_Seats ss
+        JOIN Seats s
+          ON s.Plane_ID = ss.Plane_ID
+         AND s.Row_Num = ss.Row_Num
+         AND s.Column_Number = ss.Column_Number
+        WHERE ss.Unique_Order_ID IN ({", ".join(["?"] * n)})
+          AND ss.Is_Occupied = 1
+        ORDER BY ss.Unique_Order_ID, ss.Row_Num, ss.Column_Number
+    """
 
-                    ao.Airport_Name AS origin_airport,
-                    ad.Airport_Name AS destination_airport,
 
-                    f.Departure_Date AS departure_date,
-                    f.Departure_Time AS departure_time,
+def attach_order_summaries(cursor, orders):
+    """
+    Adds seats ("12A" ids), ticket_class and original_total to every order row in one
+    seat query per ORDER_SUMMARY_CHUNK orders. The rows must carry economy_price and
+    business_price (the order queries below select them from Flight).
+    Ticket class is the class of the order's occupied seats, Economy when there are none.
+    """
+    by_id = {int(o["unique_order_id"]): o for o in orders}
+    for o in orders:
+        o["seats"] = []
+        o["ticket_class"] = None
+
+    ids = list(by_id)
+    for i in range(0, len(ids), ORDER_SUMMARY_CHUNK):
+        chunk = ids[i:i + ORDER_SUMMARY_CHUNK]
+        cursor.execute(order_seats_sql(len(chunk)), chunk)
+        for r in cursor.iter_rows():
+            o = by_id[int(r["Unique_Order_ID"])]
+            o["seats"].append(f"{r['Row_Num']}{r['Column_Number']}")
+            if o["ticket_class"] is None:
+                o["ticket_class"] = str(r["Class"] or "").strip()
+
+    for o in orders:
+        if o["ticket_class"] not in ("Economy", "Business"):
+            o["ticket_class"] = "Economy"
+        try:
+            qty = int(o.get("quantity_of_tickets") or 0)
+        except (TypeError, ValueError):
+            qty = 0
+        price = o.get("business_price") if o["ticket_class"] == "Business" else o.get("economy_price")
+        o["original_total"] = round(qty * float(price or 0.0), 2)
+    return orders
+
+
+FUTURE_ORDERS_REGISTERED_SQL = """
+    SELECT
+        o.Unique_Order_ID AS unique_order_id,
+        o.Order_Status    AS order_status,
+        o.Flight_ID       AS flight_id,
+
+        ao.Airport_Name AS origin_airport,
+        ad.Airport_Name AS destination_airport,
+
+        f.Departure_Date AS departure_date,
+        f.Departure_Time AS departure_time,
+        f.Economy_Price  AS economy_price,
+        f.Business_Price AS business_price,
+
+        hao.Quantity_of_tickets AS quantity_of_tickets
+    FROM Orders o
+    JOIN Flight f ON f.Flight_ID = o.Flight_ID
+    JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
+    JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+    LEFT JOIN Has_an_order hao
+      ON hao.Unique_Order_ID = o.Unique_Order_ID
+     AND hao.Email_Address = o.Registered_Clients_Email_Address
+    WHERE o.Registered_Clients_Email_Address = ?
+      AND o.Order_Status = 'active'
+      AND f.Departure_Date >= DATE('now')
+    ORDER BY f.Departure_Date, f.Departure_Time
+"""
 
-                    hao.Quantity_of_tickets AS quantity_of_tickets
-                FROM Orders o
-                JOIN Flight f ON f.Flight_ID = o.Flight_ID
-                JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
-                JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
-                LEFT JOIN Has_an_order hao
-                  ON hao.Unique_Order_ID = o.Unique_Order_ID
-                 AND hao.Email_Address = o.Registered_Clients_Email_Address
-                WHERE o.Registered_Clients_Email_Address = ?
-                  AND o.Order_Status = 'active'
-                  AND f.Departure_Date >= DATE('now')
-                ORDER BY f.Departure_Date, f.Departure_Time
-            """, (email,))
 
-            orders = cursor.fetchall() or []
+def fetch_future_orders_registered(email: str):
+    try:
+        with db_cursor() as (_, cursor):
+            cursor.execute(FUTURE_ORDERS_REGISTERED_SQL, (email,))
+
+            orders = attach_order_summaries(cursor, cursor.fetchall() or [])
             for o in orders:
-                o["seats"] = _fetch_order_seats(cursor, int(o["unique_order_id"]))
                 o["cancellable"] = can_cancel(o["departure_date"], o["departure_time"])
             return orders
     except Exception:
         return []
 
 
+FUTURE_ORDER_GUEST_SQL = """
+    SELECT
+        o.Unique_Order_ID AS unique_order_id,
+        o.Order_Status    AS order_status,
+        o.Flight_ID       AS flight_id,
+
+        ao.Airport_Name AS origin_airport,
+        ad.Airport_Name AS destination_airport,
+
+        f.Departure_Date AS departure_date,
+        f.Departure_Time AS departure_time,
+        f.Economy_Price  AS economy_price,
+        f.Business_Price AS business_price,
+
+        hao.Quantity_of_tickets AS quantity_of_tickets
+    FROM Orders o
+    JOIN Flight f ON f.Flight_ID = o.Flight_ID
+    JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
+    JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+    LEFT JOIN Has_an_order hao
+      ON hao.Unique_Order_ID = o.Unique_Order_ID
+     AND hao.Email_Address = o.Unidentified_Guest_Email_Address
+    WHERE o.Unique_Order_ID = ?
+      AND o.Unidentified_Guest_Email_Address = ?
+      AND o.Order_Status = 'active'
+      AND f.Departure_Date >= DATE('now')
+    LIMIT 1
+"""
+
+
 def fetch_future_orders_guest(unique_order_id: str, email: str):
     try:
         with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT
-                    o.Unique_Order_ID AS unique_order_id,
-                    o.Order_Status    AS order_status,
-                    o.Flight_ID       AS flight_id,
-
-                    ao.Airport_Name AS origin_airport,
-                    ad.Airport_Name AS destination_airport,
-
-                    f.Departure_Date AS departure_date,
-                    f.Departure_Time AS departure_time,
-
-                    hao.Quantity_of_tickets AS quantity_of_tickets
-                FROM Orders o
-                JOIN Flight f ON f.Flight_ID = o.Flight_ID
-                JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
-                JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
-                LEFT JOIN Has_an_order hao
-                  ON hao.Unique_Order_ID = o.Unique_Order_ID
-                 AND hao.Email_Address = o.Unidentified_Guest_Email_Address
-                WHERE o.Unique_Order_ID = ?
-                  AND o.Unidentified_Guest_Email_Address = ?
-                  AND o.Order_Status = 'active'
-                  AND f.Departure_Date >= DATE('now')
-                LIMIT 1
-            """, (unique_order_id, email))
+            cursor.execute(FUTURE_ORDER_GUEST_SQL, (unique_order_id, email))
 
             row = cursor.fetchone()
             if not row:
                 return []
 
-            row["seats"] = _fetch_order_seats(cursor, int(row["unique_order_id"]))
+            attach_order_summaries(cursor, [row])
             row["cancellable"] = can_cancel(row["departure_date"], row["departure_time"])
             return [row]
     except Exception:
         return []
 
 
-def fetch_past_orders_registered(email: str):
-    try:
-        with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT
-                    o.Unique_Order_ID AS unique_order_id,
-                    o.Order_Status    AS order_status,
-                    o.Flight_ID       AS flight_id,
+def build_past_orders_query(email: str, after=None, limit=None):
+    """
+    Returns (sql, params) for a registered customer's past orders, newest departure first.
+    Keyset-paginated on (Departure_Key, Unique_Order_ID): `after` is a decoded page cursor,
+    so every page is a range scan of idx_orders_registered_departure.
+    """
+    sql = """
+        SELECT
+            o.Unique_Order_ID AS unique_order_id,
+            o.Order_Status    AS order_status,
+            o.Flight_ID       AS flight_id,
+
+            ao.Airport_Name AS origin_airport,
+            ad.Airport_Name AS destination_airport,
+
+            f.Departure_Date AS departure_date,
+            f.Departure_Time AS departure_time,
+            f.Economy_Price  AS economy_price,
+            f.Business_Price AS business_price,
+
+            hao.Quantity_of_tickets AS quantity_of_tickets
+        FROM Orders o
+        JOIN Flight f ON f.Flight_ID = o.Flight_ID
+        JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
+        JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+        LEFT JOIN Has_an_order hao
+          ON hao.Unique_Order_ID = o.Unique_Order_ID
+         AND hao.Email_Address = o.Registered_Clients_Email_Address
+        WHERE o.Registered_Clients_Email_Address = ?
+          AND o.Departure_Key < DATE('now')
+    """
+    params = [email]
 
-                    ao.Airport_Name AS origin_airport,
-                    ad.Airport_Name AS destination_airport,
+    if after:
+        departure_date, departure_time, unique_order_id = after
+        sql += " AND (o.Departure_Key, o.Unique_Order_ID) < (?, ?)"
+        params.extend([f"{departure_date} {departure_time}", unique_order_id])
 
-                    f.Departure_Date AS departure_date,
-                    f.Departure_Time AS departure_time,
+    sql += " ORDER BY o.Departure_Key DESC, o.Unique_Order_ID DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, tuple(params)
 
-                    hao.Quantity_of_tickets AS quantity_of_tickets
-                FROM Orders o
-                JOIN Flight f ON f.Flight_ID = o.Flight_ID
-                JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
-                JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
-                LEFT JOIN Has_an_order hao
-                  ON hao.Unique_Order_ID = o.Unique_Order_ID
-                 AND hao.Email_Address = o.Registered_Clients_Email_Address
-                WHERE o.Registered_Clients_Email_Address = ?
-                  AND f.Departure_Date < DATE('now')
-                ORDER BY f.Departure_Date DESC, f.Departure_Time DESC
-            """, (email,))
 
+def fetch_past_orders_registered(email: str, after=None, page_size=None):
+    """Returns (orders, next_cursor); next_cursor is None on the last page."""
+    page_size = page_size or app.config["ORDER_HISTORY_PAGE_SIZE"]
+    try:
+        with db_cursor() as (_, cursor):
+            cursor.execute(*build_past_orders_query(email, after, limit=page_size + 1))
             orders = cursor.fetchall() or []
+
+            next_cursor = None
+            if len(orders) > page_size:
+                orders = orders[:page_size]
+                last = orders[-1]
+                next_cursor = encode_page_cursor(
+                    last["departure_date"], last["departure_time"], last["unique_order_id"])
+
+            attach_order_summaries(cursor, orders)
             for o in orders:
-                o["seats"] = _fetch_order_seats(cursor, int(o["unique_order_id"]))
                 o["cancellable"] = False
-            return orders
+            return orders, next_cursor
     except Exception:
-        return []
+        return [], None
 
 # =============================
 # ORDER MANAGEMENT
@@ -1305,6 +3172,9 @@ def order_management():
 
     user_is_reg = bool(is_registered_user())
     future_orders, past_orders = [], []
+    after = decode_page_cursor(request.args.get("after"))
+    per_page = page_size("ORDER_HISTORY_PAGE_SIZE")
+    next_cursor = None
 
     if tab == "future":
         if user_is_reg:
@@ -1318,71 +3188,33 @@ def order_management():
     else:
         if user_is_reg:
             email = session.get("Email_Address")
-            past_orders = fetch_past_orders_registered(email)
+            past_orders, next_cursor = fetch_past_orders_registered(email, after, per_page)
 
     # -----------------------------
     # Add final_total to each order
     # -----------------------------
-    flight_prices_cache = {}   # flight_id -> {"Economy": x, "Business": y}
-    order_class_cache = {}     # unique_order_id -> "Economy"/"Business"
+    # original_total comes with the order rows (attach_order_summaries); a customer
+    # cancellation may have its pre-cancellation total remembered in the session.
     cancelled_orig_totals = session.get("cancelled_order_original_totals") or {}
-
-    def _get_prices(flight_id: int):
-        if flight_id not in flight_prices_cache:
-            flight_prices_cache[flight_id] = fetch_flight_prices(flight_id)
-        return flight_prices_cache[flight_id]
-
-    def _get_class(unique_order_id: int):
-        if unique_order_id not in order_class_cache:
-            order_class_cache[unique_order_id] = infer_order_ticket_class(unique_order_id)
-        return order_class_cache[unique_order_id]
-
-    def _calc_original_total(order: dict) -> float:
-        qty = order.get("quantity_of_tickets") or 0
+    for o in (future_orders if tab == "future" else past_orders):
+        status = (o.get("order_status") or "").strip().lower()
+        orig = o.get("original_total") or 0.0
+        if status == "customercancellation":
+            orig = cancelled_orig_totals.get(str(o.get("unique_order_id")), orig)
         try:
-            qty = int(qty)
-        except Exception:
-            qty = 0
-
-        flight_id = int(order.get("flight_id"))
-        unique_order_id = int(order.get("unique_order_id"))
-
-        tc = _get_class(unique_order_id)
-        prices = _get_prices(flight_id)
-        price = float(prices.get(tc, 0.0))
-        return round(qty * price, 2)
-
-    def _attach_final_total(orders: list[dict]):
-        for o in orders:
-            status = (o.get("order_status") or "").strip().lower()
-            if status == "systemcancellation":
-                o["final_total"] = 0.0
-                continue
-            if status == "customercancellation":
-                orig = cancelled_orig_totals.get(str(o.get("unique_order_id")))
-                if orig is None:
-                    try:
-                        orig = _calc_original_total(o)
-                    except Exception:
-                        orig = 0.0
-                o["final_total"] = round(float(orig) * 0.05, 2)
-                continue
-            try:
-                o["final_total"] = _calc_original_total(o)
-            except Exception:
-                o["final_total"] = 0.0
-
-    if tab == "future":
-        _attach_final_total(future_orders)
-    else:
-        _attach_final_total(past_orders)
+            o["final_total"] = compute_display_total(status, orig)
+        except (TypeError, ValueError):
+            o["final_total"] = 0.0
 
     return render_template(
         "order_management.html",
         active_tab=tab,
         user_is_registered=user_is_reg,
         future_orders=future_orders,
-        past_orders=past_orders)
+        past_orders=past_orders,
+        next_cursor=next_cursor,
+        is_first_page=after is None,
+        per_page=per_page)
 
 # =============================
 # ORDER LOOKUP (GUEST)
@@ -1478,7 +3310,7 @@ def cancel_order():
         with db_transaction() as (_, cursor):
             # SQLite: no FOR UPDATE. Transaction itself provides the needed safety in your single-app context.
             cursor.execute("""
-                SELECT Unique_Order_ID, Order_Status, Final_Total
+                SELECT Unique_Order_ID, Flight_ID, Order_Status, Final_Total
                 FROM Orders
                 WHERE Unique_Order_ID = ?
             """, (unique_order_id,))
@@ -1499,11 +3331,27 @@ def cancel_order():
                 WHERE Unique_Order_ID = ?
             """, (fee_total, unique_order_id))
 
+            cursor.execute("""
+                SELECT Plane_ID, Row_Num, Column_Number
+                FROM Selected_Seats
+                WHERE Unique_Order_ID = ?
+                  AND Is_Occupied = 1
+            """, (unique_order_id,))
+            released = cursor.fetchall() or []
+
             cursor.execute("""
                 UPDATE Selected_Seats
                 SET Is_Occupied = 0
                 WHERE Unique_Order_ID = ?
+                  AND Is_Occupied = 1
             """, (unique_order_id,))
+            adjust_flight_occupancy(cursor, int(locked["Flight_ID"]), -cursor.rowcount)
+
+        if released:
+            seat_occupancy.apply(
+                locked["Flight_ID"], released[0]["Plane_ID"],
+                [f"{r['Row_Num']}{r['Column_Number']}" for r in released], occupied=False)
+        search_cache.sync_flight(locked["Flight_ID"])  # a full flight may be bookable again
 
         flash(f"Order {unique_order_id} cancelled. Cancellation fee charged: ${fee_total:.2f}", "success")
         return redirect(url_for("order_management", tab="future"))
@@ -1516,6 +3364,385 @@ def cancel_order():
 # ===================== ADMIN PART ======================
 # ======================================================
 
+# -----------------------------
+# Availability index (planes / pilots / attendants)
+# -----------------------------
+AVAILABILITY_VERSION_SQL = """
+    SELECT
+        (SELECT Version FROM Reference_Data_Version WHERE Name = 'Flight') AS flight_version,
+        (SELECT Version FROM Reference_Data_Version WHERE Name = 'Routes') AS routes_version,
+        (SELECT COUNT(*) FROM Planes) AS planes,
+        (SELECT COUNT(*) FROM Pilots) AS pilots,
+        (SELECT COUNT(*) FROM Flight_Attendants) AS attendants
+"""
+
+AVAILABILITY_RESOURCES_SQL = {
+    "plane": """
+        SELECT p.Plane_ID AS Resource_ID, p.Plane_ID, p.Plane_Size,
+               CASE WHEN pc.Has_Business THEN 'large' ELSE 'small' END AS SizeLabel,
+               pc.Has_Business
+        FROM Planes p
+        JOIN Plane_Capacity pc ON pc.Plane_ID = p.Plane_ID
+        ORDER BY p.Plane_ID
+    """,
+    "pilot": "SELECT Worker_ID AS Resource_ID, Worker_ID, Is_Qualified FROM Pilots ORDER BY Worker_ID",
+    "attendant": "SELECT Worker_ID AS Resource_ID, Worker_ID, Is_Qualified FROM Flight_Attendants ORDER BY Worker_ID",}
+
+# Accumulated hours per worker on done flights (admin_reports; crew suggestions balance it).
+WORKER_FLIGHT_HOURS_SQL = """
+    SELECT
+        w.Worker_ID,
+        w.Employee_Type,
+        ROUND(SUM(
+            CASE WHEN r.Duration_Minutes <= 6 * 60 THEN r.Duration_Minutes ELSE 0 END
+        ) / 60.0, 2) AS Short_Flight_Hours,
+        ROUND(SUM(
+            CASE WHEN r.Duration_Minutes > 6 * 60 THEN r.Duration_Minutes ELSE 0 END
+        ) / 60.0, 2) AS Long_Flight_Hours
+    FROM (
+        SELECT Worker_ID, 'Pilot' AS Employee_Type
+        FROM Pilots
+        UNION ALL
+        SELECT Worker_ID, 'Flight_Attendant' AS Employee_Type
+        FROM Flight_Attendants
+    ) AS w
+
+    LEFT JOIN Pilots_Scheduled_to_Flights psf
+      ON w.Employee_Type = 'Pilot'
+     AND psf.Worker_ID = w.Worker_ID
+
+    LEFT JOIN Flight_Attendants_Assigned_To_Flights fa
+      ON w.Employee_Type = 'Flight_Attendant'
+     AND fa.Worker_ID = w.Worker_ID
+
+    LEFT JOIN Flight f
+      ON f.Flight_ID = COALESCE(psf.Flight_ID, fa.Flight_ID)
+     AND f.Flight_Status = 'done'
+
+    LEFT JOIN Routes r
+      ON r.Origin_Airport = f.Origin_Airport
+     AND r.Destination_Airport = f.Destination_Airport
+
+    GROUP BY
+        w.Worker_ID,
+        w.Employee_Type
+    ORDER BY
+        w.Worker_ID,
+        w.Employee_Type
+"""
+
+EMPLOYEE_TYPE_KINDS = {"Pilot": "pilot", "Flight_Attendant": "attendant"}
+
+
+def crew_size(is_large_plane) -> tuple:
+    """(pilots, attendants) a flight needs: 3 + 6 on a large plane, 2 + 3 on a small one."""
+    return (3, 6) if is_large_plane else (2, 3)
+
+# Non-cancelled flights that haven't landed by the given epoch (idx_flight_end_epoch range).
+AVAILABILITY_BUSY_SQL = {
+    "plane": """
+        SELECT f.Plane_ID AS Resource_ID, f.Flight_ID, f.Start_Epoch, f.End_Epoch
+        FROM Flight f
+        WHERE f.End_Epoch > ?
+          AND f.Flight_Status <> 'cancelled'
+    """,
+    "pilot": """
+        SELECT ps.Worker_ID AS Resource_ID, f.Flight_ID, f.Start_Epoch, f.End_Epoch
+        FROM Flight f
+        JOIN Pilots_Scheduled_to_Flights ps ON ps.Flight_ID = f.Flight_ID
+        WHERE f.End_Epoch > ?
+          AND f.Flight_Status <> 'cancelled'
+    """,
+    "attendant": """
+        SELECT fa.Worker_ID AS Resource_ID, f.Flight_ID, f.Start_Epoch, f.End_Epoch
+        FROM Flight f
+        JOIN Flight_Attendants_Assigned_To_Flights fa ON fa.Flight_ID = f.Flight_ID
+        WHERE f.End_Epoch > ?
+          AND f.Flight_Status <> 'cancelled'
+    """,}
+
+
+class BusyList:
+    """
+    One resource's flights as [start, end) intervals sorted by start, with a running maximum
+    of the ends: "busy in [s, e)?" is one bisect even when intervals overlap each other.
+    """
+    __slots__ = ("starts", "ends", "flights", "max_end")
+
+    def __init__(self):
+        self.starts, self.ends, self.flights, self.max_end = [], [], [], []
+
+    def _reindex(self, i):
+        run = self.max_end[i - 1] if i > 0 else None
+        del self.max_end[i:]
+        for end in self.ends[i:]:
+            run = end if run is None or end > run else run
+            self.max_end.append(run)
+
+    def add(self, start, end, flight_id):
+        i = bisect.bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.flights.insert(i, flight_id)
+        self._reindex(i)
+
+    def remove(self, flight_id) -> bool:
+        try:
+            i = self.flights.index(flight_id)
+        except ValueError:
+            return False
+        del self.starts[i], self.ends[i], self.flights[i]
+        self._reindex(i)
+        return True
+
+    def busy(self, start, end) -> bool:
+        i = bisect.bisect_left(self.starts, end) - 1
+        return i >= 0 and self.max_end[i] > start
+
+    def conflicts(self, start, end) -> list:
+        """Flight ids overlapping [start, end), latest start first."""
+        out = []
+        i = bisect.bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_end[i] > start:
+            if self.ends[i] > start:
+                out.append(self.flights[i])
+            i -= 1
+        return out
+
+
+class AvailabilityIndex:
+    """
+    Who is free in [start, end): busy lists per plane, pilot and attendant, built from the
+    flight and assignment tables and answered in memory (O(log n) per resource) instead of
+    a NOT EXISTS anti-join per candidate.
+    - Only windows from now on are answered (flights that had landed at build time aren't loaded).
+    - Flights created/cancelled by this process are applied right away (add_flight/remove_flight);
+      changes from elsewhere are picked up when the Flight or Routes stamp (a new route duration
+      moves End_Epoch through a trigger) or the staff/plane counts move, checked at most every
+      check_interval seconds.
+    - admin_new_flight_review still re-checks overlaps in the database inside its transaction.
+    """
+    KINDS = ("plane", "pilot", "attendant")
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = float(check_interval)
+        self._lock = threading.Lock()      # busy lists and counters
+        self._refresh = threading.Lock()   # one stamp check / rebuild at a time
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._epoch = 0
+        self._counters = {"builds": 0, "queries": 0, "applied": 0, "suggestions": 0, "planned": 0}
+
+    def _build(self, cursor, version) -> dict:
+        resources, busy, by_flight = {}, {}, {}
+        now = epoch_seconds(datetime.now())
+        cursor.execute(WORKER_FLIGHT_HOURS_SQL)
+        hours = {
+            (EMPLOYEE_TYPE_KINDS[r["Employee_Type"]], int(r["Worker_ID"])):
+                float(r["Short_Flight_Hours"] or 0) + float(r["Long_Flight_Hours"] or 0)
+            for r in cursor.fetchall()}
+        for kind in self.KINDS:
+            cursor.execute(AVAILABILITY_RESOURCES_SQL[kind])
+            rows = [dict(r) for r in cursor.fetchall()]
+            if kind != "plane":
+                for r in rows:
+                    r["Flight_Hours"] = hours.get((kind, int(r["Resource_ID"])), 0.0)
+            resources[kind] = tuple(rows)
+            lists = busy[kind] = {}
+            cursor.execute(AVAILABILITY_BUSY_SQL[kind], (now,))
+            for r in cursor.fetchall():
+                rid, fid = int(r["Resource_ID"]), int(r["Flight_ID"])
+                lists.setdefault(rid, BusyList()).add(r["Start_Epoch"], r["End_Epoch"], fid)
+                by_flight.setdefault(fid, []).append((kind, rid))
+        return {"version": version, "resources": resources, "busy": busy, "by_flight": by_flight,
+                "built_at": datetime.now().isoformat(timespec="seconds")}
+
+    def _current(self) -> dict:
+        """Snapshot to read under self._lock (call without holding it)."""
+        snap = self._snapshot
+        if snap is not None and monotonic() - self._checked_at < self.check_interval:
+            return snap
+        with self._refresh:
+            snap = self._snapshot
+            if snap is not None and monotonic() - self._checked_at < self.check_interval:
+                return snap
+            epoch, fresh = self._epoch, None
+            with db_cursor() as (_, cursor):
+                cursor.execute(AVAILABILITY_VERSION_SQL)
+                version = tuple(cursor.fetchone().values())
+                if snap is None or snap["version"] != version:
+                    fresh = self._build(cursor, version)
+            with self._lock:
+                # a flight applied meanwhile may be missing from the fresh build: keep the old one
+                if fresh is not None and (self._epoch == epoch or self._snapshot is None):
+                    self._snapshot = fresh
+                    self._counters["builds"] += 1
+                self._checked_at = monotonic()
+                return self._snapshot or fresh or snap
+
+    @staticmethod
+    def _free(snap, kind, start, end, keep):
+        lists = snap["busy"][kind]
+        return (r for r in snap["resources"][kind]
+                if keep(r) and not (r["Resource_ID"] in lists and lists[r["Resource_ID"]].busy(start, end)))
+
+    def _available(self, kind, window_start, window_end, keep):
+        start, end = epoch_seconds(window_start), epoch_seconds(window_end)
+        snap = self._current()
+        with self._lock:
+            self._counters["queries"] += 1
+            return [dict(r) for r in self._free(snap, kind, start, end, keep)]
+
+    def available_planes(self, window_start, window_end, is_long):
+        """Same rows as utils.available_planes: long flights need a large (business) plane."""
+        return self._available("plane", window_start, window_end, lambda r: not is_long or r["Has_Business"])
+
+    def available_pilots(self, window_start, window_end, require_long_qualified):
+        return self._available("pilot", window_start, window_end,
+                               lambda r: not require_long_qualified or r["Is_Qualified"])
+
+    def available_attendants(self, window_start, window_end, require_long_qualified):
+        return self._available("attendant", window_start, window_end,
+                               lambda r: not require_long_qualified or r["Is_Qualified"])
+
+    def suggest_crew(self, window_start, window_end, is_long, pilots, attendants):
+        """
+        Crew for the window that evens out workload: the `pilots` / `attendants` free workers
+        (qualified ones for long flights) with the fewest accumulated flight hours (Flight_Hours,
+        as in admin_reports), ties by Worker_ID. heapq.nsmallest keeps this O(W log n).
+        Returns (pilot_rows, attendant_rows); a list is shorter than asked if too few are free.
+        """
+        start, end = epoch_seconds(window_start), epoch_seconds(window_end)
+        keep = lambda r: not is_long or r["Is_Qualified"]
+        by_load = lambda r: (r["Flight_Hours"], r["Resource_ID"])
+        snap = self._current()
+        with self._lock:
+            self._counters["suggestions"] += 1
+            return tuple(
+                [dict(r) for r in heapq.nsmallest(n, self._free(snap, kind, start, end, keep), key=by_load)]
+                for kind, n in (("pilot", int(pilots)), ("attendant", int(attendants))))
+
+    def plan_flights(self, windows, is_long, allow_large=True, allow_small=True):
+        """
+        Plane and crew for each (key, window_start, window_end), booking the windows in order
+        on top of the busy lists so the batch never overlaps itself.
+        - Planes: large only for long flights; a plane already used in the batch comes first,
+          then small before large, then Plane_ID.
+        - Crew: crew_size() of the plane, qualified workers on long flights, fewest flight hours
+          first (hours planned earlier in the batch count too).
+        Returns one dict per window: key, window_start, window_end, plane_id, plane_size,
+        pilots, attendants, error (a message when the window can't be staffed, else None).
+        """
+        keep_crew = lambda r: not is_long or r["Is_Qualified"]
+        keep_plane = lambda p: (allow_large if p["Has_Business"] else allow_small and not is_long)
+        plans = []
+        snap = self._current()
+        with self._lock:
+            batch = {kind: {} for kind in self.KINDS}   # rid -> BusyList of this batch's windows
+            batch_hours, used_planes = {}, set()
+
+            for key, window_start, window_end in windows:
+                start, end = epoch_seconds(window_start), epoch_seconds(window_end)
+                plan = {"key": key, "window_start": window_start, "window_end": window_end,
+                        "plane_id": None, "plane_size": None, "pilots": [], "attendants": [], "error": None}
+                plans.append(plan)
+
+                def free(kind, keep):
+                    planned = batch[kind]
+                    return (r for r in self._free(snap, kind, start, end, keep)
+                            if not (r["Resource_ID"] in planned and planned[r["Resource_ID"]].busy(start, end)))
+
+                def by_load(kind):
+                    return lambda r: (r["Flight_Hours"] + batch_hours.get((kind, r["Resource_ID"]), 0.0), r["Resource_ID"])
+
+                candidates = sorted(free("plane", keep_plane),
+                                    key=lambda p: (p["Plane_ID"] not in used_planes, bool(p["Has_Business"]), p["Plane_ID"]))
+                if not candidates:
+                    if not is_long and not allow_large:
+                        plan["error"] = "No small plane is free (add a business price to use large planes)."
+                    else:
+                        plan["error"] = "No {}plane is free.".format("large " if is_long or not allow_small else "")
+                    continue
+
+                # first plane whose crew can be filled (a small one needs fewer people)
+                crews = {}
+                for plane in candidates:
+                    need = crew_size(plane["Has_Business"])
+                    if need not in crews:
+                        crews[need] = (heapq.nsmallest(need[0], free("pilot", keep_crew), key=by_load("pilot")),
+                                       heapq.nsmallest(need[1], free("attendant", keep_crew), key=by_load("attendant")))
+                    pilots, attendants = crews[need]
+                    if len(pilots) == need[0] and len(attendants) == need[1]:
+                        break
+                else:
+                    need = min(crews)
+                    pilots, attendants = crews[need]
+                    plan["error"] = "Not enough {}crew is free: {}/{} pilots, {}/{} attendants.".format(
+                        "qualified " if is_long else "", len(pilots), need[0], len(attendants), need[1])
+                    continue
+
+                members = [("plane", plane)] + [("pilot", r) for r in pilots] + [("attendant", r) for r in attendants]
+                for kind, r in members:
+                    batch[kind].setdefault(r["Resource_ID"], BusyList()).add(start, end, key)
+                    if kind != "plane":
+                        batch_hours[(kind, r["Resource_ID"])] = batch_hours.get((kind, r["Resource_ID"]), 0.0) + (end - start) / 3600
+                used_planes.add(plane["Plane_ID"])
+                plan.update({
+                    "plane_id": plane["Plane_ID"], "plane_size": plane["SizeLabel"],
+                    "pilots": [r["Worker_ID"] for r in pilots],
+                    "attendants": [r["Worker_ID"] for r in attendants],})
+            self._counters["planned"] += len(plans)
+        return plans
+
+    def add_flight(self, flight_id, plane_id, window_start, window_end, pilots=(), attendants=()):
+        """Records a flight committed by this process."""
+        start, end = epoch_seconds(window_start), epoch_seconds(window_end)
+        members = ([("plane", int(plane_id))] + [("pilot", int(w)) for w in pilots]
+                   + [("attendant", int(w)) for w in attendants])
+        with self._lock:
+            self._epoch += 1
+            snap = self._snapshot
+            if snap is None:
+                return
+            for kind, rid in members:
+                snap["busy"][kind].setdefault(rid, BusyList()).add(start, end, int(flight_id))
+            snap["by_flight"][int(flight_id)] = members
+            self._counters["applied"] += 1
+
+    def remove_flight(self, flight_id):
+        """Frees a flight's plane and crew (the flight was cancelled by this process)."""
+        with self._lock:
+            self._epoch += 1
+            snap = self._snapshot
+            if snap is None:
+                return
+            for kind, rid in snap["by_flight"].pop(int(flight_id), []):
+                snap["busy"][kind][rid].remove(int(flight_id))
+            self._counters["applied"] += 1
+
+    def invalidate(self):
+        """Drops the snapshot, e.g. after staff or planes were added."""
+        with self._lock:
+            self._epoch += 1
+            self._snapshot = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self._counters)
+            snap = self._snapshot
+            if snap is not None:
+                out.update({
+                    "built_at": snap["built_at"],
+                    "resources": {k: len(v) for k, v in snap["resources"].items()},
+                    "busy_intervals": {k: sum(len(b.starts) for b in v.values())
+                                       for k, v in snap["busy"].items()},})
+        out["check_interval"] = self.check_interval
+        return out
+
+
+availability = AvailabilityIndex(check_interval=app.config["AVAILABILITY_CHECK_INTERVAL"])
+
+
 def admin_required() -> bool:
     return session.get("user_type") == "admin" and session.get("worker_id")
 
@@ -1556,12 +3783,10 @@ def admin_reports():
                     SELECT
                         f.Flight_ID,
                         COUNT(*) AS occupied_seats,
-                        (
-                            SELECT COUNT(*)
-                            FROM Seats s
-                            WHERE s.Plane_ID = f.Plane_ID
-                        ) AS total_seats
+                        pc.Total_Seats AS total_seats
                     FROM Flight f
+                    JOIN Plane_Capacity pc
+                        ON pc.Plane_ID = f.Plane_ID
                     JOIN Orders o
                         ON o.Flight_ID = f.Flight_ID
                     JOIN Selected_Seats ss
@@ -1618,57 +3843,7 @@ def admin_reports():
             revenue_rows = cursor.fetchall() or []
 
             # Workers accumulated flight hours (short vs long)
-            cursor.execute("""
-                SELECT
-                    w.Worker_ID,
-                    w.Employee_Type,
-                    ROUND(SUM(
-                        CASE
-                            WHEN (strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00'))
-                                 <= (6 * 3600)
-                            THEN (strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00'))
-                            ELSE 0
-                        END
-                    ) / 3600.0, 2) AS Short_Flight_Hours,
-                    ROUND(SUM(
-                        CASE
-                            WHEN (strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00'))
-                                 > (6 * 3600)
-                            THEN (strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00'))
-                            ELSE 0
-                        END
-                    ) / 3600.0, 2) AS Long_Flight_Hours
-                FROM (
-                    SELECT Worker_ID, 'Pilot' AS Employee_Type
-                    FROM Pilots
-                    UNION ALL
-                    SELECT Worker_ID, 'Flight_Attendant' AS Employee_Type
-                    FROM Flight_Attendants
-                ) AS w
-
-                LEFT JOIN Pilots_Scheduled_to_Flights psf
-                  ON w.Employee_Type = 'Pilot'
-                 AND psf.Worker_ID = w.Worker_ID
-
-                LEFT JOIN Flight_Attendants_Assigned_To_Flights fa
-                  ON w.Employee_Type = 'Flight_Attendant'
-                 AND fa.Worker_ID = w.Worker_ID
-
-                LEFT JOIN Flight f
-                  ON f.Flight_ID = COALESCE(psf.Flight_ID, fa.Flight_ID)
-                 AND f.Flight_Status = 'done'
-
-                LEFT JOIN Routes r
-                  ON r.Origin_Airport = f.Origin_Airport
-                 AND r.Destination_Airport = f.Destination_Airport
-
-                GROUP BY
-                    w.Worker_ID,
-                    w.Employee_Type
-                ORDER BY
-                    w.Worker_ID,
-                    w.Employee_Type;
-            """)
+            cursor.execute(WORKER_FLIGHT_HOURS_SQL)
             worker_hours_rows = cursor.fetchall() or []
 
             # Customer cancellation rate by month
@@ -1733,6 +3908,65 @@ def admin_reports():
 # -----------------------------
 # Admin - Flight Search Board
 # -----------------------------
+def build_admin_flights_query(origin_id, destination_id, start_date, end_date, status, after=None, limit=None):
+    """
+    Returns (sql, params) for the admin flight board (newest departures first).
+    Keyset-paginated on (Departure_Date, Departure_Time, Flight_ID), which is the order of
+    idx_flight_departure / idx_flight_route_departure (Flight_ID is the rowid), so no page sorts.
+    """
+    sql = """
+        SELECT
+            f.Flight_ID,
+            f.Plane_ID,
+            f.Departure_Date,
+            f.Departure_Time,
+            f.Economy_Price,
+            f.Business_Price,
+            f.Flight_Status,
+            ao.Airport_Name AS origin_airport_name,
+            ao.City AS origin_city,
+            ad.Airport_Name AS dest_airport_name,
+            ad.City AS dest_city
+        FROM Flight f
+        JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
+        JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
+        WHERE 1=1
+    """
+    params = []
+
+    if origin_id:
+        sql += " AND f.Origin_Airport = ?"
+        params.append(origin_id)
+
+    if destination_id:
+        sql += " AND f.Destination_Airport = ?"
+        params.append(destination_id)
+
+    if start_date and end_date:
+        sql += " AND f.Departure_Date BETWEEN ? AND ?"
+        params.extend([start_date, end_date])
+    elif start_date:
+        sql += " AND f.Departure_Date >= ?"
+        params.append(start_date)
+    elif end_date:
+        sql += " AND f.Departure_Date <= ?"
+        params.append(end_date)
+
+    if status:
+        sql += " AND f.Flight_Status = ?"  # already lower-cased + validated against FLIGHT_STATUSES
+        params.append(status)
+
+    if after:
+        sql += " AND (f.Departure_Date, f.Departure_Time, f.Flight_ID) < (?, ?, ?)"
+        params.extend(after)
+
+    sql += " ORDER BY f.Departure_Date DESC, f.Departure_Time DESC, f.Flight_ID DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, tuple(params)
+
+
 @app.route("/admin/flights", methods=["GET"])
 def admin_flights():
     if not admin_required_or_redirect():
@@ -1747,69 +3981,24 @@ def admin_flights():
     if status and status not in FLIGHT_STATUSES:
         status = ""
 
-    airports, flights = [], []
+    after = decode_page_cursor(request.args.get("after"))
+    per_page = page_size("ADMIN_FLIGHTS_PAGE_SIZE")
+    airports, flights, next_cursor = [], [], None
 
     try:
-        try:
-            with db_transaction() as (_, tcur):
-                update_flight_statuses_done_if_past(tcur)
-        except Exception as e:
-            print("Flight status auto-update failed (admin_flights):", e)
-
+        airports = reference_data.airports()
         with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT Airport_ID, Airport_Name, City, Country
-                FROM Airports
-                ORDER BY Country, City, Airport_Name """)
-            airports = cursor.fetchall()
-
-            sql = """
-                SELECT
-                    f.Flight_ID,
-                    f.Plane_ID,
-                    f.Departure_Date,
-                    f.Departure_Time,
-                    f.Economy_Price,
-                    f.Business_Price,
-                    f.Flight_Status,
-                    ao.Airport_Name AS origin_airport_name,
-                    ao.City AS origin_city,
-                    ad.Airport_Name AS dest_airport_name,
-                    ad.City AS dest_city
-                FROM Flight f
-                JOIN Airports ao ON ao.Airport_ID = f.Origin_Airport
-                JOIN Airports ad ON ad.Airport_ID = f.Destination_Airport
-                WHERE 1=1
-            """
-            params = []
-
-            if origin_id:
-                sql += " AND f.Origin_Airport = ?"
-                params.append(origin_id)
-
-            if destination_id:
-                sql += " AND f.Destination_Airport = ?"
-                params.append(destination_id)
-
-            if start_date and end_date:
-                sql += " AND f.Departure_Date BETWEEN ? AND ?"
-                params.extend([start_date, end_date])
-            elif start_date:
-                sql += " AND f.Departure_Date >= ?"
-                params.append(start_date)
-            elif end_date:
-                sql += " AND f.Departure_Date <= ?"
-                params.append(end_date)
-
-            if status:
-                sql += " AND LOWER(f.Flight_Status) = ?"
-                params.append(status)
-
-            sql += " ORDER BY f.Departure_Date DESC, f.Departure_Time DESC"
-
-            cursor.execute(sql, tuple(params))
+            sql, params = build_admin_flights_query(
+                origin_id, destination_id, start_date, end_date, status, after, limit=per_page + 1)
+            cursor.execute(sql, params)
             flights = cursor.fetchall()
 
+            if len(flights) > per_page:
+                flights = flights[:per_page]
+                last = flights[-1]
+                next_cursor = encode_page_cursor(
+                    last["Departure_Date"], last["Departure_Time"], last["Flight_ID"])
+
     except Exception as e:
         flash(f"Database error loading flights: {e}", "error")
 
@@ -1821,7 +4010,11 @@ def admin_flights():
         destination_id=destination_id,
         start_date=start_date,
         end_date=end_date,
-        status=status)
+        status=status,
+        next_cursor=next_cursor,
+        is_first_page=after is None,
+        page_args=dict(origin_id=origin_id, destination_id=destination_id, start_date=start_date,
+                       end_date=end_date, status=status, per_page=per_page))
 
 # ======================================================
 # Admin - Add Flight
@@ -1836,49 +4029,43 @@ def admin_new_flight_step1():
     airports = []
 
     try:
-        with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT Airport_ID, Airport_Name, City, Country
-                FROM Airports
-                ORDER BY Country, City, Airport_Name """)
-            airports = cursor.fetchall()
-
-            if request.method == "POST":
-                origin_id = (request.form.get("origin_id") or "").strip()
-                dest_id = (request.form.get("destination_id") or "").strip()
-                dep_date = (request.form.get("departure_date") or "").strip()
-                dep_time = (request.form.get("departure_time") or "").strip()
-
-                if not all([origin_id, dest_id, dep_date, dep_time]):
-                    flash("All fields are required.", "error")
-                    return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
-
-                if origin_id == dest_id:
-                    flash("Origin and destination must be different.", "error")
-                    return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
-
-                duration = get_route_duration_minutes(cursor, origin_id, dest_id)
-                if duration is None:
-                    flash("Route duration not found for this origin/destination.", "error")
-                    return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
-
-                dep_dt = dt_from_date_time(dep_date, dep_time)
-                if dep_dt < datetime.now():
-                    flash("Departure date must be in the future.", "error")
-                    return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
-
-                end_dt = dep_dt + timedelta(minutes=int(duration))
-
-                session["admin_new_flight"] = {
-                    "origin_id": int(origin_id),
-                    "dest_id": int(dest_id),
-                    "dep_date": dep_date,
-                    "dep_time": dep_time,
-                    "duration": int(duration),
-                    "is_long": is_long_flight(int(duration)),
-                    "window_start": dep_dt.strftime("%Y-%m-%d %H:%M:%S"),
-                    "window_end": end_dt.strftime("%Y-%m-%d %H:%M:%S") }
-                return redirect(url_for("admin_new_flight_step2"))
+        airports = reference_data.airports()
+        if request.method == "POST":
+            origin_id = (request.form.get("origin_id") or "").strip()
+            dest_id = (request.form.get("destination_id") or "").strip()
+            dep_date = (request.form.get("departure_date") or "").strip()
+            dep_time = (request.form.get("departure_time") or "").strip()
+
+            if not all([origin_id, dest_id, dep_date, dep_time]):
+                flash("All fields are required.", "error")
+                return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
+
+            if origin_id == dest_id:
+                flash("Origin and destination must be different.", "error")
+                return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
+
+            duration = reference_data.route_duration(origin_id, dest_id)
+            if duration is None:
+                flash("Route duration not found for this origin/destination.", "error")
+                return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
+
+            dep_dt = dt_from_date_time(dep_date, dep_time)
+            if dep_dt < datetime.now():
+                flash("Departure date must be in the future.", "error")
+                return render_template("admin_new_flight_step1.html", airports=airports, today_min=today_min)
+
+            end_dt = dep_dt + timedelta(minutes=int(duration))
+
+            session["admin_new_flight"] = {
+                "origin_id": int(origin_id),
+                "dest_id": int(dest_id),
+                "dep_date": dep_date,
+                "dep_time": dep_time,
+                "duration": int(duration),
+                "is_long": is_long_flight(int(duration)),
+                "window_start": dep_dt.strftime("%Y-%m-%d %H:%M:%S"),
+                "window_end": end_dt.strftime("%Y-%m-%d %H:%M:%S") }
+            return redirect(url_for("admin_new_flight_step2"))
 
         return render_template("admin_new_flight_step1.html", airports=airports , today_min=today_min)
 
@@ -1900,95 +4087,109 @@ def admin_new_flight_step2():
         return redirect(url_for("admin_new_flight_step1"))
 
     try:
-        with db_cursor() as (_, cursor):
-            is_long = bool(draft["is_long"])
-            window_start = draft["window_start"]
-            window_end = draft["window_end"]
-
-            # Planes + Staff availability
-            planes = available_planes(cursor, window_start, window_end, is_long=is_long)
-            pilots = available_pilots(cursor, window_start, window_end, require_long_qualified=is_long)
-            attendants = available_attendants(cursor, window_start, window_end, require_long_qualified=is_long)
-
-            if request.method == "POST":
-                plane_id = (request.form.get("plane_id") or "").strip()
-                economy_price = (request.form.get("economy_price") or "").strip()
-                business_price = (request.form.get("business_price") or "").strip()
-                selected_pilots = request.form.getlist("pilots")
-                selected_att = request.form.getlist("attendants")
-
-                if not plane_id or not economy_price:
-                    flash("Plane and economy price are required.", "error")
-                    return render_template(
-                        "admin_new_flight_step2.html",
-                        draft=draft, planes=planes, pilots=pilots, attendants=attendants )
+        is_long = bool(draft["is_long"])
+        window_start = draft["window_start"]
+        window_end = draft["window_end"]
 
+        # Planes + Staff availability
+        planes = availability.available_planes(window_start, window_end, is_long=is_long)
+        pilots = availability.available_pilots(window_start, window_end, require_long_qualified=is_long)
+        attendants = availability.available_attendants(window_start, window_end, require_long_qualified=is_long)
+
+        def render_step2(selected_pilots=(), selected_att=()):
+            # keeps the admin's plane, prices and crew ticks when the form comes back
+            return render_template(
+                "admin_new_flight_step2.html",
+                draft=draft, planes=planes, pilots=pilots, attendants=attendants,
+                form=request.form, selected_pilots={str(w) for w in selected_pilots},
+                selected_attendants={str(w) for w in selected_att})
+
+        if request.method == "POST":
+            plane_id = (request.form.get("plane_id") or "").strip()
+            economy_price = (request.form.get("economy_price") or "").strip()
+            business_price = (request.form.get("business_price") or "").strip()
+            selected_pilots = request.form.getlist("pilots")
+            selected_att = request.form.getlist("attendants")
+            auto_crew = request.form.get("action") == "auto_crew"
+
+            if not plane_id or (not economy_price and not auto_crew):
+                flash("Plane and economy price are required.", "error")
+                return render_step2(selected_pilots, selected_att)
+
+            # the availability index reads on its own connection; this cursor only serves the plane lookups
+            with db_cursor() as (_, cursor):
                 cursor.execute("SELECT Plane_ID FROM Planes WHERE Plane_ID = ?", (plane_id,))
-                if not cursor.fetchone():
-                    flash("Selected plane not found.", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
+                plane_found = cursor.fetchone() is not None
+                is_plane_large = plane_found and plane_is_large(cursor, int(plane_id))  # Plane_Capacity (has Business seats)
+            if not plane_found:
+                flash("Selected plane not found.", "error")
+                return redirect(url_for("admin_new_flight_step2"))
 
-                plane_id_int = int(plane_id)
-                is_plane_large = plane_is_large(cursor, plane_id_int)  # by Seats table
-                size_label = "large" if is_plane_large else "small"
+            plane_id_int = int(plane_id)
+            size_label = "large" if is_plane_large else "small"
 
-                if is_long and not is_plane_large:
-                    flash("Long flight requires a LARGE plane (Economy + Business seats).", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
+            if is_long and not is_plane_large:
+                flash("Long flight requires a LARGE plane (Economy + Business seats).", "error")
+                return redirect(url_for("admin_new_flight_step2"))
+
+            req_pilots, req_att = crew_size(is_plane_large)
 
-                req_pilots = 3 if is_plane_large else 2
-                req_att = 6 if is_plane_large else 3
-
-                if len(selected_pilots) != req_pilots:
-                    flash(f"Please select exactly {req_pilots} pilots.", "error")
-                    return render_template(
-                        "admin_new_flight_step2.html",
-                        draft=draft, planes=planes, pilots=pilots, attendants=attendants)
-
-                if len(selected_att) != req_att:
-                    flash(f"Please select exactly {req_att} attendants.", "error")
-                    return render_template(
-                        "admin_new_flight_step2.html",
-                        draft=draft, planes=planes, pilots=pilots, attendants=attendants)
-
-                bp = None
-                if is_plane_large:
-                    if not business_price:
-                        flash("Business price is required for LARGE planes (Business class exists).", "error")
-                        return render_template(
-                            "admin_new_flight_step2.html",
-                            draft=draft, planes=planes, pilots=pilots, attendants=attendants)
-                    bp = float(business_price)
-
-                current_planes = available_planes(cursor, window_start, window_end, is_long=is_long)
-                current_plane_ids = {int(p["Plane_ID"]) for p in current_planes}
-                if plane_id_int not in current_plane_ids:
+            if auto_crew:
+                if plane_id_int not in {int(p["Plane_ID"]) for p in planes}:
                     flash("Selected plane is no longer available in this time window.", "error")
                     return redirect(url_for("admin_new_flight_step2"))
+                crew_pilots, crew_att = availability.suggest_crew(
+                    window_start, window_end, is_long, pilots=req_pilots, attendants=req_att)
+                if len(crew_pilots) < req_pilots or len(crew_att) < req_att:
+                    flash(f"Not enough {'qualified ' if is_long else ''}crew is free in this window: "
+                          f"{len(crew_pilots)}/{req_pilots} pilots, {len(crew_att)}/{req_att} attendants.", "error")
+                else:
+                    flash(f"Suggested the {req_pilots} pilots and {req_att} attendants with the fewest "
+                          f"flight hours. Review the selection and continue.", "success")
+                return render_step2([w["Worker_ID"] for w in crew_pilots], [w["Worker_ID"] for w in crew_att])
+
+            if len(selected_pilots) != req_pilots:
+                flash(f"Please select exactly {req_pilots} pilots.", "error")
+                return render_step2(selected_pilots, selected_att)
+
+            if len(selected_att) != req_att:
+                flash(f"Please select exactly {req_att} attendants.", "error")
+                return render_step2(selected_pilots, selected_att)
+
+            bp = None
+            if is_plane_large:
+                if not business_price:
+                    flash("Business price is required for LARGE planes (Business class exists).", "error")
+                    return render_step2(selected_pilots, selected_att)
+                bp = float(business_price)
+
+            current_planes = availability.available_planes(window_start, window_end, is_long=is_long)
+            current_plane_ids = {int(p["Plane_ID"]) for p in current_planes}
+            if plane_id_int not in current_plane_ids:
+                flash("Selected plane is no longer available in this time window.", "error")
+                return redirect(url_for("admin_new_flight_step2"))
 
-                current_pilots = {str(p["Worker_ID"]) for p in available_pilots(cursor, window_start, window_end, require_long_qualified=is_long)}
-                if any(str(w) not in current_pilots for w in selected_pilots):
-                    flash("One or more pilots are no longer available.", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
+            current_pilots = {str(p["Worker_ID"]) for p in availability.available_pilots(window_start, window_end, require_long_qualified=is_long)}
+            if any(str(w) not in current_pilots for w in selected_pilots):
+                flash("One or more pilots are no longer available.", "error")
+                return redirect(url_for("admin_new_flight_step2"))
 
-                current_att = {str(a["Worker_ID"]) for a in available_attendants(cursor, window_start, window_end, require_long_qualified=is_long)}
-                if any(str(w) not in current_att for w in selected_att):
-                    flash("One or more attendants are no longer available.", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
+            current_att = {str(a["Worker_ID"]) for a in availability.available_attendants(window_start, window_end, require_long_qualified=is_long)}
+            if any(str(w) not in current_att for w in selected_att):
+                flash("One or more attendants are no longer available.", "error")
+                return redirect(url_for("admin_new_flight_step2"))
 
-                draft.update({
-                    "plane_id": plane_id_int,
-                    "plane_size": size_label,
-                    "economy_price": float(economy_price),
-                    "business_price": bp,
-                    "selected_pilots": [str(x) for x in selected_pilots],
-                    "selected_attendants": [str(x) for x in selected_att],})
-                session["admin_new_flight"] = draft
-                return redirect(url_for("admin_new_flight_review"))
+            draft.update({
+                "plane_id": plane_id_int,
+                "plane_size": size_label,
+                "economy_price": float(economy_price),
+                "business_price": bp,
+                "selected_pilots": [str(x) for x in selected_pilots],
+                "selected_attendants": [str(x) for x in selected_att],})
+            session["admin_new_flight"] = draft
+            return redirect(url_for("admin_new_flight_review"))
 
-        return render_template(
-            "admin_new_flight_step2.html",
-            draft=draft, planes=planes, pilots=pilots, attendants=attendants)
+        return render_step2()
 
     except Exception as e:
         flash(f"Database error: {e}", "error")
@@ -1998,6 +4199,32 @@ def admin_new_flight_step2():
 # =============================
 # Admin - Add Flight (REVIEW)
 # =============================
+INSERT_FLIGHT_SQL = """
+    INSERT INTO Flight
+      (Flight_ID, Plane_ID, Origin_Airport, Destination_Airport,
+       Departure_Time, Departure_Date,
+       Economy_Price, Business_Price, Flight_Status)
+    VALUES
+      (?,?,?,?,?,?,?,?, 'active')
+"""
+
+
+def describe_crew_conflict(row) -> str:
+    origin = reference_data.airport(row["Origin_Airport"]) or {}
+    dest = reference_data.airport(row["Destination_Airport"]) or {}
+    return "{} {} is on flight #{} {} → {} ({} {})".format(
+        row["Resource_Type"].capitalize(), row["Resource_ID"], row["Flight_ID"],
+        origin.get("Airport_Name", row["Origin_Airport"]), dest.get("Airport_Name", row["Destination_Airport"]),
+        row["Departure_Date"], str(row["Departure_Time"])[:5])
+
+
+def flash_crew_conflicts(conflicts) -> None:
+    """One alert per overlapping (plane/worker, flight) pair, so the admin sees the whole list."""
+    flash(f"{len(conflicts)} scheduling conflict(s): the selection is no longer available.", "error")
+    for row in conflicts:
+        flash(describe_crew_conflict(row), "error")
+
+
 @app.route("/admin/flights/new/review", methods=["GET", "POST"])
 def admin_new_flight_review():
     if not admin_required_or_redirect():
@@ -2012,9 +4239,6 @@ def admin_new_flight_review():
         new_start = datetime.strptime(draft["window_start"], "%Y-%m-%d %H:%M:%S")
         new_end = datetime.strptime(draft["window_end"], "%Y-%m-%d %H:%M:%S")
 
-        window_start_nosec = draft["window_start"][:16]  # 'YYYY-MM-DD HH:MM'
-        window_end_nosec = draft["window_end"][:16]      # 'YYYY-MM-DD HH:MM'
-
         if request.method == "GET":
             return render_template("admin_new_flight_review.html", draft=draft)
 
@@ -2022,33 +4246,20 @@ def admin_new_flight_review():
 
         with db_transaction() as (_, cursor):
 
-            if overlap_exists_for_plane(cursor, int(draft["plane_id"]), window_start_nosec, window_end_nosec):
-                flash("Selected plane is no longer available.", "error")
+            conflicts = crew_conflicts(
+                cursor, draft["plane_id"], draft["selected_pilots"], draft["selected_attendants"],
+                draft["window_start"], draft["window_end"])
+            if conflicts:
+                flash_crew_conflicts(conflicts)
                 return redirect(url_for("admin_new_flight_step2"))
 
-            for wid in draft["selected_pilots"]:
-                if overlap_exists_for_pilot(cursor, int(wid), window_start_nosec, window_end_nosec):
-                    flash("One or more pilots are no longer available.", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
-
-            for wid in draft["selected_attendants"]:
-                if overlap_exists_for_attendant(cursor, int(wid), window_start_nosec, window_end_nosec):
-                    flash("One or more attendants are no longer available.", "error")
-                    return redirect(url_for("admin_new_flight_step2"))
-
             flight_id = next_flight_id(cursor)
 
             business_price = draft.get("business_price")
             if business_price is None:
                 business_price = 0.00
 
-            cursor.execute("""
-                INSERT INTO Flight
-                  (Flight_ID, Plane_ID, Origin_Airport, Destination_Airport,
-                   Departure_Time, Departure_Date,
-                   Economy_Price, Business_Price, Flight_Status)
-                VALUES
-                  (?,?,?,?,?,?,?,?, 'active') """,
+            cursor.execute(INSERT_FLIGHT_SQL,
                 (int(flight_id),
                 int(draft["plane_id"]),
                 int(draft["origin_id"]),
@@ -2070,6 +4281,11 @@ def admin_new_flight_review():
                     VALUES (?,?)
                 """, (int(wid), int(flight_id)))
 
+        flight_status_service.wake()  # the new flight may depart before the next planned sweep
+        search_cache.sync_flight(flight_id)
+        availability.add_flight(
+            flight_id, draft["plane_id"], draft["window_start"], draft["window_end"],
+            pilots=draft["selected_pilots"], attendants=draft["selected_attendants"])
         session.pop("admin_new_flight", None)
         flash("Flight created successfully.", "success")
         return redirect(url_for("admin_flights"))
@@ -2079,9 +4295,193 @@ def admin_new_flight_review():
         return redirect(url_for("admin_new_flight_step1"))
 
 
+# =============================
+# Admin - Recurring schedule (bulk add)
+# =============================
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")   # date.weekday() order
+
+def schedule_dates(start_date: date, end_date: date, weekdays) -> list:
+    """Every date in [start_date, end_date] whose weekday (Mon=0) is in `weekdays`."""
+    days = []
+    d = start_date
+    while d <= end_date:
+        if d.weekday() in weekdays:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+
+def parse_price(value):
+    """A positive, finite price from a form field, else None."""
+    try:
+        price = float(value)
+    except ValueError:
+        return None
+    return price if 0 < price < float("inf") else None
+
+
+def schedule_digest(plans) -> str:
+    """Digest of a previewed plan (dates, windows, plane and crew), echoed back by the form."""
+    rows = tuple((p["key"], p["window_start"], p["window_end"], p["plane_id"],
+                  tuple(p["pilots"]), tuple(p["attendants"]), p["error"]) for p in plans)
+    return hashlib.blake2s(repr(rows).encode(), digest_size=16).hexdigest()
+
+
+@app.route("/admin/flights/bulk", methods=["GET", "POST"])
+def admin_bulk_schedule():
+    if not admin_required_or_redirect():
+        return redirect(url_for("login"))
+
+    form = request.form
+    today_min = datetime.now().strftime("%Y-%m-%d")
+    weekdays = {int(d) for d in form.getlist("weekdays") if d.isdigit() and int(d) < 7}
+
+    def render_bulk(plans=None):
+        failures = [p for p in plans or () if p["error"]]
+        return render_template(
+            "admin_bulk_schedule.html",
+            form=form, weekdays=weekdays, weekday_names=WEEKDAY_NAMES, today_min=today_min,
+            plans=plans, failures=failures, plan_digest=schedule_digest(plans) if plans else "",
+            max_flights=app.config["BULK_SCHEDULE_MAX_FLIGHTS"])
+
+    if request.method == "GET":
+        return render_bulk()
+
+    try:
+        origin_id = (form.get("origin_id") or "").strip()
+        dest_id = (form.get("destination_id") or "").strip()
+        dep_time = normalize_time_to_hhmmss(form.get("departure_time"))
+        start_date = (form.get("start_date") or "").strip()
+        end_date = (form.get("end_date") or "").strip()
+        economy_price = (form.get("economy_price") or "").strip()
+        business_price = (form.get("business_price") or "").strip()
+
+        if not all([origin_id, dest_id, dep_time, start_date, end_date, economy_price]) or not weekdays:
+            flash("Route, departure time, date range, weekdays and economy price are required.", "error")
+            return render_bulk()
+
+        if origin_id == dest_id:
+            flash("Origin and destination must be different.", "error")
+            return render_bulk()
+
+        duration = reference_data.route_duration(origin_id, dest_id)
+        if duration is None:
+            flash("Route duration not found for this origin/destination.", "error")
+            return render_bulk()
+
+        first_day = datetime.strptime(start_date, "%Y-%m-%d").date()
+        last_day = datetime.strptime(end_date, "%Y-%m-%d").date()
+        if last_day < first_day:
+            flash("End date must be on or after the start date.", "error")
+            return render_bulk()
+
+        eco = parse_price(economy_price)
+        bus = parse_price(business_price) if business_price else None
+        if eco is None or (business_price and bus is None):
+            flash("Prices must be positive numbers.", "error")
+            return render_bulk()
+
+        is_long = is_long_flight(int(duration))
+        if is_long and not business_price:
+            flash("Long flights need a LARGE plane: a business price is required.", "error")
+            return render_bulk()
+
+        days = schedule_dates(first_day, last_day, weekdays)
+        if not days:
+            flash("No dates in this range fall on the selected weekdays.", "error")
+            return render_bulk()
+        if len(days) > app.config["BULK_SCHEDULE_MAX_FLIGHTS"]:
+            flash(f"This pattern gives {len(days)} flights; at most "
+                  f"{app.config['BULK_SCHEDULE_MAX_FLIGHTS']} can be scheduled at once.", "error")
+            return render_bulk()
+
+        # One window per date; departures already past can't be booked
+        now_dt = datetime.now()
+        windows, past = [], []
+        for d in days:
+            dep_dt = dt_from_date_time(d, dep_time)
+            window = (d.isoformat(), dep_dt.strftime("%Y-%m-%d %H:%M:%S"),
+                      (dep_dt + timedelta(minutes=int(duration))).strftime("%Y-%m-%d %H:%M:%S"))
+            (past if dep_dt <= now_dt else windows).append(window)
+
+        plans = availability.plan_flights(windows, is_long, allow_large=bool(business_price))
+        plans += [{"key": key, "window_start": ws, "window_end": we, "plane_id": None, "plane_size": None,
+                   "pilots": [], "attendants": [], "error": "Departure time has already passed."}
+                  for key, ws, we in past]
+        plans.sort(key=lambda p: p["key"])
+
+        if form.get("action") != "create" or any(p["error"] for p in plans):
+            if form.get("action") == "create":
+                flash("Nothing was created: fix or remove the dates marked below.", "error")
+            return render_bulk(plans)
+
+        # Create exactly what the admin previewed: planes/crew may have been taken since
+        if form.get("plan_digest") != schedule_digest(plans):
+            flash("The schedule changed since the preview. Review the updated plan and create again."
+                  if form.get("plan_digest") else "Preview the schedule before creating it.", "error")
+            return render_bulk(plans)
+
+        created = False
+        with db_transaction() as (_, cursor):
+            # The plan came from the in-memory index; confirm it against the tables in one query
+            conflicts = schedule_conflicts(cursor, [
+                (p["key"], p["plane_id"], p["pilots"], p["attendants"], p["window_start"], p["window_end"])
+                for p in plans])
+            if conflicts:
+                by_day = {}
+                for row in conflicts:
+                    by_day.setdefault(row["Slot"], []).append(describe_crew_conflict(row))
+                for p in plans:
+                    if p["key"] in by_day:
+                        p["error"] = "; ".join(by_day[p["key"]])
+            else:
+                first_id = allocate_ids(cursor, "Flight", len(plans))
+                for i, p in enumerate(plans):
+                    p["flight_id"] = first_id + i
+                cursor.executemany(INSERT_FLIGHT_SQL, [
+                    (p["flight_id"], p["plane_id"], int(origin_id), int(dest_id), dep_time, p["key"],
+                     eco, bus if p["plane_size"] == "large" else 0.0)
+                    for p in plans])
+                cursor.executemany(
+                    "INSERT INTO Pilots_Scheduled_to_Flights (Worker_ID, Flight_ID) VALUES (?,?)",
+                    [(w, p["flight_id"]) for p in plans for w in p["pilots"]])
+                cursor.executemany(
+                    "INSERT INTO Flight_Attendants_Assigned_To_Flights (Worker_ID, Flight_ID) VALUES (?,?)",
+                    [(w, p["flight_id"]) for p in plans for w in p["attendants"]])
+                created = True
+
+        if not created:
+            flash("Nothing was created: some flights conflict with the current schedule.", "error")
+            return render_bulk(plans)
+
+        flight_status_service.wake()
+        search_cache.invalidate_route(origin_id, dest_id)
+        for p in plans:
+            availability.add_flight(p["flight_id"], p["plane_id"], p["window_start"], p["window_end"],
+                                    pilots=p["pilots"], attendants=p["attendants"])
+        flash(f"Created {len(plans)} flights ({plans[0]['key']} to {plans[-1]['key']}).", "success")
+        return redirect(url_for("admin_flights", origin_id=origin_id, destination_id=dest_id,
+                                start_date=start_date, end_date=end_date))
+
+    except ValueError:
+        flash("Invalid date, time or price.", "error")
+        return render_bulk()
+    except Exception as e:
+        flash(f"Database error: {e}", "error")
+        return redirect(url_for("admin_dashboard"))
+
+
 # =============================
 # Admin - Cancel Flight (pick)
 # =============================
+CANCELLABLE_FLIGHTS_SQL = """
+    SELECT Flight_ID, Departure_Date, Departure_Time, Flight_Status
+    FROM Flight
+    WHERE Flight_Status IN ('active','full')
+    ORDER BY Departure_Date, Departure_Time
+"""
+
+
 @app.route("/admin/flights/cancel", methods=["GET"], endpoint="admin_cancel_flight_pick")
 def admin_cancel_flight_pick_view():
     if not admin_required_or_redirect():
@@ -2090,12 +4490,7 @@ def admin_cancel_flight_pick_view():
     flights = []
     try:
         with db_cursor() as (_, cursor):
-            cursor.execute("""
-                SELECT Flight_ID, Departure_Date, Departure_Time, Flight_Status
-                FROM Flight
-                WHERE Flight_Status IN ('active','full')
-                ORDER BY Departure_Date, Departure_Time
-            """)
+            cursor.execute(CANCELLABLE_FLIGHTS_SQL)
             flights = cursor.fetchall() or []
 
         now_dt = datetime.now()
@@ -2113,6 +4508,14 @@ def admin_cancel_flight_pick_view():
 # =============================
 # Admin - Cancel Flight (confirm)
 # =============================
+ACTIVE_ORDER_IDS_FOR_FLIGHT_SQL = """
+    SELECT Unique_Order_ID
+    FROM Orders
+    WHERE Flight_ID = ?
+      AND Order_Status = 'active'
+"""
+
+
 @app.route("/admin/flights/<int:flight_id>/cancel", methods=["GET", "POST"], endpoint="admin_cancel_flight_confirm")
 def admin_cancel_flight_confirm(flight_id):
     if not admin_required_or_redirect():
@@ -2166,16 +4569,12 @@ def admin_cancel_flight_confirm(flight_id):
 
             cursor.execute("""
                 UPDATE Flight
-                SET Flight_Status = 'cancelled'
+                SET Flight_Status = 'cancelled',
+                    Occupied_Seats = 0
                 WHERE Flight_ID = ?
             """, (flight_id,))
 
-            cursor.execute("""
-                SELECT Unique_Order_ID
-                FROM Orders
-                WHERE Flight_ID = ?
-                  AND Order_Status = 'active'
-            """, (flight_id,))
+            cursor.execute(ACTIVE_ORDER_IDS_FOR_FLIGHT_SQL, (flight_id,))
             rows = cursor.fetchall() or []
             active_order_ids = [int(r["Unique_Order_ID"]) for r in rows]
 
@@ -2195,6 +4594,9 @@ def admin_cancel_flight_confirm(flight_id):
                     WHERE Unique_Order_ID IN ({placeholders})
                 """, tuple(active_order_ids))
 
+        seat_occupancy.invalidate(flight_id)
+        search_cache.sync_flight(flight_id)
+        availability.remove_flight(flight_id)
         flash("Flight cancelled successfully. Active orders were fully refunded (Final_Total set to 0).", "success")
         return redirect(url_for("admin_flights"))
 
@@ -2276,6 +4678,7 @@ def admin_add_staff():
                     worker_id, city, street, house_number,
                     first_he, last_he, phone, start_date, is_qualified))
 
+        availability.invalidate()
         flash("Staff member added successfully.", "success")
         return redirect(url_for("admin_dashboard"))
 
@@ -2283,6 +4686,177 @@ def admin_add_staff():
         flash(f"Database error while adding staff: {e}", "error")
         return redirect(url_for("admin_add_staff"))
 
+# ======================================================
+# QUERY PLAN CHECK (EXPLAIN QUERY PLAN regression guard)
+# ======================================================
+class ExplainCursor:
+    """
+    Stand-in cursor: every execute() records EXPLAIN QUERY PLAN output instead of running
+    the statement, so the real helper functions can be "executed" to capture their plans.
+    """
+    def __init__(self, raw_cursor):
+        self._cur = raw_cursor
+        self.plans = []   # [(sql, [detail, ...])]
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        self._cur.execute("EXPLAIN QUERY PLAN " + sql, params)
+        self.plans.append((sql, [r[3] for r in self._cur.fetchall()]))
+
+    def executemany(self, sql, seq_of_params):
+        # every parameter set gets the same plan: explain the statement once with the first;
+        # an empty sequence runs nothing in sqlite3, so there is no plan to record
+        first = next(iter(seq_of_params), None)
+        if first is not None:
+            self.execute(sql, first)
+
+    def fetchone(self):
+        return None
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        return self._cur.close()
+
+
+def _sample_window():
+    start = datetime.now().replace(microsecond=0) + timedelta(days=30)
+    end = start + timedelta(hours=5)
+    return start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S")
+
+
+# name -> callable(cursor) that issues the query exactly as the app does
+QUERY_PLAN_CHECKS = {
+    "search: route + dates": lambda c: c.execute(*build_flight_search_query("1", "3", "2026-01-20", "2026-01-27")),
+    "search: dates only": lambda c: c.execute(*build_flight_search_query("", "", "2026-01-20", "2026-01-27")),
+    "fare calendar": lambda c: c.execute(fare_calendar_sql(), (1, 3, "2026-01-13", "2026-01-27")),
+    "itinerary legs": lambda c: c.execute(ITINERARY_LEGS_SQL),
+    "admin board: route": lambda c: c.execute(*build_admin_flights_query("1", "3", "", "", "")),
+    "admin board: status + dates": lambda c: c.execute(*build_admin_flights_query("", "", "2026-01-01", "2026-02-01", "active")),
+    "admin board: next page": lambda c: c.execute(*build_admin_flights_query(
+        "", "", "", "", "", ("2026-01-20", "10:00:00", 5001), limit=51)),
+    "admin board: route, next page": lambda c: c.execute(*build_admin_flights_query(
+        "1", "3", "", "", "", ("2026-01-20", "10:00:00", 5001), limit=51)),
+    "seat map": lambda c: c.execute(SEAT_LAYOUT_SQL, (101,)),
+    "occupied seats": lambda c: c.execute(OCCUPIED_SEATS_SQL, (5001, 101)),
+    "seat prices (confirm)": lambda c: c.execute(seat_prices_sql(2), (101, 5001, 1, "A", 1, "B")),
+    "plane has business": lambda c: plane_has_business(c, 101),
+    "order seats": lambda c: c.execute(order_seats_sql(3), (9001, 9002, 9003)),
+    "future orders (registered)": lambda c: c.execute(FUTURE_ORDERS_REGISTERED_SQL, ("alice.kim@mail.com",)),
+    "future order (guest)": lambda c: c.execute(FUTURE_ORDER_GUEST_SQL, (9005, "guest01@mail.com")),
+    "past orders (registered)": lambda c: c.execute(*build_past_orders_query("alice.kim@mail.com", limit=21)),
+    "past orders: next page": lambda c: c.execute(*build_past_orders_query(
+        "alice.kim@mail.com", ("2025-06-01", "10:00:00", 9100), limit=21)),
+    "cancel pick": lambda c: c.execute(CANCELLABLE_FLIGHTS_SQL),
+    "active orders of flight": lambda c: c.execute(ACTIVE_ORDER_IDS_FOR_FLIGHT_SQL, (5001,)),
+    "status sweep": lambda c: update_flight_statuses_done_if_past(c, limit=200),
+    "next status transition": lambda c: c.execute(NEXT_STATUS_TRANSITION_SQL),
+    "seat holds of flight": lambda c: c.execute(SEAT_HOLDS_SQL, (5001, 0)),
+    "expired seat holds sweep": lambda c: sweep_expired_seat_holds(c, 0, limit=200),
+    "route duration": lambda c: get_route_duration_minutes(c, 1, 3),
+    "plane is large": lambda c: plane_is_large(c, 101),
+    "available planes": lambda c: available_planes(c, *_sample_window(), is_long=True),
+    "available pilots": lambda c: available_pilots(c, *_sample_window(), require_long_qualified=True),
+    "available attendants": lambda c: available_attendants(c, *_sample_window(), require_long_qualified=False),
+    "availability index: planes": lambda c: c.execute(AVAILABILITY_BUSY_SQL["plane"], (0,)),
+    "availability index: pilots": lambda c: c.execute(AVAILABILITY_BUSY_SQL["pilot"], (0,)),
+    "availability index: attendants": lambda c: c.execute(AVAILABILITY_BUSY_SQL["attendant"], (0,)),
+    "overlap: plane": lambda c: overlap_exists_for_plane(c, 101, *_sample_window()),
+    "overlap: pilot": lambda c: overlap_exists_for_pilot(c, 3001, *_sample_window()),
+    "overlap: attendant": lambda c: overlap_exists_for_attendant(c, 4001, *_sample_window()),
+    "crew conflicts": lambda c: crew_conflicts(c, 101, [3001, 3002, 3003], [4001, 4002, 4003], *_sample_window()),
+}
+
+# Scans that are the intended plan, by check name -> table aliases.
+# Availability lists return every qualified candidate, so the candidate table is read in full;
+# the per-candidate overlap probe must still be an index SEARCH.
+QUERY_PLAN_EXPECTED_SCANS = {
+    "available planes": {"p"},
+    "available pilots": {"p"},
+    "available attendants": {"a"},
+    "crew conflicts": {"w"},   # the slot list passed in (json_each)
+}
+
+
+def _is_table_scan(detail: str, allowed=()) -> bool:
+    """'SCAN <table>' without 'USING ... INDEX' is a full table scan."""
+    if not detail.startswith("SCAN ") or "INDEX" in detail or "CONSTANT ROW" in detail:
+        return False
+    return detail.split()[1] not in allowed
+
+
+def check_query_plans(conn) -> list[dict]:
+    """Runs every QUERY_PLAN_CHECKS entry through EXPLAIN QUERY PLAN; returns one report per check."""
+    results = []
+    for name, run in QUERY_PLAN_CHECKS.items():
+        cursor = ExplainCursor(conn.cursor())
+        try:
+            run(cursor)
+        finally:
+            cursor.close()
+        allowed = QUERY_PLAN_EXPECTED_SCANS.get(name, ())
+        scans = [d for _, details in cursor.plans for d in details if _is_table_scan(d, allowed)]
+        results.append({
+            "name": name,
+            "ok": not scans,
+            "scans": scans,
+            "plan": [d for _, details in cursor.plans for d in details],})
+    return results
+
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """Fails (exit 1) if any hot-path query plans a full table SCAN."""
+    with db_cursor() as (conn, _):
+        results = check_query_plans(conn)
+    failed = [r for r in results if not r["ok"]]
+    for r in results:
+        print(f"[{'OK' if r['ok'] else 'SCAN'}] {r['name']}")
+        for d in r["plan"]:
+            print(f"      {d}")
+    print(f"{len(results) - len(failed)}/{len(results)} queries use indexes.")
+    if failed:
+        raise SystemExit(1)
+
+
+@app.cli.command("init-db")
+@click.option("--force", is_flag=True, help="Rebuild even if the database file already exists.")
+def init_db_command(force):
+    """Builds instance/FLYTAU15.db from FLYTAU15.sql (bulk load) and applies the migrations."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is not None:
+            _db_pool.close_all()
+            _db_pool = None
+    try:
+        result = bootstrap_database(DB_PATH, force=force)
+    except FileExistsError as e:
+        raise click.ClickException(str(e))
+    print(f"Loaded {result['statements']} statements in {result['seed_ms']:.0f} ms, "
+          f"migrations {result['migrations'] or 'none'} -> schema v{result['schema_version']} "
+          f"({result['total_ms']:.0f} ms total): {result['path']}")
+
+
+@app.cli.command("migrate")
+def migrate_command():
+    """Applies pending migrations from migrations/ (also done automatically at startup)."""
+    with db_cursor() as (conn, _):
+        applied = apply_migrations(conn)
+        info = get_schema_info(conn)
+    print(f"Applied {applied or 'nothing'}; schema version is {info['version']}.")
+
+
+@app.cli.command("sweep-flight-statuses")
+def sweep_flight_statuses_command():
+    """Marks departed flights 'done' once (for cron when FLIGHT_STATUS_SWEEP_ENABLED is off)."""
+    marked = flight_status_service.run_once()
+    with db_cursor() as (_, cursor):
+        stats = flight_status_service.stats(cursor)
+    print(f"Marked {marked} flight(s) done in {stats['last_run_ms']} ms; "
+          f"next transition: {stats['next_transition']}, lag {stats['lag_seconds']}s.")
+
+
 # ======================================================
 # Entry point
 # ======================================================
@@ -0,0 +1,50 @@
+-- 0001: secondary indexes for the hot query paths
+
+-- public search: origin + destination + date range, ordered by date/time
+CREATE INDEX IF NOT EXISTS idx_flight_route_departure
+    ON Flight (Origin_Airport, Destination_Airport, Departure_Date, Departure_Time);
+
+-- admin board + date-only searches
+CREATE INDEX IF NOT EXISTS idx_flight_departure
+    ON Flight (Departure_Date, Departure_Time);
+
+-- status sweep / cancel pick: only flights that can still change state
+CREATE INDEX IF NOT EXISTS idx_flight_open_departure
+    ON Flight (Departure_Date, Departure_Time)
+    WHERE Flight_Status IN ('active','full');
+
+-- plane overlap + availability checks
+CREATE INDEX IF NOT EXISTS idx_flight_plane_departure
+    ON Flight (Plane_ID, Departure_Date);
+
+CREATE INDEX IF NOT EXISTS idx_orders_flight
+    ON Orders (Flight_ID);
+
+-- seat maps / conflicts only ever look at active orders
+CREATE INDEX IF NOT EXISTS idx_orders_active_flight
+    ON Orders (Flight_ID)
+    WHERE Order_Status = 'active';
+
+CREATE INDEX IF NOT EXISTS idx_orders_registered_email
+    ON Orders (Registered_Clients_Email_Address)
+    WHERE Registered_Clients_Email_Address IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_orders_guest_email
+    ON Orders (Unidentified_Guest_Email_Address)
+    WHERE Unidentified_Guest_Email_Address IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_selected_seats_order
+    ON Selected_Seats (Unique_Order_ID, Is_Occupied);
+
+CREATE INDEX IF NOT EXISTS idx_seats_plane_class
+    ON Seats (Plane_ID, Class);
+
+CREATE INDEX IF NOT EXISTS idx_has_an_order_order
+    ON Has_an_order (Unique_Order_ID);
+
+-- crew tables: PK is (Worker_ID, Flight_ID), lookups by flight need their own index
+CREATE INDEX IF NOT EXISTS idx_pilots_scheduled_flight
+    ON Pilots_Scheduled_to_Flights (Flight_ID);
+
+CREATE INDEX IF NOT EXISTS idx_attendants_assigned_flight
+    ON Flight_Attendants_Assigned_To_Flights (Flight_ID);
@@ -0,0 +1,69 @@
+-- 0002: per-plane seat counts, maintained by triggers on Seats
+-- (Has_Business is the "large plane" definition: the plane has at least one Business seat)
+
+CREATE TABLE IF NOT EXISTS Plane_Capacity (
+    Plane_ID INTEGER PRIMARY KEY,
+    Economy_Seats INTEGER NOT NULL DEFAULT 0,
+    Business_Seats INTEGER NOT NULL DEFAULT 0,
+    Total_Seats INTEGER NOT NULL DEFAULT 0,
+    Has_Business INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (Plane_ID) REFERENCES Planes(Plane_ID) ON DELETE CASCADE
+);
+
+INSERT OR REPLACE INTO Plane_Capacity (Plane_ID, Economy_Seats, Business_Seats, Total_Seats, Has_Business)
+SELECT
+    p.Plane_ID,
+    COALESCE(SUM(s.Class = 'Economy'), 0),
+    COALESCE(SUM(s.Class = 'Business'), 0),
+    COUNT(s.Plane_ID),
+    COALESCE(SUM(s.Class = 'Business'), 0) > 0
+FROM Planes p
+LEFT JOIN Seats s ON s.Plane_ID = p.Plane_ID
+GROUP BY p.Plane_ID;
+
+CREATE TRIGGER IF NOT EXISTS trg_planes_capacity_insert
+AFTER INSERT ON Planes
+BEGIN
+    INSERT OR IGNORE INTO Plane_Capacity (Plane_ID) VALUES (NEW.Plane_ID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seats_capacity_insert
+AFTER INSERT ON Seats
+BEGIN
+    INSERT OR IGNORE INTO Plane_Capacity (Plane_ID) VALUES (NEW.Plane_ID);
+    UPDATE Plane_Capacity
+       SET Economy_Seats = Economy_Seats + (NEW.Class = 'Economy'),
+           Business_Seats = Business_Seats + (NEW.Class = 'Business'),
+           Total_Seats = Total_Seats + 1,
+           Has_Business = Business_Seats + (NEW.Class = 'Business') > 0
+     WHERE Plane_ID = NEW.Plane_ID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seats_capacity_delete
+AFTER DELETE ON Seats
+BEGIN
+    UPDATE Plane_Capacity
+       SET Economy_Seats = Economy_Seats - (OLD.Class = 'Economy'),
+           Business_Seats = Business_Seats - (OLD.Class = 'Business'),
+           Total_Seats = Total_Seats - 1,
+           Has_Business = Business_Seats - (OLD.Class = 'Business') > 0
+     WHERE Plane_ID = OLD.Plane_ID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_seats_capacity_update
+AFTER UPDATE OF Plane_ID, Class ON Seats
+BEGIN
+    UPDATE Plane_Capacity
+       SET Economy_Seats = Economy_Seats - (OLD.Class = 'Economy'),
+           Business_Seats = Business_Seats - (OLD.Class = 'Business'),
+           Total_Seats = Total_Seats - 1,
+           Has_Business = Business_Seats - (OLD.Class = 'Business') > 0
+     WHERE Plane_ID = OLD.Plane_ID;
+    INSERT OR IGNORE INTO Plane_Capacity (Plane_ID) VALUES (NEW.Plane_ID);
+    UPDATE Plane_Capacity
+       SET Economy_Seats = Economy_Seats + (NEW.Class = 'Economy'),
+           Business_Seats = Business_Seats + (NEW.Class = 'Business'),
+           Total_Seats = Total_Seats + 1,
+           Has_Business = Business_Seats + (NEW.Class = 'Business') > 0
+     WHERE Plane_ID = NEW.Plane_ID;
+END;
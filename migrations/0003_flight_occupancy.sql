@@ -0,0 +1,20 @@
+-- 0003: per-flight occupancy counter (seats held by non-cancelled orders)
+-- Maintained by adjust_flight_occupancy() in the booking/cancellation transactions,
+-- which also flips Flight_Status between 'active' and 'full'.
+
+ALTER TABLE Flight ADD COLUMN Occupied_Seats INTEGER NOT NULL DEFAULT 0;
+
+UPDATE Flight
+SET Occupied_Seats = (
+    SELECT COUNT(*)
+    FROM Orders o
+    JOIN Selected_Seats ss ON ss.Unique_Order_ID = o.Unique_Order_ID
+    WHERE o.Flight_ID = Flight.Flight_ID
+      AND o.Order_Status IN ('active', 'done')
+      AND ss.Is_Occupied = 1);
+
+UPDATE Flight
+SET Flight_Status = CASE
+        WHEN Occupied_Seats >= (SELECT pc.Total_Seats FROM Plane_Capacity pc WHERE pc.Plane_ID = Flight.Plane_ID)
+        THEN 'full' ELSE 'active' END
+WHERE Flight_Status IN ('active', 'full');
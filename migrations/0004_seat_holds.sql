@@ -0,0 +1,19 @@
+-- 0004: temporary seat holds taken on seat selection (released on checkout or expiry)
+-- Expires_At is a unix timestamp; an expired hold is ignored and can be taken over at once.
+
+CREATE TABLE IF NOT EXISTS Seat_Holds (
+    Flight_ID INTEGER NOT NULL,
+    Plane_ID INTEGER NOT NULL,
+    Row_Num INTEGER NOT NULL,
+    Column_Number TEXT NOT NULL,
+    Hold_Token TEXT NOT NULL,
+    Expires_At REAL NOT NULL,
+    PRIMARY KEY (Flight_ID, Row_Num, Column_Number),
+    FOREIGN KEY (Flight_ID) REFERENCES Flight(Flight_ID)
+);
+
+CREATE INDEX IF NOT EXISTS idx_seat_holds_token
+    ON Seat_Holds (Hold_Token, Flight_ID);
+
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expires
+    ON Seat_Holds (Expires_At);
@@ -0,0 +1,89 @@
+-- 0005: one row per seat taken on a flight, so the database itself rejects a double booking.
+-- Selected_Seats' key includes Unique_Order_ID, so it can't do this on its own. Rows are kept
+-- in sync by triggers: a seat is reserved while its order is 'active' and Is_Occupied = 1.
+
+CREATE TABLE IF NOT EXISTS Flight_Seat_Reservations (
+    Flight_ID INTEGER NOT NULL,
+    Plane_ID INTEGER NOT NULL,
+    Row_Num INTEGER NOT NULL,
+    Column_Number TEXT NOT NULL,
+    Unique_Order_ID INTEGER NOT NULL,
+    PRIMARY KEY (Flight_ID, Plane_ID, Row_Num, Column_Number),
+    FOREIGN KEY (Flight_ID) REFERENCES Flight(Flight_ID),
+    FOREIGN KEY (Unique_Order_ID) REFERENCES Orders(Unique_Order_ID)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_flight_seat_reservations_order
+    ON Flight_Seat_Reservations (Unique_Order_ID);
+
+INSERT INTO Flight_Seat_Reservations (Flight_ID, Plane_ID, Row_Num, Column_Number, Unique_Order_ID)
+SELECT o.Flight_ID, ss.Plane_ID, ss.Row_Num, ss.Column_Number, ss.Unique_Order_ID
+FROM Selected_Seats ss
+JOIN Orders o ON o.Unique_Order_ID = ss.Unique_Order_ID
+WHERE ss.Is_Occupied = 1
+  AND o.Order_Status = 'active';
+
+-- booking: fails with "UNIQUE constraint failed: Flight_Seat_Reservations..." if the seat is taken
+CREATE TRIGGER IF NOT EXISTS trg_selected_seats_reserve
+AFTER INSERT ON Selected_Seats
+WHEN NEW.Is_Occupied = 1
+BEGIN
+    INSERT INTO Flight_Seat_Reservations (Flight_ID, Plane_ID, Row_Num, Column_Number, Unique_Order_ID)
+    SELECT o.Flight_ID, NEW.Plane_ID, NEW.Row_Num, NEW.Column_Number, NEW.Unique_Order_ID
+    FROM Orders o
+    WHERE o.Unique_Order_ID = NEW.Unique_Order_ID
+      AND o.Order_Status = 'active';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_selected_seats_occupied
+AFTER UPDATE OF Is_Occupied ON Selected_Seats
+WHEN NEW.Is_Occupied = 1 AND OLD.Is_Occupied = 0
+BEGIN
+    INSERT INTO Flight_Seat_Reservations (Flight_ID, Plane_ID, Row_Num, Column_Number, Unique_Order_ID)
+    SELECT o.Flight_ID, NEW.Plane_ID, NEW.Row_Num, NEW.Column_Number, NEW.Unique_Order_ID
+    FROM Orders o
+    WHERE o.Unique_Order_ID = NEW.Unique_Order_ID
+      AND o.Order_Status = 'active';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_selected_seats_released
+AFTER UPDATE OF Is_Occupied ON Selected_Seats
+WHEN NEW.Is_Occupied = 0 AND OLD.Is_Occupied = 1
+BEGIN
+    DELETE FROM Flight_Seat_Reservations
+    WHERE Unique_Order_ID = OLD.Unique_Order_ID
+      AND Plane_ID = OLD.Plane_ID
+      AND Row_Num = OLD.Row_Num
+      AND Column_Number = OLD.Column_Number;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_selected_seats_deleted
+AFTER DELETE ON Selected_Seats
+WHEN OLD.Is_Occupied = 1
+BEGIN
+    DELETE FROM Flight_Seat_Reservations
+    WHERE Unique_Order_ID = OLD.Unique_Order_ID
+      AND Plane_ID = OLD.Plane_ID
+      AND Row_Num = OLD.Row_Num
+      AND Column_Number = OLD.Column_Number;
+END;
+
+-- customer / system cancellation (or done) releases every seat of the order
+CREATE TRIGGER IF NOT EXISTS trg_orders_release_seats
+AFTER UPDATE OF Order_Status ON Orders
+WHEN OLD.Order_Status = 'active' AND NEW.Order_Status <> 'active'
+BEGIN
+    DELETE FROM Flight_Seat_Reservations
+    WHERE Unique_Order_ID = NEW.Unique_Order_ID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_reserve_seats
+AFTER UPDATE OF Order_Status ON Orders
+WHEN OLD.Order_Status <> 'active' AND NEW.Order_Status = 'active'
+BEGIN
+    INSERT INTO Flight_Seat_Reservations (Flight_ID, Plane_ID, Row_Num, Column_Number, Unique_Order_ID)
+    SELECT NEW.Flight_ID, ss.Plane_ID, ss.Row_Num, ss.Column_Number, ss.Unique_Order_ID
+    FROM Selected_Seats ss
+    WHERE ss.Unique_Order_ID = NEW.Unique_Order_ID
+      AND ss.Is_Occupied = 1;
+END;
@@ -0,0 +1,13 @@
+-- 0006: id sequences (replaces SELECT MAX(...) + 1 when creating orders and flights)
+-- Next_Value is the next id to hand out; allocators advance it inside a write transaction.
+
+CREATE TABLE IF NOT EXISTS Id_Sequences (
+    Name TEXT PRIMARY KEY,
+    Next_Value INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO Id_Sequences (Name, Next_Value)
+SELECT 'Orders', COALESCE(MAX(Unique_Order_ID), 9000) + 1 FROM Orders;
+
+INSERT OR IGNORE INTO Id_Sequences (Name, Next_Value)
+SELECT 'Flight', COALESCE(MAX(Flight_ID), 1000) + 1 FROM Flight;
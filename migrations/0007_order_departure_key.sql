@@ -0,0 +1,36 @@
+-- 0007: departure sort key on Orders, for keyset pagination of a customer's order history
+-- Departure_Key = Flight.Departure_Date || ' ' || Flight.Departure_Time of the order's flight.
+-- Dates are fixed width, so ordering by the key is ordering by (date, time); with the rowid
+-- as the index's trailing column, (email, Departure_Key, Unique_Order_ID) pages straight
+-- off idx_orders_registered_departure without a sort.
+
+ALTER TABLE Orders ADD COLUMN Departure_Key TEXT;
+
+UPDATE Orders
+SET Departure_Key = (
+    SELECT f.Departure_Date || ' ' || f.Departure_Time
+    FROM Flight f
+    WHERE f.Flight_ID = Orders.Flight_ID);
+
+CREATE TRIGGER IF NOT EXISTS trg_orders_departure_key
+AFTER INSERT ON Orders
+BEGIN
+    UPDATE Orders
+    SET Departure_Key = (
+        SELECT f.Departure_Date || ' ' || f.Departure_Time
+        FROM Flight f
+        WHERE f.Flight_ID = NEW.Flight_ID)
+    WHERE Unique_Order_ID = NEW.Unique_Order_ID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_departure_key
+AFTER UPDATE OF Departure_Date, Departure_Time ON Flight
+BEGIN
+    UPDATE Orders
+    SET Departure_Key = NEW.Departure_Date || ' ' || NEW.Departure_Time
+    WHERE Flight_ID = NEW.Flight_ID;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_orders_registered_departure
+    ON Orders (Registered_Clients_Email_Address, Departure_Key)
+    WHERE Registered_Clients_Email_Address IS NOT NULL;
@@ -0,0 +1,40 @@
+-- 0008: version stamps for reference data cached in the app (Airports, Routes)
+-- Any write to one of the tables bumps its row; the in-process cache compares stamps and
+-- reloads when one moved, whichever connection (or external tool) made the change.
+
+CREATE TABLE IF NOT EXISTS Reference_Data_Version (
+    Name TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO Reference_Data_Version (Name, Version) VALUES ('Airports', 0), ('Routes', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_airports_version_ins AFTER INSERT ON Airports
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Airports';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_airports_version_upd AFTER UPDATE ON Airports
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Airports';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_airports_version_del AFTER DELETE ON Airports
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Airports';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_routes_version_ins AFTER INSERT ON Routes
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Routes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_routes_version_upd AFTER UPDATE ON Routes
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Routes';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_routes_version_del AFTER DELETE ON Routes
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Routes';
+END;
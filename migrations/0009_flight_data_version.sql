@@ -0,0 +1,28 @@
+-- 0009: version stamp for flight listings (ETags of /api/flights)
+-- Bumped when a flight appears/disappears or a searchable column changes; the seat counter
+-- (Occupied_Seats) alone does not move it, so ordinary bookings keep ETags valid.
+
+INSERT OR IGNORE INTO Reference_Data_Version (Name, Version) VALUES ('Flight', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_version_ins AFTER INSERT ON Flight
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Flight';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_version_del AFTER DELETE ON Flight
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Flight';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_version_upd AFTER UPDATE ON Flight
+WHEN OLD.Flight_Status IS NOT NEW.Flight_Status
+  OR OLD.Departure_Date IS NOT NEW.Departure_Date
+  OR OLD.Departure_Time IS NOT NEW.Departure_Time
+  OR OLD.Economy_Price IS NOT NEW.Economy_Price
+  OR OLD.Business_Price IS NOT NEW.Business_Price
+  OR OLD.Plane_ID IS NOT NEW.Plane_ID
+  OR OLD.Origin_Airport IS NOT NEW.Origin_Airport
+  OR OLD.Destination_Airport IS NOT NEW.Destination_Airport
+BEGIN
+    UPDATE Reference_Data_Version SET Version = Version + 1 WHERE Name = 'Flight';
+END;
@@ -0,0 +1,89 @@
+-- 0010: materialized flight time windows
+-- Routes.Duration_Minutes = Duration ('HH:MM[:SS]') in whole minutes (seconds rounded, as in
+-- route_duration_to_minutes). Flight.Start_Epoch / End_Epoch = departure and arrival as
+-- strftime('%s') of the naive date/time (utils.epoch_seconds gives the same numbers), kept
+-- in sync by triggers, so overlap checks are indexed integer range comparisons instead of
+-- per-row datetime() string math.
+
+ALTER TABLE Routes ADD COLUMN Duration_Minutes INTEGER;
+ALTER TABLE Flight ADD COLUMN Start_Epoch INTEGER;
+ALTER TABLE Flight ADD COLUMN End_Epoch INTEGER;
+
+UPDATE Routes
+SET Duration_Minutes =
+      CAST(substr(Duration, 1, instr(Duration, ':') - 1) AS INTEGER) * 60
+    + CAST(substr(Duration, instr(Duration, ':') + 1, 2) AS INTEGER)
+    + (CAST(substr(Duration, instr(Duration, ':') + 4, 2) AS INTEGER) >= 30);
+
+UPDATE Flight
+SET Start_Epoch = CAST(strftime('%s', Departure_Date || ' ' || Departure_Time) AS INTEGER),
+    End_Epoch = CAST(strftime('%s', Departure_Date || ' ' || Departure_Time) AS INTEGER) + 60 * (
+        SELECT r.Duration_Minutes
+        FROM Routes r
+        WHERE r.Origin_Airport = Flight.Origin_Airport
+          AND r.Destination_Airport = Flight.Destination_Airport);
+
+CREATE TRIGGER IF NOT EXISTS trg_routes_duration_minutes
+AFTER INSERT ON Routes
+BEGIN
+    UPDATE Routes
+    SET Duration_Minutes =
+          CAST(substr(NEW.Duration, 1, instr(NEW.Duration, ':') - 1) AS INTEGER) * 60
+        + CAST(substr(NEW.Duration, instr(NEW.Duration, ':') + 1, 2) AS INTEGER)
+        + (CAST(substr(NEW.Duration, instr(NEW.Duration, ':') + 4, 2) AS INTEGER) >= 30)
+    WHERE Origin_Airport = NEW.Origin_Airport
+      AND Destination_Airport = NEW.Destination_Airport;
+END;
+
+-- A new duration also moves the arrival of every flight on the route.
+CREATE TRIGGER IF NOT EXISTS trg_routes_duration_minutes_upd
+AFTER UPDATE OF Duration ON Routes
+BEGIN
+    UPDATE Routes
+    SET Duration_Minutes =
+          CAST(substr(NEW.Duration, 1, instr(NEW.Duration, ':') - 1) AS INTEGER) * 60
+        + CAST(substr(NEW.Duration, instr(NEW.Duration, ':') + 1, 2) AS INTEGER)
+        + (CAST(substr(NEW.Duration, instr(NEW.Duration, ':') + 4, 2) AS INTEGER) >= 30)
+    WHERE Origin_Airport = NEW.Origin_Airport
+      AND Destination_Airport = NEW.Destination_Airport;
+
+    UPDATE Flight
+    SET End_Epoch = Start_Epoch + 60 * (
+        SELECT r.Duration_Minutes
+        FROM Routes r
+        WHERE r.Origin_Airport = NEW.Origin_Airport
+          AND r.Destination_Airport = NEW.Destination_Airport)
+    WHERE Origin_Airport = NEW.Origin_Airport
+      AND Destination_Airport = NEW.Destination_Airport;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_epochs
+AFTER INSERT ON Flight
+BEGIN
+    UPDATE Flight
+    SET Start_Epoch = CAST(strftime('%s', NEW.Departure_Date || ' ' || NEW.Departure_Time) AS INTEGER),
+        End_Epoch = CAST(strftime('%s', NEW.Departure_Date || ' ' || NEW.Departure_Time) AS INTEGER) + 60 * (
+            SELECT r.Duration_Minutes
+            FROM Routes r
+            WHERE r.Origin_Airport = NEW.Origin_Airport
+              AND r.Destination_Airport = NEW.Destination_Airport)
+    WHERE Flight_ID = NEW.Flight_ID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_flight_epochs_upd
+AFTER UPDATE OF Departure_Date, Departure_Time, Origin_Airport, Destination_Airport ON Flight
+BEGIN
+    UPDATE Flight
+    SET Start_Epoch = CAST(strftime('%s', NEW.Departure_Date || ' ' || NEW.Departure_Time) AS INTEGER),
+        End_Epoch = CAST(strftime('%s', NEW.Departure_Date || ' ' || NEW.Departure_Time) AS INTEGER) + 60 * (
+            SELECT r.Duration_Minutes
+            FROM Routes r
+            WHERE r.Origin_Airport = NEW.Origin_Airport
+              AND r.Destination_Airport = NEW.Destination_Airport)
+    WHERE Flight_ID = NEW.Flight_ID;
+END;
+
+-- Overlap with [start, end) is End_Epoch > start AND Start_Epoch < end: the End_Epoch range
+-- only reaches flights that haven't landed before the window opens.
+CREATE INDEX IF NOT EXISTS idx_flight_plane_end ON Flight (Plane_ID, End_Epoch);
+CREATE INDEX IF NOT EXISTS idx_flight_end_epoch ON Flight (End_Epoch);
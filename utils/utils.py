@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, date, time
+import json
 from abc import ABC, abstractmethod
 
 # =============================
@@ -7,21 +8,26 @@ from abc import ABC, abstractmethod
 FLIGHT_STATUSES = {"active", "cancelled", "done", "full"}
 ORDER_STATUSES = {"active", "done", "systemcancellation", "customercancellation"}
 
-def update_flight_statuses_done_if_past(cursor) -> int:
+def update_flight_statuses_done_if_past(cursor, limit=None) -> int:
     """
     Mark flights as 'done' if their departure datetime has passed.
     Updates only flights currently in ('active','full').
     Does not touch 'cancelled' or already 'done'.
+    With limit, marks at most `limit` flights (earliest departures first), for batched sweeps.
     """
     cursor.execute("""
         UPDATE Flight
         SET Flight_Status = 'done'
-        WHERE Flight_Status IN ('active', 'full')
-          AND (
-                Departure_Date < DATE('now')
-                OR (
-                    Departure_Date = DATE('now')
-                    AND Departure_Time <= TIME('now')))""")
+        WHERE Flight_ID IN (
+            SELECT Flight_ID
+            FROM Flight
+            WHERE Flight_Status IN ('active', 'full')
+              AND Departure_Date <= DATE('now')
+              AND (
+                    Departure_Date < DATE('now')
+                    OR Departure_Time <= TIME('now'))
+            ORDER BY Departure_Date, Departure_Time
+            LIMIT ?)""", (-1 if limit is None else int(limit),))
     try:
         return int(getattr(cursor, "rowcount"))
     except Exception:
@@ -29,6 +35,91 @@ def update_flight_statuses_done_if_past(cursor) -> int:
 
 
 
+def adjust_flight_occupancy(cursor, flight_id: int, delta: int) -> None:
+    """
+    Adds delta to Flight.Occupied_Seats and flips 'active' <-> 'full' in the same UPDATE,
+    so the status can never drift from the counter. Like Flight.set_full_if_needed,
+    'cancelled' and 'done' flights keep their status.
+    """
+    cursor.execute("""
+        UPDATE Flight
+        SET Occupied_Seats = Occupied_Seats + ?,
+            Flight_Status = CASE
+                WHEN Flight_Status NOT IN ('active', 'full') THEN Flight_Status
+                WHEN Occupied_Seats + ? >= (
+                    SELECT pc.Total_Seats
+                    FROM Plane_Capacity pc
+                    WHERE pc.Plane_ID = Flight.Plane_ID) THEN 'full'
+                ELSE 'active' END
+        WHERE Flight_ID = ?""", (int(delta), int(delta), int(flight_id)))
+
+
+# -----------------------------
+# Seat holds (Seat_Holds, migrations/0004_seat_holds.sql)
+# seat ids are "12A" strings, times are unix timestamps
+# -----------------------------
+
+def take_seat_holds(cursor, flight_id: int, plane_id: int, hold_token: str, seat_ids, expires_at: float, now: float) -> bool:
+    """
+    Replaces hold_token's holds on the flight with seat_ids. Each seat is an upsert that only
+    succeeds if the seat is free or its hold has expired, so two customers can never hold the
+    same seat. Returns False if some seat is held by someone else (the caller rolls back).
+    """
+    release_seat_holds(cursor, hold_token, flight_id)
+    rows = [
+        (int(flight_id), int(plane_id), int(seat_id[:-1]), seat_id[-1], hold_token, float(expires_at), float(now))
+        for seat_id in seat_ids]
+    cursor.executemany("""
+        INSERT INTO Seat_Holds (Flight_ID, Plane_ID, Row_Num, Column_Number, Hold_Token, Expires_At)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (Flight_ID, Row_Num, Column_Number) DO UPDATE
+        SET Plane_ID = excluded.Plane_ID,
+            Hold_Token = excluded.Hold_Token,
+            Expires_At = excluded.Expires_At
+        WHERE Seat_Holds.Expires_At <= ?""", rows)
+    return cursor.rowcount == len(rows)
+
+
+def seats_held_by_others(cursor, flight_id: int, hold_token: str, seat_ids, now: float) -> bool:
+    if not seat_ids:
+        return False
+    where_pairs = " OR ".join(["(Row_Num = ? AND Column_Number = ?)"] * len(seat_ids))
+    pair_params = []
+    for seat_id in seat_ids:
+        pair_params.extend([int(seat_id[:-1]), seat_id[-1]])
+    cursor.execute(f"""
+        SELECT 1
+        FROM Seat_Holds
+        WHERE Flight_ID = ?
+          AND Hold_Token <> ?
+          AND Expires_At > ?
+          AND ({where_pairs})
+        LIMIT 1""", (int(flight_id), hold_token, float(now), *pair_params))
+    return cursor.fetchone() is not None
+
+
+def release_seat_holds(cursor, hold_token: str, flight_id=None) -> int:
+    if flight_id is None:
+        cursor.execute("DELETE FROM Seat_Holds WHERE Hold_Token = ?", (hold_token,))
+    else:
+        cursor.execute(
+            "DELETE FROM Seat_Holds WHERE Hold_Token = ? AND Flight_ID = ?", (hold_token, int(flight_id)))
+    return cursor.rowcount
+
+
+def sweep_expired_seat_holds(cursor, now: float, limit=None) -> int:
+    """Bulk-deletes expired holds (at most `limit`, oldest first)."""
+    cursor.execute("""
+        DELETE FROM Seat_Holds
+        WHERE rowid IN (
+            SELECT rowid
+            FROM Seat_Holds
+            WHERE Expires_At <= ?
+            ORDER BY Expires_At
+            LIMIT ?)""", (float(now), -1 if limit is None else int(limit)))
+    return cursor.rowcount
+
+
 # =============================
 # Users
 # =============================
@@ -430,20 +521,11 @@ def can_cancel_flight_by_72h_rule(departure_date, departure_time, now_dt=None) -
     return hours_until_departure(departure_date, departure_time, now_dt=now_dt) >= 72.0
 
 
-def get_route_duration_minutes(cursor, origin_id, dest_id):
-    cursor.execute(
-        """
-        SELECT Duration
-        FROM Routes
-        WHERE Origin_Airport = ? AND Destination_Airport = ?
-        """,
-        (origin_id, dest_id),)
-    row = cursor.fetchone()
-    if not row:
+def route_duration_to_minutes(dur):
+    """Routes.Duration ('HH:MM[:SS]' text or timedelta) -> whole minutes, None if unparseable."""
+    if dur is None:
         return None
 
-    dur = row["Duration"]
-
     if isinstance(dur, timedelta):
         return int(dur.total_seconds() // 60)
 
@@ -458,17 +540,46 @@ def get_route_duration_minutes(cursor, origin_id, dest_id):
     return None
 
 
+def get_route_duration_minutes(cursor, origin_id, dest_id):
+    cursor.execute(
+        """
+        SELECT Duration_Minutes
+        FROM Routes
+        WHERE Origin_Airport = ? AND Destination_Airport = ?
+        """,
+        (origin_id, dest_id),)
+    row = cursor.fetchone()
+    if not row:
+        return None
+
+    return row["Duration_Minutes"]
+
+
 
 def is_long_flight(duration_minutes: int) -> bool:
     return int(duration_minutes) > 360
 
 
-def next_flight_id(cursor, base=1000) -> int:
+def allocate_ids(cursor, name: str, count: int = 1) -> int:
+    """
+    Reserves `count` consecutive ids from Id_Sequences and returns the first one.
+    Runs in the caller's write transaction: the UPDATE takes the row (and the write lock)
+    first, so two transactions can never read the same value.
+    """
+    cursor.execute(
+        "UPDATE Id_Sequences SET Next_Value = Next_Value + ? WHERE Name = ?",
+        (int(count), name),)
+    if cursor.rowcount != 1:
+        raise LookupError(f"Unknown id sequence: {name}")
     cursor.execute(
-        "SELECT COALESCE(MAX(Flight_ID), ?) + 1 AS next_id FROM Flight",
-        (base,),)
+        "SELECT Next_Value - ? AS first_id FROM Id_Sequences WHERE Name = ?",
+        (int(count), name),)
     row = cursor.fetchone()
-    return int(row["next_id"] if isinstance(row, dict) else row[0])
+    return int(row["first_id"] if isinstance(row, dict) else row[0])
+
+
+def next_flight_id(cursor) -> int:
+    return allocate_ids(cursor, "Flight")
 
 
 
@@ -478,17 +589,24 @@ def next_flight_id(cursor, base=1000) -> int:
 # Small = Economy only
 # -----------------------------
 
-def plane_is_large(cursor, plane_id: int) -> bool:
+def get_plane_capacity(cursor, plane_id: int):
+    """
+    Per-plane seat counts (Economy_Seats, Business_Seats, Total_Seats, Has_Business).
+    Plane_Capacity is kept in sync with Seats by triggers (migrations/0002_plane_capacity.sql).
+    """
     cursor.execute(
         """
-        SELECT 1
-        FROM Seats
+        SELECT Plane_ID, Economy_Seats, Business_Seats, Total_Seats, Has_Business
+        FROM Plane_Capacity
         WHERE Plane_ID = ?
-          AND LOWER(Class) = 'business'
-        LIMIT 1
         """,
         (plane_id,),)
-    return cursor.fetchone() is not None
+    return cursor.fetchone()
+
+
+def plane_is_large(cursor, plane_id: int) -> bool:
+    capacity = get_plane_capacity(cursor, plane_id)
+    return bool(capacity and capacity["Has_Business"])
 
 
 def plane_size_label(cursor, plane_id: int) -> str:
@@ -498,6 +616,8 @@ def plane_size_label(cursor, plane_id: int) -> str:
 # -----------------------------
 # Availability (NO overlaps)
 # window_start_str/window_end_str are "YYYY-mm-dd HH:MM:SS"
+# A flight occupies [Start_Epoch, End_Epoch) (migration 0010); it overlaps the window
+# iff End_Epoch > window start AND Start_Epoch < window end.
 # -----------------------------
 
 def available_planes(cursor, window_start_str: str, window_end_str: str, is_long: bool):
@@ -508,48 +628,25 @@ def available_planes(cursor, window_start_str: str, window_end_str: str, is_long
     """
     cursor.execute(
         """
-        SELECT p.Plane_ID, p.Plane_Size
+        SELECT p.Plane_ID, p.Plane_Size,
+               CASE WHEN pc.Has_Business THEN 'large' ELSE 'small' END AS SizeLabel
         FROM Planes p
+        JOIN Plane_Capacity pc ON pc.Plane_ID = p.Plane_ID
         WHERE
-          (? = 0 OR EXISTS (
-              SELECT 1
-              FROM Seats s
-              WHERE s.Plane_ID = p.Plane_ID
-                AND LOWER(s.Class) = 'business'
-              LIMIT 1))
+          (? = 0 OR pc.Has_Business = 1)
           AND NOT EXISTS (
             SELECT 1
             FROM Flight f
-            JOIN Routes r
-              ON r.Origin_Airport = f.Origin_Airport
-             AND r.Destination_Airport = f.Destination_Airport
             WHERE f.Plane_ID = p.Plane_ID
+              AND f.End_Epoch > ?
+              AND f.Start_Epoch < ?
               AND f.Flight_Status <> 'cancelled'
-              AND datetime(?) < datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds')
-              AND datetime(f.Departure_Date || ' ' || f.Departure_Time) < datetime(?)
           )
         ORDER BY p.Plane_ID
         """,
-        (1 if is_long else 0, window_start_str, window_end_str),
+        (1 if is_long else 0, epoch_seconds(window_start_str), epoch_seconds(window_end_str)),
     )
-    rows = cursor.fetchall() or []
-    for r in rows:
-        r["SizeLabel"] = "large" if _plane_has_business_from_cached(cursor, r["Plane_ID"]) else "small"
-    return rows
-
-
-
-def _plane_has_business_from_cached(cursor, plane_id):
-    cursor.execute(
-        """
-        SELECT 1
-        FROM Seats
-        WHERE Plane_ID = ?
-          AND LOWER(Class) = 'business'
-        LIMIT 1
-        """,
-        (plane_id,),)
-    return cursor.fetchone() is not None
+    return cursor.fetchall() or []
 
 
 def available_pilots(cursor, window_start_str: str, window_end_str: str, require_long_qualified: bool):
@@ -558,21 +655,17 @@ def available_pilots(cursor, window_start_str: str, window_end_str: str, require
         SELECT p.Worker_ID, p.Is_Qualified
         FROM Pilots p
         WHERE (? = 0 OR p.Is_Qualified = 1)
-          AND NOT EXISTS (
-            SELECT 1
-            FROM Pilots_Scheduled_to_Flights ps
-            JOIN Flight f ON f.Flight_ID = ps.Flight_ID
-            JOIN Routes r
-              ON r.Origin_Airport = f.Origin_Airport
-             AND r.Destination_Airport = f.Destination_Airport
-            WHERE ps.Worker_ID = p.Worker_ID
+          AND p.Worker_ID NOT IN (
+            SELECT ps.Worker_ID
+            FROM Flight f
+            JOIN Pilots_Scheduled_to_Flights ps ON ps.Flight_ID = f.Flight_ID
+            WHERE f.End_Epoch > ?
+              AND f.Start_Epoch < ?
               AND f.Flight_Status <> 'cancelled'
-              AND datetime(?) < datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds')
-              AND datetime(f.Departure_Date || ' ' || f.Departure_Time) < datetime(?)
           )
         ORDER BY p.Worker_ID
         """,
-        (1 if require_long_qualified else 0, window_start_str, window_end_str),)
+        (1 if require_long_qualified else 0, epoch_seconds(window_start_str), epoch_seconds(window_end_str)),)
     return cursor.fetchall() or []
 
 
@@ -583,21 +676,17 @@ def available_attendants(cursor, window_start_str: str, window_end_str: str, req
         SELECT a.Worker_ID, a.Is_Qualified
         FROM Flight_Attendants a
         WHERE (? = 0 OR a.Is_Qualified = 1)
-          AND NOT EXISTS (
-            SELECT 1
-            FROM Flight_Attendants_Assigned_To_Flights fa
-            JOIN Flight f ON f.Flight_ID = fa.Flight_ID
-            JOIN Routes r
-              ON r.Origin_Airport = f.Origin_Airport
-             AND r.Destination_Airport = f.Destination_Airport
-            WHERE fa.Worker_ID = a.Worker_ID
+          AND a.Worker_ID NOT IN (
+            SELECT fa.Worker_ID
+            FROM Flight f
+            JOIN Flight_Attendants_Assigned_To_Flights fa ON fa.Flight_ID = f.Flight_ID
+            WHERE f.End_Epoch > ?
+              AND f.Start_Epoch < ?
               AND f.Flight_Status <> 'cancelled'
-              AND datetime(?) < datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds')
-              AND datetime(f.Departure_Date || ' ' || f.Departure_Time) < datetime(?)
           )
         ORDER BY a.Worker_ID
         """,
-        (1 if require_long_qualified else 0, window_start_str, window_end_str),)
+        (1 if require_long_qualified else 0, epoch_seconds(window_start_str), epoch_seconds(window_end_str)),)
     return cursor.fetchall() or []
 
 
@@ -630,75 +719,134 @@ def parse_dt_flexible(value):
 
     raise ValueError(f"Invalid datetime format: {s}")
 
-def overlap_exists_for_plane(cursor, plane_id, window_start, window_end) -> bool:
-    start_dt = parse_dt_flexible(window_start)
-    end_dt = parse_dt_flexible(window_end)
 
+_EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_seconds(value) -> int:
+    """
+    Naive date-time (datetime or string, see parse_dt_flexible) -> seconds since 1970-01-01,
+    the same number SQLite's strftime('%s', ...) gives for it (Flight.Start_Epoch / End_Epoch).
+    """
+    return int((parse_dt_flexible(value) - _EPOCH).total_seconds())
+
+
+def overlap_exists_for_plane(cursor, plane_id, window_start, window_end) -> bool:
     cursor.execute("""
         SELECT 1
         FROM Flight f
-        JOIN Routes r
-          ON r.Origin_Airport = f.Origin_Airport
-         AND r.Destination_Airport = f.Destination_Airport
         WHERE f.Plane_ID = ?
+          AND f.End_Epoch > ?
+          AND f.Start_Epoch < ?
           AND f.Flight_Status IN ('active','full','done')
-          AND (
-                datetime(f.Departure_Date || ' ' || f.Departure_Time) < ?
-            AND datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds') > ?
-          )
         LIMIT 1
-    """, (int(plane_id), end_dt, start_dt))
+    """, (int(plane_id), epoch_seconds(window_start), epoch_seconds(window_end)))
 
     return cursor.fetchone() is not None
 
 
 
 def overlap_exists_for_pilot(cursor, worker_id, window_start, window_end) -> bool:
-    start_dt = parse_dt_flexible(window_start)
-    end_dt = parse_dt_flexible(window_end)
-
     cursor.execute("""
         SELECT 1
         FROM Pilots_Scheduled_to_Flights psf
         JOIN Flight f ON f.Flight_ID = psf.Flight_ID
-        JOIN Routes r
-          ON r.Origin_Airport = f.Origin_Airport
-         AND r.Destination_Airport = f.Destination_Airport
         WHERE psf.Worker_ID = ?
+          AND f.End_Epoch > ?
+          AND f.Start_Epoch < ?
           AND f.Flight_Status IN ('active','full','done')
-          AND (
-                datetime(f.Departure_Date || ' ' || f.Departure_Time) < ?
-            AND datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds') > ?
-          )
         LIMIT 1
-    """, (int(worker_id), end_dt, start_dt))
+    """, (int(worker_id), epoch_seconds(window_start), epoch_seconds(window_end)))
 
     return cursor.fetchone() is not None
 
 
 def overlap_exists_for_attendant(cursor, worker_id, window_start, window_end) -> bool:
-    start_dt = parse_dt_flexible(window_start)
-    end_dt = parse_dt_flexible(window_end)
-
     cursor.execute("""
         SELECT 1
         FROM Flight_Attendants_Assigned_To_Flights fa
         JOIN Flight f ON f.Flight_ID = fa.Flight_ID
-        JOIN Routes r
-          ON r.Origin_Airport = f.Origin_Airport
-         AND r.Destination_Airport = f.Destination_Airport
         WHERE fa.Worker_ID = ?
+          AND f.End_Epoch > ?
+          AND f.Start_Epoch < ?
           AND f.Flight_Status IN ('active','full','done')
-          AND (
-                datetime(f.Departure_Date || ' ' || f.Departure_Time) < ?
-            AND datetime(f.Departure_Date || ' ' || f.Departure_Time, '+' || CAST(strftime('%s','1970-01-01 ' || r.Duration) - strftime('%s','1970-01-01 00:00:00') AS INTEGER) || ' seconds') > ?
-          )
         LIMIT 1
-    """, (int(worker_id), end_dt, start_dt))
+    """, (int(worker_id), epoch_seconds(window_start), epoch_seconds(window_end)))
 
     return cursor.fetchone() is not None
 
 
+def schedule_conflicts(cursor, slots):
+    """
+    Batched overlap check for planned flights, in one query whatever the batch size.
+    slots: iterable of (slot_key, plane_id, pilot_ids, attendant_ids, window_start, window_end).
+    Returns every booked flight (active/full/done) overlapping a slot's window for its plane
+    or one of its workers, as rows: Slot, Resource_Type ('plane'|'pilot'|'attendant'),
+    Resource_ID, Flight_ID, Departure_Date, Departure_Time, Origin_Airport, Destination_Airport.
+    """
+    wanted = []
+    for key, plane_id, pilot_ids, attendant_ids, window_start, window_end in slots:
+        start, end = epoch_seconds(window_start), epoch_seconds(window_end)
+        wanted.append([key, "plane", int(plane_id), start, end])
+        wanted.extend([key, "pilot", int(w), start, end] for w in pilot_ids or ())
+        wanted.extend([key, "attendant", int(w), start, end] for w in attendant_ids or ())
+    if not wanted:
+        return []
+
+    # The (slot, type, id, start, end) list travels as one JSON parameter: no bound-variable
+    # limit, and each row still probes the epoch indexes.
+    cursor.execute("""
+        WITH wanted AS (
+            SELECT value ->> 0 AS Slot, value ->> 1 AS Resource_Type, value ->> 2 AS Resource_ID,
+                   value ->> 3 AS Start_Epoch, value ->> 4 AS End_Epoch
+            FROM json_each(?)
+        )
+        SELECT w.Slot, w.Resource_Type, w.Resource_ID, f.Flight_ID,
+               f.Departure_Date, f.Departure_Time, f.Origin_Airport, f.Destination_Airport
+        FROM wanted w
+        JOIN Flight f
+          ON f.Plane_ID = w.Resource_ID
+         AND f.End_Epoch > w.Start_Epoch
+         AND f.Start_Epoch < w.End_Epoch
+        WHERE w.Resource_Type = 'plane'
+          AND f.Flight_Status IN ('active','full','done')
+        UNION ALL
+        SELECT w.Slot, w.Resource_Type, w.Resource_ID, f.Flight_ID,
+               f.Departure_Date, f.Departure_Time, f.Origin_Airport, f.Destination_Airport
+        FROM wanted w
+        JOIN Pilots_Scheduled_to_Flights psf ON psf.Worker_ID = w.Resource_ID
+        JOIN Flight f
+          ON f.Flight_ID = psf.Flight_ID
+         AND f.End_Epoch > w.Start_Epoch
+         AND f.Start_Epoch < w.End_Epoch
+        WHERE w.Resource_Type = 'pilot'
+          AND f.Flight_Status IN ('active','full','done')
+        UNION ALL
+        SELECT w.Slot, w.Resource_Type, w.Resource_ID, f.Flight_ID,
+               f.Departure_Date, f.Departure_Time, f.Origin_Airport, f.Destination_Airport
+        FROM wanted w
+        JOIN Flight_Attendants_Assigned_To_Flights fa ON fa.Worker_ID = w.Resource_ID
+        JOIN Flight f
+          ON f.Flight_ID = fa.Flight_ID
+         AND f.End_Epoch > w.Start_Epoch
+         AND f.Start_Epoch < w.End_Epoch
+        WHERE w.Resource_Type = 'attendant'
+          AND f.Flight_Status IN ('active','full','done')
+        ORDER BY 1, 2 DESC, 3, 5, 6
+    """, (json.dumps(wanted),))
+
+    return cursor.fetchall() or []
+
+
+def crew_conflicts(cursor, plane_id, pilot_ids, attendant_ids, window_start, window_end):
+    """
+    Every booked flight that overlaps [window_start, window_end) for the plane or any of the
+    listed pilots/attendants, in one query (schedule_conflicts rows; empty list if all free).
+    """
+    return schedule_conflicts(
+        cursor, [(None, plane_id, pilot_ids, attendant_ids, window_start, window_end)])
+
+
 def _intervals_overlap(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> bool:
     # True if intervals [a_start, a_end) and [b_start, b_end) overlap
     return a_start < b_end and b_start < a_end